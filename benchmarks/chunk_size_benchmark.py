@@ -0,0 +1,89 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Stream encryption/decryption throughput across chunk sizes and data sizes.
+
+Run from the repository root:
+    python -m benchmarks.chunk_size_benchmark [size_in_KiB ...]
+"""
+import io
+import os
+import sys
+import tempfile
+import timeit
+
+from virgil_crypto import VirgilCrypto
+
+DATA_SIZES_KIB = [256, 1024, 4096]
+CHUNK_SIZES = [1024, 16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024, VirgilCrypto.ADAPTIVE_CHUNK_SIZE]
+
+
+def measure(crypto, key_pair, data, chunk_size, use_file):
+    if use_file:
+        source = tempfile.TemporaryFile()
+        source.write(data)
+        source.seek(0)
+    else:
+        source = io.BytesIO(data)
+    encrypted = io.BytesIO()
+    started = timeit.default_timer()
+    crypto.encrypt_stream(source, encrypted, key_pair.public_key, chunk_size=chunk_size)
+    encrypt_time = timeit.default_timer() - started
+    source.close()
+
+    decrypted = io.BytesIO()
+    started = timeit.default_timer()
+    crypto.decrypt_stream(io.BytesIO(encrypted.getvalue()), decrypted, key_pair.private_key, chunk_size=chunk_size)
+    decrypt_time = timeit.default_timer() - started
+    assert decrypted.getvalue() == data
+    return encrypt_time, decrypt_time
+
+
+def main(sizes_kib):
+    crypto = VirgilCrypto()
+    key_pair = crypto.generate_key_pair()
+    print("{:>9} {:>6} {:>10} {:>14} {:>14}".format("data", "source", "chunk", "encrypt MB/s", "decrypt MB/s"))
+    for size_kib in sizes_kib:
+        data = os.urandom(size_kib * 1024)
+        megabytes = size_kib / 1024.0
+        for use_file in (False, True):
+            for chunk_size in CHUNK_SIZES:
+                encrypt_time, decrypt_time = measure(crypto, key_pair, data, chunk_size, use_file)
+                print("{:>6} KiB {:>6} {:>10} {:>14.2f} {:>14.2f}".format(
+                    size_kib, "file" if use_file else "memory", chunk_size,
+                    megabytes / encrypt_time, megabytes / decrypt_time
+                ))
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DATA_SIZES_KIB)
@@ -0,0 +1,100 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Memory mapped encrypt_file and decrypt_file versus the stream methods on files.
+
+Files are created in a temporary directory, pass 10485760 for a 10 GiB
+file. Decryption holds the whole plaintext in memory, whichever method.
+The stream methods read 1 MiB chunks, decrypt_stream slows down sharply
+on large files with smaller ones.
+
+Run from the repository root:
+    python -m benchmarks.file_encryption_benchmark [size_in_KiB ...]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+from virgil_crypto import VirgilCrypto
+
+DATA_SIZES_KIB = [1024, 16 * 1024, 256 * 1024]
+WRITE_CHUNK = 1024 * 1024
+
+
+def make_file(path, size):
+    with open(path, "wb") as file:
+        while size > 0:
+            chunk = os.urandom(min(size, WRITE_CHUNK))
+            file.write(chunk)
+            size -= len(chunk)
+
+
+def encrypt_stream(crypto, src_path, dst_path, key_pair, chunk_size):
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        crypto.encrypt_stream(src, dst, key_pair.public_key, chunk_size=chunk_size)
+
+
+def decrypt_stream(crypto, src_path, dst_path, key_pair, chunk_size):
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        crypto.decrypt_stream(src, dst, key_pair.private_key, chunk_size=chunk_size)
+
+
+def main(sizes_kib):
+    crypto = VirgilCrypto()
+    key_pair = crypto.generate_key_pair()
+    directory = tempfile.mkdtemp()
+    try:
+        plain = os.path.join(directory, "plain")
+        encrypted = os.path.join(directory, "encrypted")
+        output = os.path.join(directory, "output")
+        print("{:>12} {:>28} {:>10}".format("data", "method", "MB/s"))
+        for size_kib in sizes_kib:
+            make_file(plain, size_kib * 1024)
+            crypto.encrypt_file(plain, encrypted, key_pair.public_key)
+            repeat = 1 if size_kib >= 1024 * 1024 else 3
+            for name, run in (
+                ("encrypt_stream 1 MiB chunks", lambda: encrypt_stream(crypto, plain, output, key_pair, WRITE_CHUNK)),
+                ("encrypt_file", lambda: crypto.encrypt_file(plain, output, key_pair.public_key)),
+                ("decrypt_stream 1 MiB chunks", lambda: decrypt_stream(crypto, encrypted, output, key_pair, WRITE_CHUNK)),
+                ("decrypt_file", lambda: crypto.decrypt_file(encrypted, output, key_pair.private_key)),
+            ):
+                elapsed = min(timeit.repeat(run, number=1, repeat=repeat))
+                print("{:>8} KiB {:>28} {:>10.1f}".format(size_kib, name, size_kib / 1024.0 / elapsed))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DATA_SIZES_KIB)
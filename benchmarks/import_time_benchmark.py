@@ -0,0 +1,80 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Import time of the package compared to the foundation library.
+
+Every import runs in a fresh interpreter with -X importtime, which
+requires Python 3.7.
+
+Run from the repository root:
+    python -m benchmarks.import_time_benchmark [runs]
+"""
+import subprocess
+import sys
+
+FOUNDATION = "virgil_crypto_lib.foundation"
+PACKAGE_MODULES = ["virgil_crypto.card_crypto", "virgil_crypto.access_token_signer"]
+RUNS = 5
+
+
+def import_times(statement):
+    # Parses the -X importtime report into {module: cumulative microseconds}.
+    report = subprocess.check_output(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stderr=subprocess.STDOUT,
+        universal_newlines=True
+    )
+    times = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def main(runs):
+    package_times = []
+    foundation_times = []
+    for _ in range(runs):
+        times = import_times("import " + ", ".join(PACKAGE_MODULES))
+        package_times.append(sum(times[module] for module in PACKAGE_MODULES))
+        foundation_times.append(import_times("import " + FOUNDATION)[FOUNDATION])
+    print("{:>12} {:>12}".format("import", "best ms"))
+    print("{:>12} {:>12.1f}".format("package", min(package_times) / 1000.0))
+    print("{:>12} {:>12.1f}".format("foundation", min(foundation_times) / 1000.0))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else RUNS)
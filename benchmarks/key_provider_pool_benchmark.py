@@ -0,0 +1,116 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Import/export throughput with pooled KeyProviders versus a fresh one per call,
+and of exports served from the DER cached on keys versus the pooled providers.
+
+Run from the repository root:
+    python -m benchmarks.key_provider_pool_benchmark
+"""
+import timeit
+
+from virgil_crypto_lib.foundation import CtrDrbg, KeyProvider
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.keys import KeyPairType
+from virgil_crypto.keys import VirgilPublicKey
+
+ITERATIONS = 2000
+
+
+def fresh_key_provider():
+    rng = CtrDrbg()
+    rng.setup_defaults()
+    key_provider = KeyProvider()
+    key_provider.set_random(rng)
+    key_provider.setup_defaults()
+    return key_provider
+
+
+def unpooled_import_public_key(crypto, key_data):
+    public_key = fresh_key_provider().import_public_key(bytearray(key_data))
+    key_provider = KeyProvider()
+    key_provider.setup_defaults()
+    return crypto.compute_hash(key_provider.export_public_key(public_key))[:8]
+
+
+def unpooled_export_public_key(public_key):
+    key_provider = KeyProvider()
+    key_provider.set_random(CtrDrbg())
+    key_provider.setup_defaults()
+    return key_provider.export_public_key(public_key.public_key)
+
+
+def uncached_public_key(public_key):
+    # A key object without the DER cached on it, so export goes to a key provider.
+    return VirgilPublicKey(public_key.identifier, public_key.public_key, public_key.key_type)
+
+
+def header(baseline, measured):
+    print("{:<24} {:>16} {:>16} {:>7}".format("operation", baseline, measured, "gain"))
+
+
+def report(name, baseline, measured):
+    print("{:<24} {:>10.0f} ops/s {:>10.0f} ops/s {:>6.2f}x".format(
+        name, ITERATIONS / baseline, ITERATIONS / measured, baseline / measured
+    ))
+
+
+def main():
+    crypto = VirgilCrypto()
+    key_pair = crypto.generate_key_pair(KeyPairType.ED25519)
+    public_key_data = crypto.export_public_key(key_pair.public_key)
+
+    header("fresh provider", "pooled")
+    report(
+        "import_public_key",
+        timeit.timeit(lambda: unpooled_import_public_key(crypto, public_key_data), number=ITERATIONS),
+        timeit.timeit(lambda: crypto.import_public_key(public_key_data), number=ITERATIONS),
+    )
+    report(
+        "export_public_key",
+        timeit.timeit(lambda: unpooled_export_public_key(key_pair.public_key), number=ITERATIONS),
+        timeit.timeit(lambda: crypto.export_public_key(uncached_public_key(key_pair.public_key)), number=ITERATIONS),
+    )
+
+    print("")
+    header("pooled", "cached DER")
+    report(
+        "export_public_key",
+        timeit.timeit(lambda: crypto.export_public_key(uncached_public_key(key_pair.public_key)), number=ITERATIONS),
+        timeit.timeit(lambda: crypto.export_public_key(key_pair.public_key), number=ITERATIONS),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Peak Python heap of one-shot encryption and decryption.
+
+The legacy functions concatenate the message parts the way encrypt and
+decrypt used to. The *_into variants write into buffers allocated before
+the measurement, so their peak excludes the output itself.
+
+Run from the repository root:
+    python -m benchmarks.one_shot_memory_benchmark [size_in_KiB ...]
+"""
+import os
+import sys
+import tracemalloc
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.utils import foundation
+
+DATA_SIZES_KIB = [1024, 4096]
+
+
+def legacy_encrypt(crypto, data, key_pair):
+    cipher = foundation.RecipientCipher()
+    cipher.set_encryption_cipher(foundation.Aes256Gcm())
+    cipher.set_random(crypto.rng)
+    cipher.add_key_recipient(key_pair.public_key.identifier, key_pair.public_key.public_key)
+    cipher.start_encryption()
+    result = cipher.pack_message_info()
+    result += cipher.process_encryption(bytearray(data))
+    result += cipher.finish_encryption()
+    return result
+
+
+def legacy_decrypt(crypto, data, key_pair):
+    cipher = foundation.RecipientCipher()
+    cipher.start_decryption_with_key(key_pair.private_key.identifier, key_pair.private_key.private_key, bytearray())
+    result = bytearray()
+    result += cipher.process_decryption(bytearray(data))
+    result += cipher.finish_decryption()
+    return result
+
+
+def measure_peak(function, *args):
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(sizes_kib):
+    crypto = VirgilCrypto()
+    key_pair = crypto.generate_key_pair()
+    print("{:>9} {:>14} {:>16}".format("data", "method", "peak / data size"))
+    for size_kib in sizes_kib:
+        data = os.urandom(size_kib * 1024)
+        encrypted = crypto.encrypt(data, key_pair.public_key)
+        encrypt_output = bytearray(len(encrypted))
+        decrypt_output = bytearray(len(encrypted))
+        measurements = [
+            ("legacy encrypt", measure_peak(legacy_encrypt, crypto, data, key_pair)),
+            ("encrypt", measure_peak(crypto.encrypt, data, key_pair.public_key)),
+            ("encrypt_into", measure_peak(crypto.encrypt_into, data, encrypt_output, key_pair.public_key)),
+            ("legacy decrypt", measure_peak(legacy_decrypt, crypto, encrypted, key_pair)),
+            ("decrypt", measure_peak(crypto.decrypt, encrypted, key_pair.private_key)),
+            ("decrypt_into", measure_peak(crypto.decrypt_into, encrypted, decrypt_output, key_pair.private_key)),
+        ]
+        for name, peak in measurements:
+            print("{:>6} KiB {:>14} {:>16.2f}".format(size_kib, name, peak / float(len(data))))
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DATA_SIZES_KIB)
@@ -0,0 +1,103 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Segmented container throughput by number of worker threads.
+
+Segments are processed by the native library with the GIL released, so
+throughput should grow with the number of threads up to the number of
+cores. The single threaded encrypt_stream is shown for reference.
+
+Run from the repository root:
+    python -m benchmarks.parallel_segmented_benchmark [size_in_KiB ...]
+"""
+import io
+import multiprocessing
+import os
+import sys
+import timeit
+
+from virgil_crypto import VirgilCrypto
+
+DATA_SIZES_KIB = [64 * 1024]
+REPEAT = 3
+
+
+def best_time(function):
+    return min(timeit.repeat(function, number=1, repeat=REPEAT))
+
+
+def worker_counts():
+    counts = [1]
+    while counts[-1] * 2 <= multiprocessing.cpu_count():
+        counts.append(counts[-1] * 2)
+    if counts[-1] != multiprocessing.cpu_count():
+        counts.append(multiprocessing.cpu_count())
+    return counts
+
+
+def main(sizes_kib):
+    crypto = VirgilCrypto()
+    key_pair = crypto.generate_key_pair()
+    print("{:>9} {:>18} {:>10} {:>10} {:>8}".format("data", "method", "workers", "MB/s", "speedup"))
+    for size_kib in sizes_kib:
+        data = os.urandom(size_kib * 1024)
+        megabytes = len(data) / float(1024 * 1024)
+
+        stream_time = best_time(lambda: crypto.encrypt_stream(
+            io.BytesIO(data), io.BytesIO(), key_pair.public_key, chunk_size=1024 * 1024
+        ))
+        print("{:>6} KiB {:>18} {:>10} {:>10.1f} {:>8}".format(size_kib, "encrypt_stream", 1, megabytes / stream_time, ""))
+
+        output = io.BytesIO()
+        crypto.encrypt_segmented(io.BytesIO(data), output, key_pair.public_key)
+        container = output.getvalue()
+
+        for name, run in (
+            ("encrypt_segmented", lambda workers: crypto.encrypt_segmented(
+                io.BytesIO(data), io.BytesIO(), key_pair.public_key, max_workers=workers
+            )),
+            ("decrypt_segmented", lambda workers: crypto.decrypt_segmented(
+                io.BytesIO(container), io.BytesIO(), key_pair.private_key, max_workers=workers
+            )),
+        ):
+            single_time = None
+            for workers in worker_counts():
+                elapsed = best_time(lambda: run(workers))
+                single_time = single_time or elapsed
+                print("{:>6} KiB {:>18} {:>10} {:>10.1f} {:>7.2f}x".format(
+                    size_kib, name, workers, megabytes / elapsed, single_time / elapsed
+                ))
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DATA_SIZES_KIB)
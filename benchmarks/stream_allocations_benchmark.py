@@ -0,0 +1,103 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Python heap used by stream encryption, before and after zero-copy chunks.
+
+The legacy loop reads every chunk into a new bytes object and converts it
+through the generated bridge, as encrypt_stream used to.
+
+Run from the repository root:
+    python -m benchmarks.stream_allocations_benchmark [size_in_KiB ...]
+"""
+import io
+import os
+import sys
+import timeit
+import tracemalloc
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.utils import foundation
+
+DATA_SIZES_KIB = [1024, 8192]
+CHUNK_SIZE = VirgilCrypto.DEFAULT_CHUNK_SIZE
+
+
+def legacy_encrypt_stream(crypto, input_stream, output_stream, public_key):
+    cipher = foundation.RecipientCipher()
+    cipher.set_encryption_cipher(foundation.Aes256Gcm())
+    cipher.set_random(crypto.rng)
+    cipher.add_key_recipient(public_key.identifier, public_key.public_key)
+    cipher.start_encryption()
+    output_stream.write(cipher.pack_message_info())
+    while True:
+        chunk = input_stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        output_stream.write(cipher.process_encryption(chunk))
+    output_stream.write(cipher.finish_encryption())
+
+
+def current_encrypt_stream(crypto, input_stream, output_stream, public_key):
+    crypto.encrypt_stream(input_stream, output_stream, public_key, chunk_size=CHUNK_SIZE)
+
+
+def measure(encrypt_stream, crypto, key_pair, data):
+    input_stream = io.BytesIO(data)
+    output_stream = io.BytesIO()
+    output_stream.write(bytes(len(data) + 4096))
+    output_stream.seek(0)
+    tracemalloc.start()
+    started = timeit.default_timer()
+    encrypt_stream(crypto, input_stream, output_stream, key_pair.public_key)
+    elapsed = timeit.default_timer() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def main(sizes_kib):
+    crypto = VirgilCrypto()
+    key_pair = crypto.generate_key_pair()
+    print("{:>9} {:>8} {:>16} {:>10}".format("data", "loop", "peak KiB per MB", "MB/s"))
+    for size_kib in sizes_kib:
+        data = os.urandom(size_kib * 1024)
+        megabytes = size_kib / 1024.0
+        for name, encrypt_stream in (("legacy", legacy_encrypt_stream), ("current", current_encrypt_stream)):
+            peak, elapsed = measure(encrypt_stream, crypto, key_pair, data)
+            print("{:>6} KiB {:>8} {:>16.1f} {:>10.2f}".format(
+                size_kib, name, peak / 1024.0 / megabytes, megabytes / elapsed
+            ))
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DATA_SIZES_KIB)
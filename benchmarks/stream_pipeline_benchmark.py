@@ -0,0 +1,106 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Stream encryption with slow streams, serial and pipelined.
+
+Reads and writes sleep for a fixed latency per call to stand for network
+storage and a slow disk. Pipelined runs print the time every stage spent
+busy and stalled.
+
+Run from the repository root:
+    python -m benchmarks.stream_pipeline_benchmark [size_in_KiB ...]
+"""
+import io
+import os
+import sys
+import time
+import timeit
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.streams import StreamPipeline
+
+DATA_SIZES_KIB = [4096, 16384]
+CHUNK_SIZE = 256 * 1024
+LATENCY = 0.002
+
+
+class SlowReader(io.RawIOBase):
+
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        time.sleep(LATENCY)
+        return self.stream.readinto(buffer)
+
+
+class SlowWriter(io.RawIOBase):
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        time.sleep(LATENCY)
+        return len(data)
+
+
+def measure(crypto, key_pair, data, pipeline):
+    started = timeit.default_timer()
+    crypto.encrypt_stream(
+        SlowReader(data), SlowWriter(), key_pair.public_key, chunk_size=CHUNK_SIZE, pipeline=pipeline
+    )
+    return timeit.default_timer() - started
+
+
+def main(sizes_kib):
+    crypto = VirgilCrypto()
+    key_pair = crypto.generate_key_pair()
+    print("{:>9} {:>9} {:>8} {:>32}".format("data", "engine", "MB/s", "busy/stalled s: reader crypto writer"))
+    for size_kib in sizes_kib:
+        data = os.urandom(size_kib * 1024)
+        megabytes = size_kib / 1024.0
+        print("{:>6} KiB {:>9} {:>8.2f}".format(size_kib, "serial", megabytes / measure(crypto, key_pair, data, None)))
+        pipeline = StreamPipeline()
+        elapsed = measure(crypto, key_pair, data, pipeline)
+        stages = " ".join(
+            "{:.2f}/{:.2f}".format(stage.busy, stage.input_stall + stage.output_stall)
+            for stage in (pipeline.stats.reader, pipeline.stats.crypto, pipeline.stats.writer)
+        )
+        print("{:>6} KiB {:>9} {:>8.2f} {:>32}".format(size_kib, "pipelined", megabytes / elapsed, stages))
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DATA_SIZES_KIB)
@@ -0,0 +1,80 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Batch verification with verify_signatures_many versus a verify_signature loop.
+
+Run from the repository root:
+    python -m benchmarks.verify_signatures_benchmark
+"""
+import timeit
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.keys import KeyPairType
+
+BATCH_SIZE = 2000
+SIGNERS = 20
+REPEAT = 3
+
+
+def make_items(crypto):
+    key_pairs = [crypto.generate_key_pair(KeyPairType.ED25519) for _ in range(SIGNERS)]
+    items = []
+    for i in range(BATCH_SIZE):
+        key_pair = key_pairs[i % SIGNERS]
+        data = bytearray("card snapshot {}".format(i).encode())
+        items.append((data, crypto.generate_signature(data, key_pair.private_key), key_pair.public_key))
+    return items
+
+
+def main():
+    crypto = VirgilCrypto()
+    items = make_items(crypto)
+
+    def loop():
+        return [crypto.verify_signature(*item) for item in items]
+
+    cases = [
+        ("verify_signature loop", loop),
+        ("verify_signatures_many", lambda: crypto.verify_signatures_many(items)),
+        ("  max_workers=4", lambda: crypto.verify_signatures_many(items, max_workers=4)),
+    ]
+    print("{} signatures from {} signers".format(BATCH_SIZE, SIGNERS))
+    baseline = None
+    for name, case in cases:
+        elapsed = min(timeit.repeat(case, number=1, repeat=REPEAT))
+        baseline = baseline or elapsed
+        print("{:<24} {:>10.0f} verifies/s {:>6.2f}x".format(name, BATCH_SIZE / elapsed, baseline / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,14 +12,13 @@ setup(
         "License :: OSI Approved :: BSD License",
         "Natural Language :: English",
         "Programming Language :: C++",
-        "Programming Language :: Python :: 2.7",
-        "Programming Language :: Python :: 3.4",
         "Programming Language :: Python :: 3.5",
         "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Topic :: Security :: Cryptography",
     ],
-    install_requires=["virgil-crypto-lib"],
+    python_requires=">=3.5",
+    install_requires=["virgil-crypto-lib>=0.23.1,<0.24"],
     license="BSD",
     include_package_data=True,
     zip_safe=False,
@@ -31,9 +31,9 @@
 # STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
 # IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
-from virgil_crypto.keys import VirgilPrivateKey, VirgilPublicKey
-
 from virgil_crypto import VirgilCrypto
+from virgil_crypto.argument_checks import check_token_signing
+from virgil_crypto.argument_checks import check_token_verification
 
 
 class AccessTokenSigner(object):
@@ -41,9 +41,9 @@ class AccessTokenSigner(object):
     Class provides a cryptographic signature operations for Access Token.
     """
 
-    def __init__(self, crypto=VirgilCrypto()):
+    def __init__(self, crypto=None):
         self.__algorithm = "VEDS512"
-        self.__crypto = crypto
+        self.__crypto = crypto if crypto is not None else VirgilCrypto.default()
 
     def generate_token_signature(self, token, private_key):
         # type: (Union[bytes, bytearray], VirgilPrivateKey) -> bytearray
@@ -59,15 +59,7 @@ class AccessTokenSigner(object):
         Raises:
             ValueError: if token or private key missing or malformed
         """
-        if not private_key:
-            raise ValueError("Missing private key")
-
-        if not token:
-            raise ValueError("Missing token for sign")
-
-        if not isinstance(private_key, VirgilPrivateKey):
-            raise ValueError("private_key must be a VirgilPrivateKey type")
-
+        check_token_signing(token, private_key)
         return self.__crypto.generate_signature(token, private_key)
 
     def verify_token_signature(self, signature,  token, public_key):
@@ -85,12 +77,7 @@ class AccessTokenSigner(object):
         Raises:
             ValueError: if public key or token missed or malformed.
         """
-        if not isinstance(public_key, VirgilPublicKey):
-            raise ValueError("public_key must be a VirgilPublicKey type")
-
-        if not token:
-            raise ValueError("Missing token to verify")
-
+        check_token_verification(token, public_key)
         return self.__crypto.verify_signature(
             token, signature, public_key
         )
@@ -0,0 +1,144 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from virgil_crypto.argument_checks import check_hashing
+from virgil_crypto.argument_checks import check_public_key_export
+from virgil_crypto.argument_checks import check_public_key_import
+from virgil_crypto.argument_checks import check_signing
+from virgil_crypto.argument_checks import check_verification
+from virgil_crypto.hashes import HashAlgorithm
+
+from .async_virgil_crypto import AsyncVirgilCrypto
+
+
+class AsyncCardCrypto(object):
+    """Asyncio counterpart of CardCrypto.
+
+    Signatures and hashes go through AsyncVirgilCrypto, so heavy calls run
+    in its executor.
+
+    Args:
+        crypto: AsyncVirgilCrypto to use. Defaults to one over VirgilCrypto.default().
+    """
+
+    def __init__(self, crypto=None):
+        self.__crypto = crypto if crypto is not None else AsyncVirgilCrypto()
+
+    async def generate_signature(self, data, private_key):
+        # type: (Union[bytes, bytearray], VirgilPrivateKey) -> bytearray
+        """Signs the specified data using Private key.
+
+        Args:
+            data: raw data bytes for signing.
+            private_key: private key for signing.
+
+        Returns:
+            Signature bytes.
+
+        Raises:
+            ValueError: if data or private key missing or malformed
+        """
+        check_signing(data, private_key)
+        return await self.__crypto.generate_signature(data, private_key)
+
+    async def verify_signature(self, signature, data, public_key):
+        # type: (Union[bytes, bytearray], Union[bytes, bytearray], VirgilPublicKey) -> bool
+        """Verifies the specified signature using original data and signer's public key.
+
+        Args:
+            signature: signature bytes for verification.
+            data: original data bytes for verification.
+            public_key: signer public key for verification.
+
+        Returns:
+            True if signature is valid, False otherwise.
+
+        Raises:
+            ValueError: if data, signature, public key missing or malformed.
+        """
+        check_verification(signature, data, public_key)
+        return await self.__crypto.verify_signature(data, signature, public_key)
+
+    async def export_public_key(self, public_key):
+        # type: (VirgilPublicKey) -> bytearray
+        """Exports the Public key into material representation.
+
+        Args:
+            public_key: public key for export.
+
+        Returns:
+            Key material representation bytes.
+
+        Raises:
+            ValueError: if public key missing or malformed.
+        """
+        check_public_key_export(public_key)
+        return await self.__crypto.export_public_key(public_key)
+
+    async def import_public_key(self, data):
+        # type: (Union[bytes, bytearray]) -> VirgilPublicKey
+        """Imports the Public key from material representation.
+
+        Args:
+            data: key material representation bytes.
+
+        Returns:
+            Imported public key.
+
+        Raises:
+            ValueError: if key data missing
+        """
+        check_public_key_import(data)
+        return await self.__crypto.import_public_key(data)
+
+    async def generate_sha512(self, data):
+        # type: (Union[bytes, bytearray]) -> bytearray
+        """Computes the sha512 hash of specified data.
+
+        Args:
+            data: data bytes for fingerprint calculation.
+
+        Returns:
+            Hash bytes.
+
+        Raises:
+              ValueError: if data missed.
+        """
+        check_hashing(data)
+        return await self.__crypto.compute_hash(data, HashAlgorithm.SHA512)
+
+    @property
+    def crypto(self):
+        """Gets Async Virgil Crypto."""
+        return self.__crypto
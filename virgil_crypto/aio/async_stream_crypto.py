@@ -0,0 +1,189 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import functools
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.utils import NativeBridge
+from virgil_crypto.utils import OutputBuffer
+from virgil_crypto.utils import foundation
+
+# get_event_loop is deprecated inside coroutines, before Python 3.7 it is
+# the only way to get the running loop.
+get_running_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+
+
+class AsyncStreamCrypto(object):
+    """Stream encryption and decryption for asyncio.
+
+    Data is read from an asyncio.StreamReader or an async iterator of
+    bytes-like chunks and written to an asyncio.StreamWriter, waiting for
+    drain() after every write so slow peers slow the transfer down instead
+    of filling memory. Cipher steps over large amounts of data run in an
+    executor, the library releases the GIL while working, so many transfers
+    can share one event loop.
+
+    Note: Requires Python 3.5+, the package doesn't import this module.
+
+    Args:
+        crypto: VirgilCrypto providing randoms and the chunk size.
+            Defaults to VirgilCrypto.default().
+        executor: executor for large cipher steps. The loop default executor if not set.
+        executor_threshold: cipher steps over at least this many bytes run in the executor.
+    """
+
+    DEFAULT_EXECUTOR_THRESHOLD = 256 * 1024
+
+    def __init__(self, crypto=None, executor=None, executor_threshold=DEFAULT_EXECUTOR_THRESHOLD):
+        self.__crypto = crypto if crypto is not None else VirgilCrypto.default()
+        self.__executor = executor
+        self.executor_threshold = executor_threshold
+
+    async def encrypt_stream(self, reader, writer, *recipients, chunk_size=None):
+        """Encrypts data from reader using recipients Public keys.
+
+        Args:
+            reader: asyncio.StreamReader or async iterator of data chunks.
+            writer: asyncio.StreamWriter or any object with write() and
+                optionally a drain() coroutine.
+            recipients: list of recipients' public keys.
+            chunk_size: size of chunks read from a StreamReader.
+                Defaults to chunk_size of the crypto.
+        """
+        cipher = foundation.RecipientCipher()
+        cipher.set_encryption_cipher(foundation.Aes256Gcm())
+        cipher.set_random(self.__crypto.rng)
+
+        for public_key in recipients:
+            cipher.add_key_recipient(public_key.identifier, public_key.public_key)
+
+        cipher.start_encryption()
+
+        native = NativeBridge.instance()
+        output = OutputBuffer()
+        output.append(cipher.pack_message_info())
+        await self.__write(writer, output)
+
+        read = self.__reader(reader, chunk_size)
+        while True:
+            chunk = await read()
+            if not chunk:
+                break
+            await self.__run(len(chunk), native.process_encryption, cipher, chunk, output)
+            await self.__write(writer, output)
+
+        native.finish_encryption(cipher, output)
+        await self.__write(writer, output)
+
+    async def decrypt_stream(self, reader, writer, private_key, chunk_size=None):
+        """Decrypts data from reader using Private key.
+
+        Note: The library releases decrypted data only after the whole
+            message is authenticated, so plaintext is written at the end.
+
+        Args:
+            reader: asyncio.StreamReader or async iterator of encrypted data chunks.
+            writer: asyncio.StreamWriter or any object with write() and
+                optionally a drain() coroutine.
+            private_key: private key for decryption.
+            chunk_size: size of chunks read from a StreamReader.
+                Defaults to chunk_size of the crypto.
+        """
+        cipher = foundation.RecipientCipher()
+        cipher.set_random(self.__crypto.rng)
+        cipher.start_decryption_with_key(
+            private_key.identifier,
+            private_key.private_key,
+            bytearray()
+        )
+
+        native = NativeBridge.instance()
+        output = OutputBuffer()
+        processed = 0
+
+        read = self.__reader(reader, chunk_size)
+        while True:
+            chunk = await read()
+            if not chunk:
+                break
+            processed += len(chunk)
+            await self.__run(len(chunk), native.process_decryption, cipher, chunk, output)
+            await self.__write(writer, output)
+
+        await self.__run(processed, native.finish_decryption, cipher, output)
+        await self.__write(writer, output)
+
+    async def __run(self, size, function, *args):
+        if size < self.executor_threshold:
+            return function(*args)
+        loop = get_running_loop()
+        return await loop.run_in_executor(self.__executor, functools.partial(function, *args))
+
+    def __reader(self, reader, chunk_size):
+        if hasattr(reader, "read"):
+            if chunk_size is None:
+                chunk_size = self.__crypto.chunk_size
+            if not isinstance(chunk_size, int):
+                chunk_size = VirgilCrypto.DEFAULT_CHUNK_SIZE
+            return functools.partial(reader.read, chunk_size)
+
+        iterator = reader.__aiter__()
+
+        async def read():
+            while True:
+                try:
+                    chunk = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return b""
+                if chunk:
+                    return chunk
+        return read
+
+    @staticmethod
+    async def __write(writer, output):
+        # Transports may keep written data, so they get a copy of the
+        # reused output buffer.
+        if not len(output):
+            return
+        writer.write(bytes(output.view()))
+        output.clear()
+        drain = getattr(writer, "drain", None)
+        if drain is not None:
+            await drain()
+
+    @property
+    def crypto(self):
+        """Gets Virgil Crypto."""
+        return self.__crypto
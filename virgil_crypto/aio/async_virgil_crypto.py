@@ -0,0 +1,196 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.hashes import HashAlgorithm
+from virgil_crypto.keys import KeyPairType
+from virgil_crypto.keys import VirgilPublicKey
+from virgil_crypto.process_pool_runner import call_in_worker
+
+from .async_stream_crypto import AsyncStreamCrypto
+from .async_stream_crypto import get_running_loop
+
+
+class AsyncVirgilCrypto(object):
+    """Asyncio facade of VirgilCrypto.
+
+    CPU heavy calls run in an executor, so they don't block the event loop:
+    calls over at least inline_threshold bytes of data and any call using
+    RSA keys. Cheaper calls run inline, where the executor round trip
+    would cost more than the call itself.
+
+    With a ProcessPoolExecutor keys are pickled as DER, workers keep the
+    keys they imported for the following calls.
+
+    Note: Requires Python 3.5+, the package doesn't import this module.
+
+    Args:
+        crypto: wrapped VirgilCrypto. Defaults to VirgilCrypto.default().
+        executor: thread or process pool executor for heavy calls.
+            The loop default executor if not set.
+        max_concurrency: maximum number of calls running in the executor at once.
+            Not limited if not set.
+        inline_threshold: size of data from which calls run in the executor.
+    """
+
+    DEFAULT_INLINE_THRESHOLD = 64 * 1024
+
+    def __init__(self, crypto=None, executor=None, max_concurrency=None, inline_threshold=DEFAULT_INLINE_THRESHOLD):
+        self.__crypto = crypto if crypto is not None else VirgilCrypto.default()
+        self.__executor = executor
+        self.__max_concurrency = max_concurrency
+        self.__semaphore = None
+        self.inline_threshold = inline_threshold
+        self.__streams = AsyncStreamCrypto(self.__crypto, None if self.__uses_processes else executor)
+
+    async def generate_key_pair(self, key_type=KeyPairType.ED25519, seed=None):
+        """Generates key pair, see VirgilCrypto.generate_key_pair. RSA keys are generated in the executor."""
+        return await self.__call(self.__is_rsa(key_type), "generate_key_pair", key_type, seed)
+
+    async def import_private_key(self, key_data):
+        """Imports private key, see VirgilCrypto.import_private_key."""
+        return self.__crypto.import_private_key(key_data)
+
+    async def import_public_key(self, key_data):
+        """Imports public key, see VirgilCrypto.import_public_key."""
+        return self.__crypto.import_public_key(key_data)
+
+    async def export_private_key(self, private_key):
+        """Exports private key, see VirgilCrypto.export_private_key."""
+        return self.__crypto.export_private_key(private_key)
+
+    async def export_public_key(self, public_key):
+        """Exports public key, see VirgilCrypto.export_public_key."""
+        return self.__crypto.export_public_key(public_key)
+
+    async def extract_public_key(self, private_key):
+        """Extracts public key, see VirgilCrypto.extract_public_key."""
+        return self.__crypto.extract_public_key(private_key)
+
+    async def encrypt(self, data, *recipients):
+        """Encrypts data, see VirgilCrypto.encrypt."""
+        return await self.__call(self.__is_heavy(data, recipients), "encrypt", data, *recipients)
+
+    async def decrypt(self, data, private_key):
+        """Decrypts data, see VirgilCrypto.decrypt."""
+        return await self.__call(self.__is_heavy(data, [private_key]), "decrypt", data, private_key)
+
+    async def sign_and_encrypt(self, data, private_key, *recipients):
+        """Signs and encrypts data, see VirgilCrypto.sign_and_encrypt."""
+        heavy = self.__is_heavy(data, [private_key] + list(recipients))
+        return await self.__call(heavy, "sign_and_encrypt", data, private_key, *recipients)
+
+    async def decrypt_and_verify(self, data, private_key, signers_public_keys):
+        """Decrypts and verifies data, see VirgilCrypto.decrypt_and_verify."""
+        if isinstance(signers_public_keys, VirgilPublicKey):
+            keys = [private_key, signers_public_keys]
+        elif hasattr(signers_public_keys, "get"):
+            # Scanning an index would cost what it saves, the signer is unknown.
+            keys = [private_key]
+        else:
+            keys = [private_key] + list(signers_public_keys)
+        heavy = self.__is_heavy(data, keys)
+        return await self.__call(heavy, "decrypt_and_verify", data, private_key, signers_public_keys)
+
+    async def generate_signature(self, data, private_key):
+        """Signs data, see VirgilCrypto.generate_signature."""
+        return await self.__call(self.__is_heavy(data, [private_key]), "generate_signature", data, private_key)
+
+    async def verify_signature(self, data, signature, public_key):
+        """Verifies signature, see VirgilCrypto.verify_signature."""
+        heavy = self.__is_heavy(data, [public_key])
+        return await self.__call(heavy, "verify_signature", data, signature, public_key)
+
+    async def compute_hash(self, data, algorithm=HashAlgorithm.SHA512):
+        """Computes hash of data, see VirgilCrypto.compute_hash."""
+        return await self.__call(self.__is_heavy(data, []), "compute_hash", data, algorithm)
+
+    async def encrypt_stream(self, reader, writer, *recipients, chunk_size=None):
+        """Encrypts asyncio stream, see AsyncStreamCrypto.encrypt_stream."""
+        await self.__streams.encrypt_stream(reader, writer, *recipients, chunk_size=chunk_size)
+
+    async def decrypt_stream(self, reader, writer, private_key, chunk_size=None):
+        """Decrypts asyncio stream, see AsyncStreamCrypto.decrypt_stream."""
+        await self.__streams.decrypt_stream(reader, writer, private_key, chunk_size)
+
+    async def __call(self, heavy, method_name, *args):
+        if not heavy:
+            return getattr(self.__crypto, method_name)(*args)
+        semaphore = self.__get_semaphore()
+        if semaphore is None:
+            return await self.__submit(method_name, args)
+        async with semaphore:
+            return await self.__submit(method_name, args)
+
+    async def __submit(self, method_name, args):
+        loop = get_running_loop()
+        if not self.__uses_processes:
+            method = getattr(self.__crypto, method_name)
+            return await loop.run_in_executor(self.__executor, functools.partial(method, *args))
+
+        return await loop.run_in_executor(self.__executor, functools.partial(
+            call_in_worker,
+            (self.__crypto.use_sha256_fingerprints, self.__crypto.return_bytes),
+            method_name,
+            args
+        ))
+
+    def __get_semaphore(self):
+        if self.__semaphore is None and self.__max_concurrency is not None:
+            self.__semaphore = asyncio.Semaphore(self.__max_concurrency)
+        return self.__semaphore
+
+    def __is_heavy(self, data, keys):
+        try:
+            size = memoryview(data).nbytes
+        except TypeError:
+            size = len(data)
+        return size >= self.inline_threshold or any(self.__is_rsa(key.key_type) for key in keys)
+
+    @staticmethod
+    def __is_rsa(key_type):
+        return getattr(key_type, "rsa_bitlen", None) is not None
+
+    @property
+    def __uses_processes(self):
+        return isinstance(self.__executor, ProcessPoolExecutor)
+
+    @property
+    def crypto(self):
+        """Gets wrapped Virgil Crypto."""
+        return self.__crypto
@@ -0,0 +1,92 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from virgil_crypto.keys import VirgilPrivateKey, VirgilPublicKey
+
+
+def check_signing(data, private_key):
+    if not data:
+        raise ValueError("Missing data for signing")
+
+    if not private_key:
+        raise ValueError("Missing private key")
+
+    if not isinstance(private_key, VirgilPrivateKey):
+        raise ValueError("private_key must be a VirgilPrivateKey type")
+
+
+def check_verification(signature, data, public_key):
+    if not signature:
+        raise ValueError("Missing signature")
+
+    if not data:
+        raise ValueError("Missing data for signature verify")
+
+    if not isinstance(public_key, VirgilPublicKey):
+        raise ValueError("public_key must be a VirgilPublicKey type")
+
+
+def check_public_key_export(public_key):
+    if not public_key:
+        raise ValueError("Missing public key")
+    if public_key.public_key is None or public_key.identifier is None or public_key.key_type is None:
+        raise ValueError("Public Key is not complete.")
+
+
+def check_public_key_import(data):
+    if not data:
+        raise ValueError("Key data missing")
+
+
+def check_hashing(data):
+    if not data:
+        raise ValueError("Missed data for fingerprint generation")
+
+
+def check_token_signing(token, private_key):
+    if not private_key:
+        raise ValueError("Missing private key")
+
+    if not token:
+        raise ValueError("Missing token for sign")
+
+    if not isinstance(private_key, VirgilPrivateKey):
+        raise ValueError("private_key must be a VirgilPrivateKey type")
+
+
+def check_token_verification(token, public_key):
+    if not isinstance(public_key, VirgilPublicKey):
+        raise ValueError("public_key must be a VirgilPublicKey type")
+
+    if not token:
+        raise ValueError("Missing token to verify")
@@ -34,7 +34,11 @@
 from virgil_crypto.hashes import HashAlgorithm
 
 from virgil_crypto import VirgilCrypto
-from virgil_crypto.keys import VirgilPrivateKey, VirgilPublicKey
+from virgil_crypto.argument_checks import check_signing
+from virgil_crypto.argument_checks import check_verification
+from virgil_crypto.argument_checks import check_public_key_export
+from virgil_crypto.argument_checks import check_public_key_import
+from virgil_crypto.argument_checks import check_hashing
 
 
 class CardCrypto(object):
@@ -42,8 +46,8 @@ class CardCrypto(object):
     Class provides a cryptographic operations for Cards.
     """
 
-    def __init__(self, crypto=VirgilCrypto()):
-        self.__crypto = crypto
+    def __init__(self, crypto=None):
+        self.__crypto = crypto if crypto is not None else VirgilCrypto.default()
 
     def generate_signature(self, data, private_key):
         # type: (Union[bytes, bytearray], VirgilPrivateKey) -> bytearray
@@ -59,15 +63,7 @@ class CardCrypto(object):
         Raises:
             ValueError: if data or private key missing or malformed
         """
-        if not data:
-            raise ValueError("Missing data for signing")
-
-        if not private_key:
-            raise ValueError("Missing private key")
-
-        if not isinstance(private_key, VirgilPrivateKey):
-            raise ValueError("private_key must be a VirgilPrivateKey type")
-
+        check_signing(data, private_key)
         return self.__crypto.generate_signature(data, private_key)
 
     def verify_signature(self, signature, data, public_key):
@@ -85,15 +81,7 @@ class CardCrypto(object):
         Raises:
             ValueError: if data, signature, public key missing or malformed.
         """
-        if not signature:
-            raise ValueError("Missing signature")
-
-        if not data:
-            raise ValueError("Missing data for signature verify")
-
-        if not isinstance(public_key, VirgilPublicKey):
-            raise ValueError("public_key must be a VirgilPublicKey type")
-
+        check_verification(signature, data, public_key)
         return self.__crypto.verify_signature(
             data, signature, public_key
         )
@@ -111,10 +99,7 @@ class CardCrypto(object):
         Raises:
             ValueError: if public key missing or malformed.
         """
-        if not public_key:
-            raise ValueError("Missing public key")
-        if public_key.public_key is None or public_key.identifier is None or public_key.key_type is None:
-            raise ValueError("Public Key is not complete.")
+        check_public_key_export(public_key)
         return self.__crypto.export_public_key(public_key)
 
     def import_public_key(self, data):
@@ -130,8 +115,7 @@ class CardCrypto(object):
         Raises:
             ValueError: if key data missing
         """
-        if not data:
-            raise ValueError("Key data missing")
+        check_public_key_import(data)
         return self.__crypto.import_public_key(data)
 
     def generate_sha512(self, data):
@@ -147,8 +131,7 @@ class CardCrypto(object):
         Raises:
               ValueError: if data missed.
         """
-        if not data:
-            raise ValueError("Missed data for fingerprint generation")
+        check_hashing(data)
         return self.__crypto.compute_hash(data, HashAlgorithm.SHA512)
 
     @property
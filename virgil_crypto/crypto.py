@@ -31,15 +31,76 @@
 # STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
 # IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
-from virgil_crypto_lib.foundation import CtrDrbg, Signer, Sha512, Verifier, Aes256Gcm, RecipientCipher, KeyProvider, \
-    KeyMaterialRng, PublicKey, KeyAsn1Serializer, AlgId
-
+import functools
+import hashlib
+import io
+import os
+import threading
+import timeit
+from collections import OrderedDict, deque
+
+from virgil_crypto.errors.virgil_crypto_error import VirgilCryptoError
 from virgil_crypto.errors.virgil_crypto_error import VirgilCryptoErrors
 from virgil_crypto.keys import VirgilKeyPair
 from virgil_crypto.keys import KeyPairType
 from virgil_crypto.keys import VirgilPrivateKey
 from virgil_crypto.keys import VirgilPublicKey
+from virgil_crypto.keys import PublicKeyCache
+from virgil_crypto.keys import PublicKeyCacheStats
 from virgil_crypto.hashes import HashAlgorithm
+from virgil_crypto.message_info import read_message_info, summarize_message_info
+from virgil_crypto.pools import KeyProviderPool
+from virgil_crypto.pools import RandomPool
+from virgil_crypto.streams import AdaptiveChunkSize
+from virgil_crypto.streams import SegmentCipher
+from virgil_crypto.streams import SegmentedHeader
+from virgil_crypto.streams.mapped_file import iter_windows, map_input, map_output
+from virgil_crypto.streams.segmented_container import iter_segments, read_exactly, read_into
+from virgil_crypto.utils import foundation
+from virgil_crypto.utils import foundation_bridge
+from virgil_crypto.utils import NativeBridge
+from virgil_crypto.utils import OutputBuffer
+
+
+def _as_bytes(data):
+    if isinstance(data, (bytes, bytearray)):
+        return data
+    return bytearray(data)
+
+
+def _as_buffer(data):
+    # Buffer-protocol objects are passed to the library as they are, only
+    # sequences of ints and non-contiguous buffers are copied.
+    if isinstance(data, (bytes, bytearray)):
+        return data
+    try:
+        view = memoryview(data)
+    except TypeError:
+        return bytearray(data)
+    if not view.c_contiguous:
+        return view.tobytes()
+    if view.ndim != 1 or view.itemsize != 1:
+        return view.cast("B")
+    return data
+
+
+class _hybridmethod(object):
+    """Method that can also be called on the class like a staticmethod.
+
+    When called through the class the first argument is None.
+    """
+
+    def __init__(self, func):
+        self.__func__ = func
+        functools.update_wrapper(self, func)
+
+    def __get__(self, instance, owner):
+        func = self.__func__
+
+        @functools.wraps(func)
+        def bound(*args, **kwargs):
+            return func(instance, *args, **kwargs)
+        return bound
 
 
 class VirgilCrypto(object):
@@ -53,13 +114,29 @@ class VirgilCrypto(object):
     CUSTOM_PARAM_KEY_SIGNATURE = bytearray("VIRGIL-DATA-SIGNATURE".encode())
     CUSTOM_PARAM_KEY_SIGNER_ID = bytearray("VIRGIL-DATA-SIGNER-ID".encode())
 
-    def __init__(self, default_key_pair_type=KeyPairType.ED25519, use_sha256_fingerprints=False):
-        rng = CtrDrbg()
-        rng.setup_defaults()
-        self.rng = rng
+    DEFAULT_CHUNK_SIZE = 64 * 1024
+    ADAPTIVE_CHUNK_SIZE = "adaptive"
+
+    __key_provider_pool = KeyProviderPool()
+    __shared_random_pool = RandomPool()
+    __default_instance = None
+    __default_instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        default_key_pair_type=KeyPairType.ED25519,
+        use_sha256_fingerprints=False,
+        rng_reseed_interval=RandomPool.DEFAULT_RESEED_INTERVAL,
+        key_cache_size=0,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        return_bytes=False
+    ):
+        self.__random_pool = RandomPool(rng_reseed_interval)
+        self.__public_key_cache = PublicKeyCache(key_cache_size) if key_cache_size else None
         self.key_pair_type = default_key_pair_type
         self.use_sha256_fingerprints = use_sha256_fingerprints
-        self.chunk_size = 1024
+        self.chunk_size = chunk_size
+        self.return_bytes = return_bytes
 
     class SignatureIsNotValid(Exception):
         """Exception raised when Signature is not valid"""
@@ -69,6 +146,32 @@ class VirgilCrypto(object):
         def __str__(self):
             return "Signature is not valid"
 
+    @staticmethod
+    def default():
+        # type: () -> VirgilCrypto
+        """Gets the VirgilCrypto shared by objects created without an explicit crypto.
+
+        The instance is created on first call.
+
+        Returns:
+            Shared VirgilCrypto.
+        """
+        if VirgilCrypto.__default_instance is None:
+            with VirgilCrypto.__default_instance_lock:
+                if VirgilCrypto.__default_instance is None:
+                    VirgilCrypto.__default_instance = VirgilCrypto()
+        return VirgilCrypto.__default_instance
+
+    @property
+    def rng(self):
+        # type: () -> CtrDrbg
+        """Random owned by the current thread.
+
+        Every thread using this instance gets its own CtrDrbg, so one
+        VirgilCrypto can be shared between threads.
+        """
+        return self.__random_pool.get()
+
     @staticmethod
     def strtobytes(source):
         # type: (str) -> Tuple[int]
@@ -96,15 +199,15 @@ class VirgilCrypto(object):
         """
 
         if seed:
-            if KeyMaterialRng.KEY_MATERIAL_LEN_MIN > len(seed) > KeyMaterialRng.KEY_MATERIAL_LEN_MAX:
+            if foundation.KeyMaterialRng.KEY_MATERIAL_LEN_MIN > len(seed) > foundation.KeyMaterialRng.KEY_MATERIAL_LEN_MAX:
                 raise VirgilCryptoErrors.INVALID_SEED_SIZE
-            key_material_rng = KeyMaterialRng()
+            key_material_rng = foundation.KeyMaterialRng()
             key_material_rng.reset_key_material(seed)
             rng = key_material_rng
         else:
             rng = self.rng
 
-        key_provider = KeyProvider()
+        key_provider = foundation.KeyProvider()
 
         key_provider.set_random(rng)
 
@@ -114,14 +217,7 @@ class VirgilCrypto(object):
         key_provider.setup_defaults()
 
         private_key = key_provider.generate_private_key(key_type.alg_id)
-        public_key = private_key.extract_public_key()
-
-        key_id = self.compute_public_key_identifier(public_key)
-
-        return VirgilKeyPair(
-            private_key=VirgilPrivateKey(identifier=key_id, private_key=private_key, key_type=key_type),
-            public_key=VirgilPublicKey(identifier=key_id, public_key=public_key, key_type=key_type)
-        )
+        return self.__key_pair(private_key, key_type)
 
     def import_private_key(self, key_data):
         # type: (Union[Tuple[int], List[int]], bytearray) -> VirgilKeyPair
@@ -133,31 +229,24 @@ class VirgilCrypto(object):
         Returns:
             VirgilKeyPair.
         """
-        key_provider = KeyProvider()
-        key_provider.set_random(self.rng)
+        with self.__key_provider_pool.borrow() as key_provider:
+            private_key = key_provider.import_private_key(bytearray(key_data))
 
-        key_provider.setup_defaults()
-
-        private_key = key_provider.import_private_key(bytearray(key_data))
-
-        if private_key.alg_id() == AlgId.RSA:
+        if private_key.alg_id() == foundation.AlgId.RSA:
             key_type = KeyPairType.KeyType(private_key.alg_id(), private_key.bitlen())
         else:
             key_type = KeyPairType.KeyType(private_key.alg_id())
 
-        public_key = private_key.extract_public_key()
-
-        key_id = self.compute_public_key_identifier(public_key)
-
-        return VirgilKeyPair(
-            private_key=VirgilPrivateKey(identifier=key_id, private_key=private_key, key_type=key_type),
-            public_key=VirgilPublicKey(identifier=key_id, public_key=public_key, key_type=key_type)
-        )
+        return self.__key_pair(private_key, key_type)
 
     def import_public_key(self, key_data):
         # type: (Union[Tuple[int], List[int]]) -> VirgilPublicKey
         """Imports the Public key from material representation.
 
+        Note: If VirgilCrypto was created with key_cache_size, imported keys are
+            cached by digest of key_data and the same VirgilPublicKey object is
+            returned for the same key_data.
+
         Args:
             key_data: key material representation bytes.
 
@@ -167,22 +256,46 @@ class VirgilCrypto(object):
         if not key_data:
             raise ValueError("Key data missing")
 
-        key_provider = KeyProvider()
-        key_provider.set_random(self.rng)
-        key_provider.setup_defaults()
+        if self.__public_key_cache is None:
+            return self.__import_public_key(key_data)
 
-        public_key = key_provider.import_public_key(bytearray(key_data))
-        if public_key.alg_id() == AlgId.RSA:
+        cache_key = (self.use_sha256_fingerprints, hashlib.sha256(_as_bytes(key_data)).digest())
+        public_key = self.__public_key_cache.get(cache_key)
+        if public_key is None:
+            public_key = self.__import_public_key(key_data)
+            self.__public_key_cache.put(cache_key, public_key)
+        return public_key
+
+    def __import_public_key(self, key_data):
+        with self.__key_provider_pool.borrow() as key_provider:
+            public_key = key_provider.import_public_key(bytearray(key_data))
+
+        if public_key.alg_id() == foundation.AlgId.RSA:
             key_type = KeyPairType.KeyType(public_key.alg_id(), public_key.bitlen())
         else:
             key_type = KeyPairType.KeyType(public_key.alg_id())
 
-        key_id = self.compute_public_key_identifier(public_key)
-        return VirgilPublicKey(
-            identifier=key_id,
+        public_key_der = self.__export_native_public_key(public_key)
+        virgil_public_key = VirgilPublicKey(
+            identifier=self.__identifier_from_der(public_key_der),
             public_key=public_key,
             key_type=key_type
         )
+        self.__cache_public_key_info(virgil_public_key, public_key_der, {})
+        return virgil_public_key
+
+    def clear_key_cache(self):
+        """Drops all public keys cached by import_public_key."""
+        if self.__public_key_cache is not None:
+            self.__public_key_cache.clear()
+
+    @property
+    def key_cache_stats(self):
+        # type: () -> PublicKeyCacheStats
+        """Hit, miss and eviction counters of the import_public_key cache."""
+        if self.__public_key_cache is None:
+            return PublicKeyCacheStats(hits=0, misses=0, evictions=0, size=0, max_size=0)
+        return self.__public_key_cache.stats
 
     @staticmethod
     def export_private_key(private_key):
@@ -196,12 +309,8 @@ class VirgilCrypto(object):
         Returns:
             Private key in DER format
         """
-        key_provider = KeyProvider()
-        rand = CtrDrbg()
-        key_provider.set_random(rand)
-        key_provider.setup_defaults()
-
-        return key_provider.export_private_key(private_key.private_key)
+        with VirgilCrypto.__key_provider_pool.borrow() as key_provider:
+            return key_provider.export_private_key(private_key.private_key)
 
     @staticmethod
     def export_public_key(public_key):
@@ -214,12 +323,9 @@ class VirgilCrypto(object):
         Returns:
             Key material representation bytes.
         """
-        key_provider = KeyProvider()
-        rand = CtrDrbg()
-        key_provider.set_random(rand)
-        key_provider.setup_defaults()
-
-        return key_provider.export_public_key(public_key.public_key)
+        if public_key._public_key_der is None:
+            public_key._public_key_der = VirgilCrypto.__export_native_public_key(public_key.public_key)
+        return bytearray(public_key._public_key_der)
 
     @staticmethod
     def extract_public_key(private_key):
@@ -232,50 +338,95 @@ class VirgilCrypto(object):
         Returns:
             Exported public key.
         """
-        return VirgilPublicKey(
+        public_key = VirgilPublicKey(
             identifier=private_key.identifier,
             public_key=private_key.private_key.extract_public_key(),
             key_type=private_key.key_type
         )
+        public_key._public_key_der = private_key._public_key_der
+        public_key._identifiers = private_key._identifiers
+        return public_key
 
     def encrypt(self, data, *recipients):
-        # type: (Union[Tuple[int], List[int], bytearray], List[VirgilPublicKey]) -> Union[Tuple[int], bytearray]
+        # type: (Union[bytes, bytearray, memoryview, Tuple[int], List[int]], List[VirgilPublicKey]) -> Union[bytearray, bytes]
         """Encrypts the specified data using recipients Public keys.
 
         Args:
-            data: raw data bytes for encryption.
+            data: raw data bytes for encryption. Bytes-like objects (bytes,
+                bytearray, memoryview, mmap) are used without copying.
             recipients: list of recipients' public keys.
 
         Returns:
-            Encrypted data bytes.
+            Encrypted data bytes, bytes if return_bytes is set.
         """
-        aes_gcm = Aes256Gcm()
-        cipher = RecipientCipher()
-        cipher.set_encryption_cipher(aes_gcm)
-        cipher.set_random(self.rng)
+        cipher = self.__encryption_cipher(recipients)
+        cipher.start_encryption()
+        return self.__result(self.__encrypt(cipher, _as_buffer(data)))
 
-        for public_key in recipients:
-            cipher.add_key_recipient(public_key.identifier, public_key.public_key)
+    def encrypt_into(self, data, output, *recipients):
+        # type: (Union[bytes, bytearray, memoryview, Tuple[int], List[int]], Union[bytearray, memoryview], List[VirgilPublicKey]) -> int
+        """Encrypts the specified data using recipients Public keys into a caller supplied buffer.
 
-        cipher.start_encryption()
-        result = cipher.pack_message_info()
-        result += cipher.process_encryption(bytearray(data))
-        result += cipher.finish_encryption()
+        Args:
+            data: raw data bytes for encryption. Bytes-like objects are used without copying.
+            output: writable bytes-like object (bytearray, memoryview, writable mmap)
+                receiving the encrypted data from its beginning.
+            recipients: list of recipients' public keys.
 
-        return result
+        Returns:
+            Number of bytes written to output.
+
+        Raises:
+            ValueError: if output is too small, nothing is written then.
+                The message tells the needed size.
+        """
+        cipher = self.__encryption_cipher(recipients)
+        cipher.start_encryption()
+        return len(self.__encrypt(cipher, _as_buffer(data), OutputBuffer(storage=output)))
 
     def decrypt(self, data, private_key):
-        # type: (Union[Tuple[int], List[int]], VirgilPrivateKey) -> Tuple[int]
+        # type: (Union[bytes, bytearray, memoryview, Tuple[int], List[int]], VirgilPrivateKey) -> Union[bytearray, bytes]
         """Decrypts the specified data using Private key.
 
         Args:
-            data: encrypted data bytes for decryption.
+            data: encrypted data bytes for decryption. Bytes-like objects
+                are used without copying.
+            private_key: private key for decryption.
+
+        Returns:
+            Decrypted data bytes, bytes if return_bytes is set.
+        """
+        cipher = foundation.RecipientCipher()
+        cipher.set_random(self.rng)
+
+        cipher.start_decryption_with_key(
+            private_key.identifier,
+            private_key.private_key,
+            bytearray()
+        )
+        return self.__result(self.__decrypt(cipher, _as_buffer(data)))
+
+    def decrypt_into(self, data, output, private_key):
+        # type: (Union[bytes, bytearray, memoryview, Tuple[int], List[int]], Union[bytearray, memoryview], VirgilPrivateKey) -> int
+        """Decrypts the specified data using Private key into a caller supplied buffer.
+
+        Note: Decrypted data is always shorter than the encrypted data. An
+            output of len(data) bytes is written directly, smaller outputs
+            that still fit the decrypted data get it through a temporary buffer.
+
+        Args:
+            data: encrypted data bytes for decryption. Bytes-like objects are used without copying.
+            output: writable bytes-like object (bytearray, memoryview, writable mmap)
+                receiving the decrypted data from its beginning.
             private_key: private key for decryption.
 
         Returns:
-            Decrypted data bytes.
+            Number of bytes written to output.
+
+        Raises:
+            ValueError: if output is too small. Output content is undefined then.
         """
-        cipher = RecipientCipher()
+        cipher = foundation.RecipientCipher()
         cipher.set_random(self.rng)
 
         cipher.start_decryption_with_key(
@@ -283,28 +434,27 @@ class VirgilCrypto(object):
             private_key.private_key,
             bytearray()
         )
-        result = bytearray()
-        result += cipher.process_decryption(bytearray(data))
-        result += cipher.finish_decryption()
-        return result
+        return len(self.__decrypt(cipher, _as_buffer(data), OutputBuffer(storage=output)))
 
     def sign_and_encrypt(self, data, private_key, *recipients):
-        # type: (Union[Tuple[int], List[int], bytearray], VirgilPrivateKey, List[VirgilPublicKey]) -> Union[Tuple[int], bytearray]
+        # type: (Union[bytes, bytearray, memoryview, Tuple[int], List[int]], VirgilPrivateKey, List[VirgilPublicKey]) -> Union[bytearray, bytes]
         """Signs and encrypts the data.
 
         Args:
-            data: data bytes for signing and encryption.
+            data: data bytes for signing and encryption. Bytes-like objects
+                are used without copying.
             private_key: sender private key
             recipients: list of recipients' public keys.
                 Used for data encryption.
 
         Returns:
-            Signed and encrypted data bytes.
+            Signed and encrypted data bytes, bytes if return_bytes is set.
         """
-        signature = self.generate_signature(bytearray(data), private_key)
+        data = _as_buffer(data)
+        signature = self.generate_signature(data, private_key)
 
-        aes_gcm = Aes256Gcm()
-        cipher = RecipientCipher()
+        aes_gcm = foundation.Aes256Gcm()
+        cipher = foundation.RecipientCipher()
 
         cipher.set_encryption_cipher(aes_gcm)
         cipher.set_random(self.rng)
@@ -317,35 +467,30 @@ class VirgilCrypto(object):
         cp.add_data(VirgilCrypto.CUSTOM_PARAM_KEY_SIGNER_ID, private_key.identifier)
 
         cipher.start_encryption()
-        result = cipher.pack_message_info()
-        result += cipher.process_encryption(bytearray(data))
-        result += cipher.finish_encryption()
-
-        return result
+        return self.__result(self.__encrypt(cipher, data))
 
     def decrypt_and_verify(self, data, private_key, signers_public_keys):
-        # type: (Union[Tuple[int], List[int], bytearray], VirgilPrivateKey, Union[List[VirgilPublicKey], VirgilPublicKey]) -> Union[Tuple[int], bytearray]
+        # type: (Union[bytes, bytearray, memoryview, Tuple[int], List[int]], VirgilPrivateKey, Union[List[VirgilPublicKey], VirgilPublicKey]) -> Union[bytearray, bytes]
         """Decrypts and verifies the data.
 
         Args:
-            data: encrypted data bytes.
+            data: encrypted data bytes. Bytes-like objects are used without copying.
             private_key: private key for decryption.
             signers_public_keys: List of possible signers public keys.
                                  WARNING: data should have signature of ANY public key from list.
+                                 For large signer sets pass a PublicKeyIndex or a mapping
+                                 of bytes identifiers to public keys, looked up in constant time.
         Returns:
-            Decrypted data bytes.
+            Decrypted data bytes, bytes if return_bytes is set.
 
         Raises:
             VirgilCryptoError: if signature is not verified.
         """
 
-        cipher = RecipientCipher()
+        cipher = foundation.RecipientCipher()
 
         cipher.start_decryption_with_key(private_key.identifier, private_key.private_key, bytearray())
-        result = bytearray()
-
-        result += cipher.process_decryption(bytearray(data))
-        result += cipher.finish_decryption()
+        output = self.__decrypt(cipher, _as_buffer(data))
 
         if isinstance(signers_public_keys, VirgilPublicKey):
             signer_public_key = signers_public_keys
@@ -355,72 +500,180 @@ class VirgilCrypto(object):
             except Exception:
                 raise VirgilCryptoErrors.SIGNER_NOT_FOUND
 
-            filtered_public_keys = list(filter(lambda x: x.identifier == signer_id, signers_public_keys))
-            if not filtered_public_keys:
+            if hasattr(signers_public_keys, "get"):
+                signer_public_key = signers_public_keys.get(bytes(signer_id))
+            else:
+                signer_public_key = next((x for x in signers_public_keys if x.identifier == signer_id), None)
+            if signer_public_key is None:
                 raise VirgilCryptoErrors.SIGNER_NOT_FOUND
 
-            signer_public_key = filtered_public_keys[0]
-
         signature = bytearray(cipher.custom_params().find_data(VirgilCrypto.CUSTOM_PARAM_KEY_SIGNATURE))
 
-        is_valid = self.verify_signature(result, signature, signer_public_key)
+        is_valid = self.verify_signature(output.view(), signature, signer_public_key)
         if not is_valid:
             raise VirgilCryptoErrors.SIGNATURE_NOT_VERIFIED
-        return result
+        return self.__result(output)
 
     @staticmethod
-    def generate_signature(data, private_key):
-        # type: (Union[Tuple[int], List[int], bytearray], VirgilPrivateKey) -> Union[Tuple[int], bytearray]
+    def inspect_message_info(data_or_stream):
+        # type: (Union[bytes, bytearray, memoryview, io.IOBase]) -> MessageInfoSummary
+        """Lists recipients and custom params of encrypted data without decrypting it.
+
+        Args:
+            data_or_stream: data encrypted by encrypt, sign_and_encrypt or encrypt_stream,
+                or a stream positioned at its start. Only the message info is read
+                from a stream, it is left positioned at the encrypted content.
+
+        Returns:
+            MessageInfoSummary with recipient identifiers, custom param keys
+            and the length of the message info in bytes.
+
+        Raises:
+            VirgilCryptoError: if data doesn't start with message info.
+        """
+        if not hasattr(data_or_stream, "read"):
+            data_or_stream = _as_buffer(data_or_stream)
+        return summarize_message_info(read_message_info(data_or_stream))
+
+    @_hybridmethod
+    def generate_signature(self, data, private_key):
+        # type: (Union[bytes, bytearray, memoryview, Tuple[int], List[int]], VirgilPrivateKey) -> bytearray
         """Generates digital signature of data using private key
 
+        Note: Can be called on the class as well. Instances sign with their
+            own rng, class calls use a per-thread random shared by the class.
+
         Args:
-            data: raw data bytes for signing.
+            data: raw data bytes for signing. Bytes-like objects are used without copying.
             private_key: private key for signing.
 
         Returns:
             Signature bytes.
         """
-        signer = Signer()
-        rand = CtrDrbg()
-        rand.setup_defaults()
-        signer.set_hash(Sha512())
-        signer.set_random(rand)
+        signer = foundation.Signer()
+        signer.set_hash(foundation.Sha512())
+        signer.set_random(VirgilCrypto.__shared_random_pool.get() if self is None else self.rng)
         signer.reset()
-        signer.append_data(bytearray(data))
+        NativeBridge.instance().signer_append_data(signer, _as_buffer(data))
         signature = signer.sign(private_key.private_key)
         return signature
 
+    def generate_signatures_many(self, records, private_key):
+        # type: (Iterable[Union[Tuple[int], List[int], bytearray]], VirgilPrivateKey) -> Iterator[bytearray]
+        """Generates digital signatures for each of records using private key.
+
+        One Signer and one hash context are reused for the whole batch and
+        signatures are produced lazily, so records can be an unbounded stream.
+
+        Args:
+            records: iterable of raw data bytes for signing.
+            private_key: private key for signing.
+
+        Returns:
+            Generator yielding signature bytes in the order of records.
+        """
+        signer = foundation.Signer()
+        signer.set_hash(foundation.Sha512())
+        signer.set_random(self.rng)
+        native_private_key = private_key.private_key
+        native = NativeBridge.instance()
+
+        for data in records:
+            signer.reset()
+            native.signer_append_data(signer, _as_buffer(data))
+            yield signer.sign(native_private_key)
+
     @staticmethod
     def verify_signature(data, signature, public_key):
-        # type: (Union[Tuple[int], List[int], bytearray], Union[Tuple[int], List[int], bytearray], VirgilPublicKey) -> bool
+        # type: (Union[bytes, bytearray, memoryview, Tuple[int], List[int]], Union[bytes, bytearray, Tuple[int], List[int]], VirgilPublicKey) -> bool
         """Verifies the specified signature using original data and signer's public key.
 
         Args:
-            data: original data bytes for verification.
+            data: original data bytes for verification. Bytes-like objects are used without copying.
             signature: signature bytes for verification.
             public_key: signer public key for verification.
 
         Returns:
             True if signature is valid, False otherwise.
         """
-        verifier = Verifier()
-        verifier.reset(bytearray(signature))
-        verifier.append_data(bytearray(data))
+        verifier = foundation.Verifier()
+        verifier.reset(_as_bytes(signature))
+        NativeBridge.instance().verifier_append_data(verifier, _as_buffer(data))
         return verifier.verify(public_key.public_key)
 
-    def encrypt_stream(self, input_stream, output_stream, *recipients):
-        # type: (io.IOBase, io.IOBase, List[VirgilPublicKey]) -> None
+    @staticmethod
+    def verify_signatures_many(items, max_workers=None):
+        # type: (Iterable[Tuple[bytearray, bytearray, VirgilPublicKey]], Optional[int]) -> bytearray
+        """Verifies a batch of signatures.
+
+        Items are grouped by signer identifier, so signatures of one signer
+        are verified together by one Verifier even if they come with
+        different public key objects. Every signature is still verified with
+        the public key of its own item. Malformed signatures are reported as
+        not valid instead of interrupting the batch.
+
+        Args:
+            items: iterable of (data, signature, public key) triples.
+            max_workers: number of threads to spread the groups over.
+                Verification runs in the calling thread if not set.
+
+        Returns:
+            Bytearray with 1 for each valid signature and 0 otherwise,
+            in the order of items.
+        """
+        items = list(items)
+        results = bytearray(len(items))
+
+        groups = OrderedDict()
+        for index, (_, _, public_key) in enumerate(items):
+            groups.setdefault(bytes(public_key.identifier), []).append(index)
+
+        native = NativeBridge.instance()
+
+        def verify_groups(groups_part):
+            verifier = foundation.Verifier()
+            for indexes in groups_part:
+                for index in indexes:
+                    data, signature, public_key = items[index]
+                    try:
+                        verifier.reset(_as_bytes(signature))
+                        native.verifier_append_data(verifier, _as_buffer(data))
+                        results[index] = verifier.verify(public_key.public_key)
+                    except foundation_bridge.VirgilCryptoFoundationError:
+                        results[index] = False
+
+        groups = list(groups.values())
+        if not max_workers or max_workers < 2 or len(groups) < 2:
+            verify_groups(groups)
+            return results
+
+        from concurrent.futures import ThreadPoolExecutor
+        workers = min(max_workers, len(groups))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(verify_groups, groups[i::workers]) for i in range(workers)]:
+                future.result()
+        return results
+
+    def encrypt_stream(self, input_stream, output_stream, *recipients, **kwargs):
+        # type: (io.IOBase, io.IOBase, List[VirgilPublicKey], Any) -> None
         """Encrypts the specified stream using recipients Public keys.
 
         Args:
             input_stream: readable stream containing input data.
             output_stream: writable stream for output.
             recipients: list of recipients' public keys.
+            chunk_size: keyword only, size of chunks read from input_stream
+                or ADAPTIVE_CHUNK_SIZE. Defaults to chunk_size of the instance.
+            pipeline: keyword only, StreamPipeline reading and writing the
+                streams on its own threads. By default chunks are read,
+                encrypted and written one after another.
 
         """
+        pipeline = kwargs.pop("pipeline", None)
+        chunk_size = self.__pop_chunk_size(kwargs)
 
-        aes_gcm = Aes256Gcm()
-        cipher = RecipientCipher()
+        aes_gcm = foundation.Aes256Gcm()
+        cipher = foundation.RecipientCipher()
 
         cipher.set_encryption_cipher(aes_gcm)
         cipher.set_random(self.rng)
@@ -437,82 +690,421 @@ class VirgilCrypto(object):
 
         output_stream.write(msg_info)
 
-        self.__for_each_chunk_output(input_stream, output_stream, cipher.process_encryption)
-
-        finish = cipher.finish_encryption()
+        native = NativeBridge.instance()
+        output = OutputBuffer()
+        self.__for_each_chunk_output(
+            input_stream, output_stream, functools.partial(native.process_encryption, cipher), output, chunk_size,
+            pipeline
+        )
 
-        output_stream.write(finish)
+        native.finish_encryption(cipher, output)
+        self.__write(output_stream, output)
 
-    def decrypt_stream(self, input_stream, output_stream, private_key):
-        # type: (io.IOBase, io.IOBase, VirgilPrivateKey) -> None
+    def decrypt_stream(self, input_stream, output_stream, private_key, chunk_size=None, pipeline=None):
+        # type: (io.IOBase, io.IOBase, VirgilPrivateKey, Union[int, str, None], Optional[StreamPipeline]) -> None
         """Decrypts the specified stream using Private key.
 
         Args:
             input_stream: readable stream containing input data.
             output_stream: writable stream for output.
             private_key: private key for decryption.
+            chunk_size: size of chunks read from input_stream or ADAPTIVE_CHUNK_SIZE.
+                Defaults to chunk_size of the instance.
+            pipeline: StreamPipeline reading and writing the streams on its own threads.
 
         """
-        cipher = RecipientCipher()
+        cipher = foundation.RecipientCipher()
         cipher.start_decryption_with_key(
             private_key.identifier,
             private_key.private_key,
             bytearray()
         )
 
-        self.__for_each_chunk_output(input_stream, output_stream, cipher.process_decryption)
+        native = NativeBridge.instance()
+        output = OutputBuffer()
+        self.__for_each_chunk_output(
+            input_stream, output_stream, functools.partial(native.process_decryption, cipher), output, chunk_size,
+            pipeline
+        )
+
+        native.finish_decryption(cipher, output)
+        self.__write(output_stream, output)
+
+    def encrypt_iter(self, chunks, *recipients):
+        # type: (Iterable[Union[bytes, bytearray, memoryview]], List[VirgilPublicKey]) -> Iterator[Union[bytearray, bytes]]
+        """Encrypts chunks of data using recipients Public keys.
 
-        finish = cipher.finish_decryption()
-        output_stream.write(finish)
+        Encryption runs lazily while the result is iterated, so data from
+        chunked HTTP bodies or message queues can be piped through without
+        holding it in memory.
+
+        Args:
+            chunks: iterable of raw data chunks.
+            recipients: list of recipients' public keys.
 
-    def generate_stream_signature(self, input_stream, private_key):
-        # type: (Type[io.IOBase], VirgilPrivateKey) -> Tuple(*int)
+        Returns:
+            Generator yielding encrypted data chunks, bytes if return_bytes is set.
+        """
+        cipher = self.__encryption_cipher(recipients)
+        cipher.start_encryption()
+        native = NativeBridge.instance()
+        output = OutputBuffer()
+        output.append(cipher.pack_message_info())
+        yield self.__take_chunk(output)
+
+        for chunk in chunks:
+            native.process_encryption(cipher, _as_buffer(chunk), output)
+            if len(output):
+                yield self.__take_chunk(output)
+
+        native.finish_encryption(cipher, output)
+        yield self.__take_chunk(output)
+
+    def decrypt_iter(self, chunks, private_key):
+        # type: (Iterable[Union[bytes, bytearray, memoryview]], VirgilPrivateKey) -> Iterator[Union[bytearray, bytes]]
+        """Decrypts chunks of encrypted data using Private key.
+
+        Note: The library releases decrypted data only after the whole
+            message is authenticated, so plaintext is yielded at the end.
+
+        Args:
+            chunks: iterable of encrypted data chunks.
+            private_key: private key for decryption.
+
+        Returns:
+            Generator yielding decrypted data chunks, bytes if return_bytes is set.
+        """
+        cipher = foundation.RecipientCipher()
+        cipher.set_random(self.rng)
+        cipher.start_decryption_with_key(
+            private_key.identifier,
+            private_key.private_key,
+            bytearray()
+        )
+        native = NativeBridge.instance()
+        output = OutputBuffer()
+
+        for chunk in chunks:
+            native.process_decryption(cipher, _as_buffer(chunk), output)
+            if len(output):
+                yield self.__take_chunk(output)
+
+        native.finish_decryption(cipher, output)
+        if len(output):
+            yield self.__take_chunk(output)
+
+    def encrypt_file(self, src_path, dst_path, *recipients):
+        # type: (str, str, List[VirgilPublicKey]) -> None
+        """Encrypts a file into another file using recipients public keys.
+
+        The result is the same as of encrypt and encrypt_stream. The source is
+        memory mapped and passed to the library in large windows, the
+        destination is created at its final size and mapped, so no data is
+        copied through Python objects.
+
+        The result is written to a temporary file next to dst_path, which
+        replaces dst_path once it is complete. A new destination is readable
+        by its owner only.
+
+        Args:
+            src_path: path of the file to encrypt.
+            dst_path: path of the encrypted file, replaced if it exists.
+            recipients: list of recipients' public keys.
+
+        Raises:
+            ValueError: if dst_path is the source file.
+        """
+        cipher = self.__encryption_cipher(recipients)
+        cipher.start_encryption()
+        native = NativeBridge.instance()
+
+        def encrypt(data, output):
+            output.append(cipher.pack_message_info())
+            for window in iter_windows(data):
+                native.process_encryption(cipher, window, output)
+            native.finish_encryption(cipher, output)
+
+        self.__process_file(
+            src_path, dst_path,
+            lambda data: cipher.message_info_len() + len(data) + foundation.Aes256Gcm.AUTH_TAG_LEN,
+            encrypt
+        )
+
+    def decrypt_file(self, src_path, dst_path, private_key):
+        # type: (str, str, VirgilPrivateKey) -> None
+        """Decrypts a file encrypted by encrypt_file, encrypt or encrypt_stream into another file.
+
+        Note: The library releases decrypted data only after authenticating
+            all of it, so it holds the whole plaintext in memory till then.
+
+        Args:
+            src_path: path of the encrypted file.
+            dst_path: path of the decrypted file, replaced if it exists once
+                decryption succeeds, see encrypt_file.
+            private_key: private key for decryption.
+
+        Raises:
+            ValueError: if dst_path is the source file.
+            VirgilCryptoError: if the file doesn't start with message info
+                or is too short to hold the authentication tag.
+        """
+        cipher = foundation.RecipientCipher()
+        cipher.start_decryption_with_key(private_key.identifier, private_key.private_key, bytearray())
+        native = NativeBridge.instance()
+
+        def decrypt(data, output):
+            # The library aborts finishing data without message info or tag.
+            if len(data) < len(read_message_info(data)) + foundation.Aes256Gcm.AUTH_TAG_LEN:
+                raise VirgilCryptoErrors.ENCRYPTED_DATA_TRUNCATED
+            # The library copies the plaintext it holds every time it grows,
+            # so the whole mapping goes in at once rather than in windows.
+            native.process_decryption(cipher, data, output)
+            native.finish_decryption(cipher, output)
+
+        # The plaintext and the library's estimates fit in the encrypted size,
+        # the file is truncated to the plaintext afterwards.
+        self.__process_file(src_path, dst_path, len, decrypt)
+
+    def encrypt_segmented(self, input_stream, output_stream, *recipients, **kwargs):
+        # type: (io.IOBase, io.IOBase, List[VirgilPublicKey], Any) -> None
+        """Encrypts the stream into a segmented container for the recipients.
+
+        Unlike the output of encrypt_stream, a container can be decrypted
+        partially, see decrypt_range. The format is described in SegmentedHeader.
+
+        Args:
+            input_stream: readable stream containing input data.
+            output_stream: writable stream for the container.
+            recipients: list of recipients' public keys.
+            segment_size: keyword only, plaintext bytes per segment.
+                Defaults to SegmentedHeader.DEFAULT_SEGMENT_SIZE.
+            max_workers: keyword only, number of threads encrypting segments
+                in parallel. Segments are encrypted in the calling thread if not set.
+            checkpoint_interval: keyword only, number of segments after which
+                output_stream is flushed and synced to disk, making the written
+                segments a checkpoint for resume_encrypt_segmented.
+        """
+        segment_size = kwargs.pop("segment_size", SegmentedHeader.DEFAULT_SEGMENT_SIZE)
+        max_workers, checkpoint_interval = self.__pop_segmented_options(kwargs)
+
+        data_key = self.generate_random_data(SegmentedHeader.KEY_LEN)
+        header = SegmentedHeader(
+            segment_size,
+            self.generate_random_data(SegmentedHeader.NONCE_PREFIX_LEN),
+            self.encrypt(data_key, *recipients)
+        )
+
+        output_stream.write(header.serialize())
+        self.__process_segments(
+            input_stream, output_stream, segment_size,
+            lambda: SegmentCipher(data_key, header).encrypt_segment, max_workers,
+            checkpoint_interval=checkpoint_interval
+        )
+
+    def resume_encrypt_segmented(self, input_stream, partial_output, private_key, **kwargs):
+        # type: (io.IOBase, io.IOBase, VirgilPrivateKey, Any) -> int
+        """Continues an interrupted encrypt_segmented.
+
+        Every segment is a checkpoint: the segments of partial_output are
+        authenticated from the start and the output is truncated after the
+        last good one. Encryption continues with the input that follows it.
+
+        Note: The input must be the same bytes encryption was started with.
+            Segments after the last good one are encrypted again under the
+            data key and nonces they were first encrypted with, so different
+            data would reuse AES-GCM nonces. Every good segment is decrypted
+            and compared with the input, and resuming is refused on the
+            first difference, so the input already encrypted is read again.
+
+        Args:
+            input_stream: the input encryption was started with, positioned at its start.
+            partial_output: seekable, readable and writable stream positioned at
+                the interrupted container.
+            private_key: private key of a recipient of the container, which
+                unwraps the data key. Adding the encrypting party's own key to
+                the recipients lets it resume its encryptions.
+            max_workers: keyword only, see encrypt_segmented.
+            checkpoint_interval: keyword only, see encrypt_segmented.
+
+        Returns:
+            Number of input bytes found already encrypted.
+
+        Raises:
+            VirgilCryptoError: if partial_output has no complete header,
+                encryption has to start over, or if the input differs from
+                the encrypted data.
+            VirgilCryptoFoundationError: if private_key is not a recipient.
+        """
+        max_workers, checkpoint_interval = self.__pop_segmented_options(kwargs)
+
+        start = partial_output.tell()
+        header = SegmentedHeader.read(partial_output)
+        data_key = self.__unwrap_data_key(header, private_key)
+        segment_cipher = SegmentCipher(data_key, header)
+
+        encrypted_segment = bytearray(header.encrypted_segment_size)
+        segment = OutputBuffer(header.encrypted_segment_size)
+        good_segments = 0
+        good_size = len(header)
+        done = False
+        while not done:
+            read = read_into(partial_output, encrypted_segment)
+            if read < header.TAG_LEN:
+                break
+            # A full segment is the last one only if the data ended with it.
+            for final in ((False, True) if read == len(encrypted_segment) else (True,)):
+                try:
+                    segment_cipher.decrypt_segment(good_segments, memoryview(encrypted_segment)[:read], final, segment)
+                except foundation_bridge.VirgilCryptoFoundationError:
+                    continue
+                done = final
+                break
+            else:
+                break
+            # Checked before anything is written, the output is left as it is.
+            if read_exactly(input_stream, len(segment)) != segment.view():
+                raise VirgilCryptoErrors.RESUMED_INPUT_MISMATCH
+            good_segments += 1
+            good_size += read
+            segment.clear()
+
+        partial_output.seek(start + good_size)
+        partial_output.truncate()
+        if done:
+            return header.plaintext_size(good_size)
+
+        self.__process_segments(
+            input_stream, partial_output, header.segment_size,
+            lambda: SegmentCipher(data_key, header).encrypt_segment, max_workers,
+            first_index=good_segments, checkpoint_interval=checkpoint_interval
+        )
+        return good_segments * header.segment_size
+
+    def decrypt_segmented(self, input_stream, output_stream, private_key, max_workers=None):
+        # type: (io.IOBase, io.IOBase, VirgilPrivateKey, Optional[int]) -> None
+        """Decrypts a whole segmented container.
+
+        Note: Every segment is authenticated before it is written, a container
+            truncated at a segment boundary is detected after the preceding
+            segments are written out.
+
+        Args:
+            input_stream: readable stream positioned at the container.
+            output_stream: writable stream for decrypted data.
+            private_key: private key of a recipient of the container.
+            max_workers: number of threads decrypting segments in parallel.
+                Segments are decrypted in the calling thread if not set.
+
+        Raises:
+            VirgilCryptoError: if input_stream doesn't contain a segmented container.
+            VirgilCryptoFoundationError: if the container was modified or truncated.
+        """
+        header = SegmentedHeader.read(input_stream)
+        data_key = self.__unwrap_data_key(header, private_key)
+        self.__process_segments(
+            input_stream, output_stream, header.encrypted_segment_size,
+            lambda: SegmentCipher(data_key, header).decrypt_segment, max_workers
+        )
+
+    def decrypt_range(self, stream, offset, length, private_key):
+        # type: (io.IOBase, int, int, VirgilPrivateKey) -> Union[bytearray, bytes]
+        """Decrypts a part of a segmented container reading only the segments it spans.
+
+        Args:
+            stream: seekable stream positioned at the container, which lasts till the end of the stream.
+            offset: position of the part in the plaintext.
+            length: size of the part, the part ends early at the end of the plaintext.
+            private_key: private key of a recipient of the container.
+
+        Returns:
+            Decrypted part, bytes if return_bytes is set.
+
+        Raises:
+            VirgilCryptoError: if stream doesn't contain a segmented container.
+            VirgilCryptoFoundationError: if a read segment was modified.
+        """
+        if offset < 0 or length < 0:
+            raise ValueError("Offset and length can't be negative")
+        start = stream.tell()
+        header = SegmentedHeader.read(stream)
+        stream.seek(0, io.SEEK_END)
+        container_size = stream.tell() - start
+        segment_count = header.segment_count(container_size)
+        end = min(offset + length, header.plaintext_size(container_size))
+
+        output = OutputBuffer()
+        if offset >= end:
+            return self.__result(output)
+
+        segment_cipher = SegmentCipher(self.__unwrap_data_key(header, private_key), header)
+        encrypted_segment = bytearray(header.encrypted_segment_size)
+        segment = OutputBuffer(header.encrypted_segment_size)
+        for index in range(offset // header.segment_size, (end - 1) // header.segment_size + 1):
+            stream.seek(start + header.segment_offset(index))
+            read = read_into(stream, encrypted_segment)
+            segment_cipher.decrypt_segment(
+                index, memoryview(encrypted_segment)[:read], index == segment_count - 1, segment
+            )
+            segment_start = index * header.segment_size
+            output.append(segment.view()[max(offset - segment_start, 0):end - segment_start])
+            segment.clear()
+        return self.__result(output)
+
+    def generate_stream_signature(self, input_stream, private_key, chunk_size=None, pipeline=None):
+        # type: (Type[io.IOBase], VirgilPrivateKey, Union[int, str, None], Optional[StreamPipeline]) -> Tuple(*int)
         """Signs the specified stream using Private key.
 
         Args:
             input_stream: readable stream containing input data.
             private_key: private key for signing.
+            chunk_size: size of chunks read from input_stream or ADAPTIVE_CHUNK_SIZE.
+                Defaults to chunk_size of the instance.
+            pipeline: StreamPipeline reading the stream on its own thread.
 
         Returns:
             Signature bytes.
         """
-        signer = Signer()
-        rand = CtrDrbg()
-        rand.setup_defaults()
-        signer.set_random(rand)
-        signer.set_hash(Sha512())
+        signer = foundation.Signer()
+        signer.set_random(self.rng)
+        signer.set_hash(foundation.Sha512())
         signer.reset()
 
-        self.__for_each_chunk_input(input_stream, signer.append_data)
+        self.__for_each_chunk_input(
+            input_stream, functools.partial(NativeBridge.instance().signer_append_data, signer), chunk_size, pipeline
+        )
 
         signature = signer.sign(private_key.private_key)
         return signature
 
-    def verify_stream_signature(self, input_stream, signature, signer_public_key):
-        # type: (io.IOBase, Union[Tuple[int], List[int], bytearray], VirgilPublicKey) -> bool
+    def verify_stream_signature(self, input_stream, signature, signer_public_key, chunk_size=None):
+        # type: (io.IOBase, Union[Tuple[int], List[int], bytearray], VirgilPublicKey, Union[int, str, None]) -> bool
         """Verifies the specified signature using original stream and signer's Public key.
 
         Args:
             input_stream: readable stream containing input data.
             signature: signature bytes for verification.
             signer_public_key: signer public key for verification.
+            chunk_size: size of chunks read from input_stream or ADAPTIVE_CHUNK_SIZE.
+                Defaults to chunk_size of the instance.
 
         Returns:
             True if signature is valid, False otherwise.
         """
-        verifier = Verifier()
+        verifier = foundation.Verifier()
         verifier.reset(bytearray(signature))
 
-        self.__for_each_chunk_input(input_stream, verifier.append_data)
+        self.__for_each_chunk_input(
+            input_stream, functools.partial(NativeBridge.instance().verifier_append_data, verifier), chunk_size
+        )
         return verifier.verify(signer_public_key.public_key)
 
     @staticmethod
     def compute_hash(data, algorithm=HashAlgorithm.SHA512):
-        # type: (Union[Tuple[int], List[int], bytearray], int) -> Tuple[int]
+        # type: (Union[bytes, bytearray, memoryview, Tuple[int], List[int]], int) -> bytearray
         """Computes the hash of specified data.
 
         Args:
-            data: data bytes for fingerprint calculation.
+            data: data bytes for fingerprint calculation. Bytes-like objects are used without copying.
             algorithm: hashing algorithm.
                 The possible values can be found in HashAlgorithm enum.
 
@@ -520,30 +1112,38 @@ class VirgilCrypto(object):
             Hash bytes.
         """
         native_algorithm = HashAlgorithm.convert_to_native(algorithm)
-        native_hasher = native_algorithm()
-        return native_hasher.hash(bytearray(data))
+        output = OutputBuffer()
+        NativeBridge.instance().hash(native_algorithm, _as_buffer(data), output)
+        return output.detach()
 
     def compute_public_key_identifier(self, public_key):
-        # type: (PublicKey) -> Tuple[int]
+        # type: (Union[PublicKey, VirgilPublicKey, VirgilPrivateKey]) -> Tuple[int]
         """Computes public key identifier.
 
         Note: Takes first 8 bytes of SHA512 of public key DER if use_sha256_fingerprints=False
             and SHA256 of public key der if use_sha256_fingerprints=True
 
         Args:
-            public_key: public key for compute.
+            public_key: public key for compute. For VirgilPublicKey and VirgilPrivateKey
+                the public key DER and the identifier are cached on the key.
 
         Returns:
             Public key identifier.
         """
-        key_provider = KeyProvider()
-        key_provider.setup_defaults()
-
-        public_key_data = key_provider.export_public_key(public_key)
-
-        if self.use_sha256_fingerprints:
-            return self.compute_hash(public_key_data, HashAlgorithm.SHA256)
-        return self.compute_hash(public_key_data)[:8]
+        if not isinstance(public_key, (VirgilPublicKey, VirgilPrivateKey)):
+            return self.__identifier_from_der(self.__export_native_public_key(public_key))
+
+        identifier = public_key._identifiers.get(self.use_sha256_fingerprints)
+        if identifier is None:
+            if public_key._public_key_der is None:
+                if isinstance(public_key, VirgilPrivateKey):
+                    native_public_key = public_key.private_key.extract_public_key()
+                else:
+                    native_public_key = public_key.public_key
+                public_key._public_key_der = self.__export_native_public_key(native_public_key)
+            identifier = bytes(self.__identifier_from_der(public_key._public_key_der))
+            public_key._identifiers[self.use_sha256_fingerprints] = identifier
+        return bytearray(identifier)
 
     def generate_random_data(self, data_size):
         # type: (int) -> Tuple[int]
@@ -557,25 +1157,311 @@ class VirgilCrypto(object):
         """
         return self.rng.random(data_size)
 
-    def __for_each_chunk_input(self, input_stream, stream_callback):
+    def __key_pair(self, private_key, key_type):
+        public_key = private_key.extract_public_key()
+        public_key_der = self.__export_native_public_key(public_key)
+        key_id = self.__identifier_from_der(public_key_der)
+
+        key_pair = VirgilKeyPair(
+            private_key=VirgilPrivateKey(identifier=key_id, private_key=private_key, key_type=key_type),
+            public_key=VirgilPublicKey(identifier=key_id, public_key=public_key, key_type=key_type)
+        )
+        identifiers = {}
+        self.__cache_public_key_info(key_pair.private_key, public_key_der, identifiers)
+        self.__cache_public_key_info(key_pair.public_key, public_key_der, identifiers)
+        return key_pair
+
+    def __cache_public_key_info(self, key, public_key_der, identifiers):
+        identifiers[self.use_sha256_fingerprints] = bytes(key.identifier)
+        key._public_key_der = public_key_der
+        key._identifiers = identifiers
+
+    def __identifier_from_der(self, public_key_der):
+        if self.use_sha256_fingerprints:
+            return self.compute_hash(public_key_der, HashAlgorithm.SHA256)
+        return self.compute_hash(public_key_der)[:8]
+
+    @staticmethod
+    def __export_native_public_key(public_key):
+        with VirgilCrypto.__key_provider_pool.borrow() as key_provider:
+            return bytes(key_provider.export_public_key(public_key))
+
+    def __encryption_cipher(self, recipients):
+        cipher = foundation.RecipientCipher()
+        cipher.set_encryption_cipher(foundation.Aes256Gcm())
+        cipher.set_random(self.rng)
+
+        for public_key in recipients:
+            cipher.add_key_recipient(public_key.identifier, public_key.public_key)
+        return cipher
+
+    @staticmethod
+    def __encrypt(cipher, data, output=None):
+        # AES-GCM output is as long as its input plus the tag, so the whole
+        # message is assembled in one buffer of exactly its size.
+        native = NativeBridge.instance()
+        message_info = cipher.pack_message_info()
+        encrypted_len = len(message_info) + len(data) + foundation.Aes256Gcm.AUTH_TAG_LEN
+        if output is None:
+            output = OutputBuffer(storage=bytearray(encrypted_len))
+        elif output.capacity < encrypted_len:
+            raise ValueError("Output buffer is too small: {} bytes needed, {} available".format(
+                encrypted_len, output.capacity
+            ))
+        output.append(message_info)
+        native.process_encryption(cipher, data, output)
+        native.finish_encryption(cipher, output)
+        return output
+
+    @staticmethod
+    def __decrypt(cipher, data, output=None):
+        # The decrypted data is shorter than the message, but the library
+        # needs room for its worst case estimate, which exceeds the data
+        # passed by a constant. Data is fed in parts whose estimate fits.
+        native = NativeBridge.instance()
+        if output is None:
+            output = OutputBuffer(storage=bytearray(len(data)))
+        overhead = cipher.decryption_out_len(1) - 1
+        offset = 0
+        while offset < len(data):
+            remaining = len(data) - offset
+            step = min(output.room - overhead, remaining)
+            if step < 1:
+                step = remaining
+            if step == len(data):
+                native.process_decryption(cipher, data, output)
+            else:
+                native.process_decryption(cipher, memoryview(data)[offset:offset + step], output)
+            offset += step
+        native.finish_decryption(cipher, output)
+        return output
+
+    @staticmethod
+    def __process_file(src_path, dst_path, output_size, process):
+        # process(data, output) writes the result into an OutputBuffer over
+        # the mapped destination of output_size(data) bytes. The destination
+        # is only replaced by a complete result, so the source and an
+        # existing destination survive any failure.
+        if os.path.exists(dst_path) and os.path.samefile(src_path, dst_path):
+            raise ValueError("Source and destination must be different files")
+        import shutil
+        import tempfile
+        directory, name = os.path.split(os.path.abspath(dst_path))
+        fd, temp_path = tempfile.mkstemp(prefix=".{}.".format(name), suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w+b") as dst, open(src_path, "rb") as src, map_input(src) as data:
+                with map_output(dst, output_size(data)) as mapped:
+                    output = OutputBuffer(storage=mapped)
+                    try:
+                        process(data, output)
+                        written = len(output)
+                    finally:
+                        output.close()
+                dst.truncate(written)
+            if os.path.exists(dst_path):
+                shutil.copymode(dst_path, temp_path)
+            os.replace(temp_path, dst_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def __unwrap_data_key(self, header, private_key):
+        # The wrapped key comes from the container and the library aborts on
+        # some malformed message infos, so it is parsed in Python first and
+        # must hold exactly an encrypted data key and its tag.
+        wrapped_key = header.wrapped_key
+        try:
+            message_info = read_message_info(wrapped_key)
+            summarize_message_info(message_info)
+        except (VirgilCryptoError, foundation_bridge.VirgilCryptoFoundationError):
+            raise VirgilCryptoErrors.INVALID_SEGMENTED_CONTAINER
+        if len(wrapped_key) != len(message_info) + header.KEY_LEN + foundation.Aes256Gcm.AUTH_TAG_LEN:
+            raise VirgilCryptoErrors.INVALID_SEGMENTED_CONTAINER
+        return self.decrypt(wrapped_key, private_key)
+
+    @staticmethod
+    def __pop_segmented_options(kwargs):
+        max_workers = kwargs.pop("max_workers", None)
+        checkpoint_interval = kwargs.pop("checkpoint_interval", None)
+        if kwargs:
+            raise TypeError("Unexpected keyword arguments: {}".format(", ".join(sorted(kwargs))))
+        if checkpoint_interval is not None and checkpoint_interval < 1:
+            raise ValueError("Checkpoint interval must be positive")
+        return max_workers, checkpoint_interval
+
+    def __process_segments(self, input_stream, output_stream, segment_size, new_process, max_workers,
+                           first_index=0, checkpoint_interval=None):
+        # new_process() returns the encrypt_segment or decrypt_segment method
+        # of a new SegmentCipher. Parallel segments are processed by one
+        # cipher per thread, at most two per thread are in flight and they
+        # are written out in order.
+        written = [0]
+
+        def write_segment(output):
+            self.__write(output_stream, output)
+            written[0] += 1
+            if checkpoint_interval and written[0] % checkpoint_interval == 0:
+                self.__sync(output_stream)
+
+        if not max_workers or max_workers < 2:
+            process = new_process()
+            output = OutputBuffer()
+            for index, segment, final in iter_segments(input_stream, segment_size, first_index=first_index):
+                process(index, segment, final, output)
+                write_segment(output)
+        else:
+            self.__process_segments_in_parallel(
+                input_stream, segment_size, new_process, max_workers, first_index, write_segment
+            )
+        if checkpoint_interval:
+            self.__sync(output_stream)
+
+    @staticmethod
+    def __process_segments_in_parallel(input_stream, segment_size, new_process, max_workers, first_index,
+                                       write_segment):
+        from concurrent.futures import ThreadPoolExecutor
+        processes = threading.local()
+
+        def process_segment(index, segment, final):
+            process = getattr(processes, "process", None)
+            if process is None:
+                process = processes.process = new_process()
+            output = OutputBuffer()
+            process(index, segment, final, output)
+            return output
+
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                segments = iter_segments(input_stream, segment_size, reuse=False, first_index=first_index)
+                for index, segment, final in segments:
+                    pending.append(executor.submit(process_segment, index, segment, final))
+                    if len(pending) >= 2 * max_workers:
+                        write_segment(pending.popleft().result())
+                while pending:
+                    write_segment(pending.popleft().result())
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+    @staticmethod
+    def __sync(output_stream):
+        flush = getattr(output_stream, "flush", None)
+        if flush is not None:
+            flush()
+        try:
+            os.fsync(output_stream.fileno())
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            pass
+
+    def __take_chunk(self, output):
+        # Yielded chunks belong to the caller, the output buffer is reused.
+        chunk = bytes(output.view()) if self.return_bytes else bytearray(output.view())
+        output.clear()
+        return chunk
+
+    def __result(self, output):
+        if self.return_bytes:
+            return bytes(output.detach())
+        return output.detach()
+
+    @staticmethod
+    def __pop_chunk_size(kwargs):
+        chunk_size = kwargs.pop("chunk_size", None)
+        if kwargs:
+            raise TypeError("Unexpected keyword arguments: {}".format(", ".join(sorted(kwargs))))
+        return chunk_size
+
+    def __chunk_size(self, input_stream, chunk_size):
+        if chunk_size is None:
+            chunk_size = self.chunk_size
+        if chunk_size == self.ADAPTIVE_CHUNK_SIZE:
+            return AdaptiveChunkSize.for_stream(input_stream)
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be positive")
+        return chunk_size
+
+    def __for_each_chunk_input(self, input_stream, stream_callback, chunk_size=None, pipeline=None):
         if input_stream.closed:
             input_stream.open()
 
-        while True:
-            chunk = input_stream.read(self.chunk_size)
-            if not chunk:
-                break
-            stream_callback(chunk)
+        if pipeline is not None:
+            pipeline.run(input_stream, self.__pipeline_chunk_size(input_stream, chunk_size), stream_callback)
+            return
+        self.__for_each_chunk(input_stream, stream_callback, chunk_size)
 
-    def __for_each_chunk_output(self, input_stream, output_stream, stream_callback):
+    def __for_each_chunk_output(self, input_stream, output_stream, process, output, chunk_size=None, pipeline=None):
+        # process(chunk, output) appends the processed chunk to output, which
+        # is written out and reused for the next chunk.
         if input_stream.closed:
             input_stream.open()
 
         if output_stream.closed:
             output_stream.open()
 
+        if pipeline is not None:
+            pipeline.run(
+                input_stream, self.__pipeline_chunk_size(input_stream, chunk_size), process,
+                functools.partial(self.__write, output_stream)
+            )
+            return
+
+        def process_chunk(chunk):
+            process(chunk, output)
+            self.__write(output_stream, output)
+
+        self.__for_each_chunk(input_stream, process_chunk, chunk_size)
+
+    def __pipeline_chunk_size(self, input_stream, chunk_size):
+        # The reader thread reads into preallocated buffers, so an adaptive
+        # chunk size stays at its initial size for the stream kind.
+        chunk_size = self.__chunk_size(input_stream, chunk_size)
+        if isinstance(chunk_size, AdaptiveChunkSize):
+            return chunk_size.size
+        return chunk_size
+
+    def __for_each_chunk(self, input_stream, chunk_callback, chunk_size):
+        chunk_size = self.__chunk_size(input_stream, chunk_size)
+        if not isinstance(chunk_size, AdaptiveChunkSize):
+            for chunk in self.__read_chunks(input_stream, lambda: chunk_size):
+                chunk_callback(chunk)
+            return
+
+        started = timeit.default_timer()
+        for chunk in self.__read_chunks(input_stream, lambda: chunk_size.size):
+            chunk_callback(chunk)
+            finished = timeit.default_timer()
+            chunk_size.update(len(chunk), finished - started)
+            started = finished
+
+    @staticmethod
+    def __read_chunks(input_stream, chunk_size):
+        # Chunks are read into one reused bytearray, so a chunk is only valid
+        # until the next one is read. Short reads are copied out to keep the
+        # chunk length equal to the data length.
+        readinto = getattr(input_stream, "readinto", None)
+        buffer = bytearray()
         while True:
-            chunk = input_stream.read(self.chunk_size)
+            size = chunk_size()
+            if readinto is None:
+                chunk = input_stream.read(size)
+            else:
+                if len(buffer) != size:
+                    buffer = bytearray(size)
+                read = readinto(buffer)
+                chunk = buffer if read == size else buffer[:read or 0]
             if not chunk:
-                break
-            output_stream.write(stream_callback(chunk))
+                return
+            yield chunk
+
+    @staticmethod
+    def __write(output_stream, output):
+        # Buffered and raw io streams must not keep the written buffer,
+        # anything else gets its own copy of the reused output memory.
+        if isinstance(output_stream, (io.BufferedIOBase, io.RawIOBase)):
+            output_stream.write(output.view())
+        else:
+            output_stream.write(bytearray(output.view()))
+        output.clear()
@@ -52,3 +52,7 @@ class VirgilCryptoErrors(object):
     OUTPUT_STREAM_ERROR = VirgilCryptoError("Output stream has no space left")
     INPUT_STREAM_ERROR = VirgilCryptoError("Output stream has no space left")
     INVALID_SEED_SIZE = VirgilCryptoError("Invalid seed size")
+    INVALID_MESSAGE_INFO = VirgilCryptoError("Invalid message info")
+    INVALID_SEGMENTED_CONTAINER = VirgilCryptoError("Invalid segmented container")
+    ENCRYPTED_DATA_TRUNCATED = VirgilCryptoError("Encrypted data is truncated")
+    RESUMED_INPUT_MISMATCH = VirgilCryptoError("Input differs from the input encryption was started with")
@@ -31,7 +31,7 @@
 # STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
 # IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
-from virgil_crypto_lib.foundation import Sha224, Sha256, Sha384, Sha512
+from virgil_crypto.utils import foundation
 
 
 class HashAlgorithm(object):
@@ -52,10 +52,10 @@ class HashAlgorithm(object):
     SHA512 = 3
 
     _ALGORITHMS_TO_NATIVE = {
-        SHA224: Sha224,
-        SHA256: Sha256,
-        SHA384: Sha384,
-        SHA512: Sha512,
+        SHA224: "Sha224",
+        SHA256: "Sha256",
+        SHA384: "Sha384",
+        SHA512: "Sha512",
     }
 
     @classmethod
@@ -73,5 +73,5 @@ class HashAlgorithm(object):
             UnknownAlgorithmException: if algorithm is not supported.
         """
         if algorithm in cls._ALGORITHMS_TO_NATIVE:
-            return cls._ALGORITHMS_TO_NATIVE[algorithm]
+            return getattr(foundation, cls._ALGORITHMS_TO_NATIVE[algorithm])
         raise cls.UnknownAlgorithmException(algorithm)
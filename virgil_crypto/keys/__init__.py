@@ -36,3 +36,6 @@ from .virgil_key_pair import VirgilKeyPair
 from .key_pair_type import KeyPairType
 from .virgil_private_key import VirgilPrivateKey
 from .virgil_public_key import VirgilPublicKey
+from .public_key_cache import PublicKeyCache
+from .public_key_cache import PublicKeyCacheStats
+from .public_key_index import PublicKeyIndex
@@ -31,13 +31,18 @@
 # STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
 # IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
-from virgil_crypto_lib.foundation import AlgId
+from virgil_crypto.utils import foundation
 
 
 class KeyPairType(object):
     """Enumeration containing supported KeyPairTypes"""
 
     class KeyType(object):
+        """Key algorithm and RSA key length.
+
+        alg_id may be given as the name of an AlgId member, it is resolved
+        on first use so that defining key types doesn't load the native library.
+        """
 
         def __init__(self, alg_id, rsa_bitlen=None):
             self._alg_id = alg_id
@@ -46,14 +51,25 @@ class KeyPairType(object):
         def __eq__(self, other):
             return self.alg_id == other.alg_id and self.rsa_bitlen == other.rsa_bitlen
 
+        def __ne__(self, other):
+            return not self == other
+
+        def __hash__(self):
+            return hash((self.alg_id, self.rsa_bitlen))
+
         @property
         def alg_id(self):
+            if isinstance(self._alg_id, str):
+                self._alg_id = getattr(foundation.AlgId, self._alg_id)
             return self._alg_id
 
         @property
         def rsa_bitlen(self):
             return self._rsa_bitlen
 
+        def __reduce__(self):
+            return _restore_key_type, (self._alg_id, self._rsa_bitlen)
+
     class UnknownTypeException(Exception):
         """Exception raised when Unknown Type passed to convertion method"""
 
@@ -64,9 +80,18 @@ class KeyPairType(object):
         def __str__(self):
             return "KeyPairType not found: %i" % self.key_pair_type
 
-    CURVE25519 = KeyType(AlgId.CURVE25519)
-    ED25519 = KeyType(AlgId.ED25519)
-    SECP256R1 = KeyType(AlgId.SECP256R1)
-    RSA_2048 = KeyType(AlgId.RSA, 2048)
-    RSA_4096 = KeyType(AlgId.RSA, 4096)
-    RSA_8192 = KeyType(AlgId.RSA, 8192)
+    CURVE25519 = KeyType("CURVE25519")
+    ED25519 = KeyType("ED25519")
+    SECP256R1 = KeyType("SECP256R1")
+    RSA_2048 = KeyType("RSA", 2048)
+    RSA_4096 = KeyType("RSA", 4096)
+    RSA_8192 = KeyType("RSA", 8192)
+
+
+def _restore_key_type(alg_id, rsa_bitlen):
+    # Unpickled key types are the KeyPairType constants where possible.
+    key_type = KeyPairType.KeyType(alg_id, rsa_bitlen)
+    for name in ("CURVE25519", "ED25519", "SECP256R1", "RSA_2048", "RSA_4096", "RSA_8192"):
+        if getattr(KeyPairType, name) == key_type:
+            return getattr(KeyPairType, name)
+    return key_type
@@ -0,0 +1,90 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import hashlib
+
+from .public_key_cache import PublicKeyCache
+
+# Keys restored from pickles, cached only in worker processes that enable
+# it, see enable_restored_key_cache.
+_restored_keys = None
+
+
+def enable_restored_key_cache(max_size):
+    # type: (int) -> None
+    """Makes unpickling reuse keys restored before in this process.
+
+    Worker processes receive the same keys with every job, caching saves
+    importing them again. Not enabled by default, so unpickled keys don't
+    stay in memory of ordinary processes.
+
+    Args:
+        max_size: maximum number of cached keys.
+    """
+    global _restored_keys
+    if _restored_keys is None:
+        _restored_keys = PublicKeyCache(max_size)
+
+
+def restore_private_key(private_key_der, identifier, key_type):
+    """Imports private key pickled by VirgilPrivateKey.__reduce__."""
+    return _restore(True, private_key_der, identifier, key_type)
+
+
+def restore_public_key(public_key_der, identifier, key_type):
+    """Imports public key pickled by VirgilPublicKey.__reduce__."""
+    return _restore(False, public_key_der, identifier, key_type)
+
+
+def _restore(private, key_der, identifier, key_type):
+    from virgil_crypto import VirgilCrypto
+
+    # Keyed by a digest, private key DER must not stay in memory as a key.
+    cache_key = (private, bytes(identifier), hashlib.sha256(key_der).digest())
+    if _restored_keys is not None:
+        key = _restored_keys.get(cache_key)
+        if key is not None:
+            return key
+
+    crypto = VirgilCrypto.default()
+    if private:
+        key = crypto.import_private_key(key_der).private_key
+    else:
+        key = crypto.import_public_key(key_der)
+    key.identifier = identifier
+    key.key_type = key_type
+
+    if _restored_keys is not None:
+        _restored_keys.put(cache_key, key)
+    return key
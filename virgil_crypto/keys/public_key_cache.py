@@ -0,0 +1,104 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import threading
+from collections import OrderedDict, namedtuple
+
+PublicKeyCacheStats = namedtuple('PublicKeyCacheStats', ['hits', 'misses', 'evictions', 'size', 'max_size'])
+"""Counters of PublicKeyCache"""
+
+
+class PublicKeyCache(object):
+    """Size bounded LRU cache of imported public keys."""
+
+    def __init__(self, max_size):
+        if max_size < 1:
+            raise ValueError("Cache size must be positive")
+        self.__max_size = max_size
+        self.__keys = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get(self, cache_key):
+        # type: (Hashable) -> Optional[VirgilPublicKey]
+        """Gets cached public key and marks it as recently used.
+
+        Args:
+            cache_key: key the public key was stored with.
+
+        Returns:
+            Cached public key or None.
+        """
+        with self.__lock:
+            public_key = self.__keys.pop(cache_key, None)
+            if public_key is None:
+                self.__misses += 1
+                return None
+            self.__keys[cache_key] = public_key
+            self.__hits += 1
+            return public_key
+
+    def put(self, cache_key, public_key):
+        # type: (Hashable, VirgilPublicKey) -> None
+        """Stores public key evicting the least recently used one if the cache is full.
+
+        Args:
+            cache_key: key to store public key with.
+            public_key: imported public key.
+        """
+        with self.__lock:
+            self.__keys.pop(cache_key, None)
+            self.__keys[cache_key] = public_key
+            while len(self.__keys) > self.__max_size:
+                self.__keys.popitem(last=False)
+                self.__evictions += 1
+
+    def clear(self):
+        """Drops all cached public keys."""
+        with self.__lock:
+            self.__keys.clear()
+
+    @property
+    def stats(self):
+        # type: () -> PublicKeyCacheStats
+        """Hit, miss and eviction counters with current and maximum size."""
+        with self.__lock:
+            return PublicKeyCacheStats(
+                hits=self.__hits,
+                misses=self.__misses,
+                evictions=self.__evictions,
+                size=len(self.__keys),
+                max_size=self.__max_size
+            )
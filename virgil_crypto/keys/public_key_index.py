@@ -0,0 +1,112 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import threading
+
+# VirgilCrypto instances computing SHA-512/8 and SHA-256 identifiers,
+# created on first use as keys can't import VirgilCrypto at module level.
+_identifier_cryptos = []
+_identifier_cryptos_lock = threading.Lock()
+
+
+def _get_identifier_cryptos():
+    if not _identifier_cryptos:
+        with _identifier_cryptos_lock:
+            if not _identifier_cryptos:
+                from virgil_crypto import VirgilCrypto
+                _identifier_cryptos.extend([
+                    VirgilCrypto(use_sha256_fingerprints=False),
+                    VirgilCrypto(use_sha256_fingerprints=True)
+                ])
+    return _identifier_cryptos
+
+
+class PublicKeyIndex(object):
+    """Public keys looked up by identifier in constant time.
+
+    Every key is found by its SHA-512/8 and its SHA-256 identifier, whichever
+    format the sender used. Build the index once and pass it instead of a
+    list of keys to VirgilCrypto.decrypt_and_verify. If several keys share
+    an identifier the one added first is kept.
+
+    Args:
+        public_keys: public keys to index.
+    """
+
+    def __init__(self, public_keys=()):
+        self.__keys = {}
+        self.__size = 0
+        self.extend(public_keys)
+
+    def add(self, public_key):
+        # type: (VirgilPublicKey) -> None
+        """Adds public key to the index.
+
+        Args:
+            public_key: public key to add.
+        """
+        identifiers = set([bytes(public_key.identifier)])
+        for crypto in _get_identifier_cryptos():
+            identifiers.add(bytes(crypto.compute_public_key_identifier(public_key)))
+        added = False
+        for identifier in identifiers:
+            if identifier not in self.__keys:
+                self.__keys[identifier] = public_key
+                added = True
+        if added:
+            self.__size += 1
+
+    def extend(self, public_keys):
+        # type: (Iterable[VirgilPublicKey]) -> None
+        """Adds public keys to the index."""
+        for public_key in public_keys:
+            self.add(public_key)
+
+    def get(self, identifier, default=None):
+        # type: (Union[bytes, bytearray], Optional[VirgilPublicKey]) -> Optional[VirgilPublicKey]
+        """Finds public key by identifier.
+
+        Args:
+            identifier: SHA-512/8 or SHA-256 public key identifier.
+            default: value returned when no key has the identifier.
+
+        Returns:
+            Public key with the identifier or default.
+        """
+        return self.__keys.get(bytes(identifier), default)
+
+    def __contains__(self, identifier):
+        return bytes(identifier) in self.__keys
+
+    def __len__(self):
+        return self.__size
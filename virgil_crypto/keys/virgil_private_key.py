@@ -40,6 +40,17 @@ class VirgilPrivateKey(object):
         self.identifier = identifier
         self.private_key = private_key
         self.key_type = key_type
+        # Filled by VirgilCrypto on first use: public key DER and
+        # identifiers keyed by use_sha256_fingerprints.
+        self._public_key_der = None
+        self._identifiers = {}
+
+    def __reduce__(self):
+        # Native keys can't be pickled, keys travel as DER and are imported
+        # again when unpickled, keeping identifier and key type.
+        from virgil_crypto import VirgilCrypto
+        from .key_pickling import restore_private_key
+        return restore_private_key, (bytes(VirgilCrypto.export_private_key(self)), self.identifier, self.key_type)
 
     def __eq__(self, other):
         return self.identifier == other.identifier and \
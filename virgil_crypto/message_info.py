@@ -0,0 +1,216 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from collections import namedtuple
+
+from virgil_crypto.errors.virgil_crypto_error import VirgilCryptoErrors
+from virgil_crypto.utils import foundation
+
+MessageInfoSummary = namedtuple('MessageInfoSummary', ['recipient_ids', 'custom_param_keys', 'header_length'])
+"""Recipients and custom param keys of an encrypted message, see VirgilCrypto.inspect_message_info"""
+
+_INTEGER_TAG = 0x02
+_BIT_STRING_TAG = 0x03
+_OCTET_STRING_TAG = 0x04
+_SEQUENCE_TAG = 0x30
+_SET_TAG = 0x31
+_UTF8_STRING_TAG = 0x0c
+_CONTEXT_0_TAG = 0xa0
+_IMPLICIT_CONTEXT_0_TAG = 0x80
+_OID_TAG = 0x06
+_ENVELOPED_DATA_OID = bytearray(b"\x2a\x86\x48\x86\xf7\x0d\x01\x07\x03")
+_DATA_OID = bytearray(b"\x2a\x86\x48\x86\xf7\x0d\x01\x07\x01")
+_RSA_ENCRYPTION_OID = bytearray(b"\x2a\x86\x48\x86\xf7\x0d\x01\x01\x01")
+_NON_EMPTY_TAGS = (_INTEGER_TAG, _BIT_STRING_TAG, _OCTET_STRING_TAG, _OID_TAG)
+
+
+def read_message_info(data_or_stream):
+    # type: (Union[bytes, bytearray, memoryview, io.IOBase]) -> bytearray
+    """Reads message info written in front of encrypted data.
+
+    Args:
+        data_or_stream: encrypted data or a stream positioned at its start.
+            Only the message info bytes are read from a stream.
+
+    Returns:
+        Message info DER.
+
+    Raises:
+        VirgilCryptoError: if data doesn't start with message info.
+    """
+    prefix_len = foundation.MessageInfoDerSerializer.PREFIX_LEN
+    read = data_or_stream.read if hasattr(data_or_stream, "read") else memoryview(data_or_stream)
+    header = _read_exactly(read, 0, prefix_len)
+    serializer = foundation.MessageInfoDerSerializer()
+    serializer.setup_defaults()
+    header_len = serializer.read_prefix(header)
+    if header_len < prefix_len:
+        raise VirgilCryptoErrors.INVALID_MESSAGE_INFO
+    header += _read_exactly(read, prefix_len, header_len - prefix_len)
+    return header
+
+
+def summarize_message_info(message_info_der):
+    # type: (bytearray) -> MessageInfoSummary
+    """Parses message info DER returned by read_message_info.
+
+    The DER is walked in Python with every length checked against its
+    enclosing item, the native deserializer is not used since it asserts
+    on some corrupted headers instead of reporting an error.
+
+    Raises:
+        VirgilCryptoError: if message info is corrupted.
+    """
+    der = bytearray(message_info_der)
+    top_level = list(_der_items(der, 0, len(der)))
+    if len(top_level) != 1 or top_level[0][0] != _SEQUENCE_TAG:
+        raise VirgilCryptoErrors.INVALID_MESSAGE_INFO
+
+    message_info = top_level[0]
+    recipient_ids = []
+    custom_param_keys = []
+    for content_info in _der_items(der, message_info[1], message_info[2], _SEQUENCE_TAG):
+        recipient_ids.extend(_recipient_ids(der, content_info))
+    for custom_params in _der_items(der, message_info[1], message_info[2], _CONTEXT_0_TAG):
+        custom_param_keys.extend(_custom_param_keys(der, custom_params))
+
+    return MessageInfoSummary(
+        recipient_ids=recipient_ids,
+        custom_param_keys=custom_param_keys,
+        header_length=len(message_info_der)
+    )
+
+
+def _read_exactly(read, offset, size):
+    if callable(read):
+        data = bytearray()
+        while len(data) < size:
+            chunk = read(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+    else:
+        data = bytearray(read[offset:offset + size])
+    if len(data) < size:
+        raise VirgilCryptoErrors.INVALID_MESSAGE_INFO
+    return data
+
+
+def _recipient_ids(der, content_info):
+    # ContentInfo { envelopedData OID, [0] EnvelopedData { version, recipientInfos SET,
+    # EncryptedContentInfo { data OID, ... } } }, key recipients are
+    # KeyTransRecipientInfo { version, [0] keyId, ... }.
+    _check_content_type(der, content_info, _ENVELOPED_DATA_OID)
+    _check_values(der, content_info[1], content_info[2])
+    ids = []
+    for content in _der_items(der, content_info[1], content_info[2], _CONTEXT_0_TAG):
+        for enveloped_data in _der_items(der, content[1], content[2], _SEQUENCE_TAG):
+            for encrypted_content_info in _der_items(der, enveloped_data[1], enveloped_data[2], _SEQUENCE_TAG):
+                _check_content_type(der, encrypted_content_info, _DATA_OID)
+            for recipient_infos in _der_items(der, enveloped_data[1], enveloped_data[2], _SET_TAG):
+                for recipient in _der_items(der, recipient_infos[1], recipient_infos[2], _SEQUENCE_TAG):
+                    recipient_items = list(_der_items(der, recipient[1], recipient[2]))
+                    _check_encrypted_key(der, recipient_items)
+                    for rid in recipient_items:
+                        if rid[0] == _CONTEXT_0_TAG:
+                            ids.extend(bytearray(der[item[1]:item[2]]) for item in _der_items(der, rid[1], rid[2]))
+                        elif rid[0] == _IMPLICIT_CONTEXT_0_TAG:
+                            ids.append(bytearray(der[rid[1]:rid[2]]))
+    return ids
+
+
+def _check_content_type(der, content_info, oid):
+    for item in _der_items(der, content_info[1], content_info[2]):
+        if item[0] != _OID_TAG or der[item[1]:item[2]] != oid:
+            raise VirgilCryptoErrors.INVALID_MESSAGE_INFO
+        return
+    raise VirgilCryptoErrors.INVALID_MESSAGE_INFO
+
+
+def _check_values(der, start, end):
+    # The library asserts on empty integers, strings and OIDs rather than
+    # failing, so they are rejected in all items nested within start:end.
+    for tag, value_start, value_end in _der_items(der, start, end):
+        if tag in _NON_EMPTY_TAGS and value_start == value_end:
+            raise VirgilCryptoErrors.INVALID_MESSAGE_INFO
+        if tag & 0x20:
+            _check_values(der, value_start, value_end)
+
+
+def _check_encrypted_key(der, recipient_items):
+    # KeyTransRecipientInfo { version, rid, keyEncryptionAlgorithm, encryptedKey },
+    # keys other than RSA encrypt into a DER encoded envelope that is parsed as well.
+    algorithms = [item for item in recipient_items if item[0] == _SEQUENCE_TAG]
+    encrypted_keys = [item for item in recipient_items if item[0] == _OCTET_STRING_TAG]
+    if not algorithms or not encrypted_keys:
+        raise VirgilCryptoErrors.INVALID_MESSAGE_INFO
+    algorithm = next(_der_items(der, algorithms[0][1], algorithms[0][2]), None)
+    if algorithm is None or algorithm[0] != _OID_TAG:
+        raise VirgilCryptoErrors.INVALID_MESSAGE_INFO
+    if der[algorithm[1]:algorithm[2]] != _RSA_ENCRYPTION_OID:
+        _check_values(der, encrypted_keys[0][1], encrypted_keys[0][2])
+
+
+def _custom_param_keys(der, custom_params):
+    # [0] { SET OF SEQUENCE { key UTF8String, value } }
+    keys = []
+    for params in _der_items(der, custom_params[1], custom_params[2], _SET_TAG):
+        for param in _der_items(der, params[1], params[2], _SEQUENCE_TAG):
+            for key in _der_items(der, param[1], param[2], _UTF8_STRING_TAG):
+                keys.append(bytearray(der[key[1]:key[2]]))
+                break
+    return keys
+
+
+def _der_items(der, start, end, only_tag=None):
+    # Yields (tag, value start, value end) of the DER items within start:end,
+    # of the given tag only if set.
+    while start < end:
+        if start + 2 > end:
+            raise VirgilCryptoErrors.INVALID_MESSAGE_INFO
+        tag = der[start]
+        length = der[start + 1]
+        start += 2
+        if length & 0x80:
+            length_size = length & 0x7f
+            if length_size == 0 or start + length_size > end:
+                raise VirgilCryptoErrors.INVALID_MESSAGE_INFO
+            length = 0
+            for byte in der[start:start + length_size]:
+                length = (length << 8) | byte
+            start += length_size
+        if start + length > end:
+            raise VirgilCryptoErrors.INVALID_MESSAGE_INFO
+        if only_tag is None or tag == only_tag:
+            yield tag, start, start + length
+        start += length
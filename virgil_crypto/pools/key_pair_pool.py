@@ -0,0 +1,285 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import os
+import threading
+import timeit
+import weakref
+from collections import deque, namedtuple
+
+from .fork_generation import fork_generation
+
+KeyPairPoolStats = namedtuple(
+    'KeyPairPoolStats',
+    ['depth', 'target_depth', 'pending', 'hits', 'misses', 'refills', 'failures',
+     'last_refill_latency', 'average_refill_latency', 'last_error']
+)
+
+_live_pools = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    for pool in list(_live_pools):
+        pool._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class _Slot(object):
+    # Pre-generated pairs and counters of one key type.
+
+    def __init__(self, target_depth):
+        self.target_depth = target_depth
+        self.pairs = deque()
+        self.pending = 0
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.retry_timer = None
+        self.last_refill_latency = 0.0
+        self.total_refill_latency = 0.0
+
+    def stats(self):
+        return KeyPairPoolStats(
+            depth=len(self.pairs),
+            target_depth=self.target_depth,
+            pending=self.pending,
+            hits=self.hits,
+            misses=self.misses,
+            refills=self.refills,
+            failures=self.failures,
+            last_refill_latency=self.last_refill_latency,
+            average_refill_latency=self.total_refill_latency / self.refills if self.refills else 0.0,
+            last_error=self.last_error
+        )
+
+
+class KeyPairPool(object):
+    """Keeps key pairs of slow key types generated ahead of time.
+
+    Every handed out pair is replaced in the background, so taking a pair
+    costs a deque pop while the pool isn't drained. A drained pool generates
+    the pair in the calling thread. Key generation releases the GIL, so a
+    thread executor refills in parallel; with a ProcessPoolExecutor pairs are
+    generated by worker processes and pickled back.
+    Pairs inherited from a parent process are dropped after fork, a pair is
+    never handed out twice.
+
+    A failed refill is retried after RETRY_DELAY seconds, doubling the delay
+    with every further failure up to MAX_RETRY_DELAY. Failures are counted
+    in stats, which also keep the last error.
+
+    Args:
+        depths: mapping of KeyPairType.KeyType to the number of pairs to keep.
+        crypto: VirgilCrypto generating the pairs. Defaults to VirgilCrypto.default().
+        executor: executor to refill on instead of an own thread pool.
+        max_workers: number of refill threads of the own thread pool.
+    """
+
+    DEFAULT_MAX_WORKERS = 2
+    RETRY_DELAY = 0.1
+    MAX_RETRY_DELAY = 30.0
+
+    def __init__(self, depths, crypto=None, executor=None, max_workers=DEFAULT_MAX_WORKERS):
+        if crypto is None:
+            from virgil_crypto import VirgilCrypto
+            crypto = VirgilCrypto.default()
+        for depth in depths.values():
+            if depth < 0:
+                raise ValueError("Pool depth can't be negative")
+        self.__crypto = crypto
+        self.__own_executor = executor is None
+        self.__executor = executor
+        self.__max_workers = max_workers
+        self.__lock = threading.RLock()
+        self.__slots = dict((key_type, _Slot(depth)) for key_type, depth in depths.items())
+        self.__fork_generation = fork_generation()
+        self.__forked = False
+        self.__closed = False
+        _live_pools.add(self)
+        with self.__lock:
+            for key_type in self.__slots:
+                self.__refill(key_type)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get(self, key_type):
+        # type: (KeyPairType.KeyType) -> VirgilKeyPair
+        """Takes a pre-generated key pair and schedules its replacement.
+
+        Args:
+            key_type: type of the key pair, the pool generates the pairs
+                of types it wasn't configured with on every call.
+
+        Returns:
+            Key pair no one else got from the pool.
+        """
+        self.__check_fork()
+        with self.__lock:
+            if self.__forked:
+                self.__forked = False
+                for configured_type in self.__slots:
+                    self.__refill(configured_type)
+            slot = self.__slots.get(key_type)
+            if slot is not None:
+                if slot.pairs:
+                    slot.hits += 1
+                    key_pair = slot.pairs.popleft()
+                    self.__refill(key_type)
+                    return key_pair
+                slot.misses += 1
+                self.__refill(key_type)
+        return self.__crypto.generate_key_pair(key_type)
+
+    def depth(self, key_type):
+        # type: (KeyPairType.KeyType) -> int
+        """Number of pairs of the key type ready to be handed out."""
+        return self.stats(key_type).depth
+
+    def stats(self, key_type):
+        # type: (KeyPairType.KeyType) -> KeyPairPoolStats
+        """Depth, hit and refill latency counters of the key type.
+
+        Refill latency is the time in seconds from scheduling a refill till
+        the generated pair is in the pool, including the time spent queued.
+        """
+        self.__check_fork()
+        with self.__lock:
+            slot = self.__slots.get(key_type)
+            if slot is None:
+                return _Slot(0).stats()
+            return slot.stats()
+
+    def close(self):
+        """Stops refilling and drops pre-generated pairs."""
+        with self.__lock:
+            self.__closed = True
+            _live_pools.discard(self)
+            for slot in self.__slots.values():
+                slot.pairs.clear()
+                if slot.retry_timer is not None:
+                    slot.retry_timer.cancel()
+                    slot.retry_timer = None
+            executor, self.__executor = self.__executor, None
+        if executor is not None and self.__own_executor:
+            executor.shutdown(wait=False)
+
+    def __refill(self, key_type):
+        # Called holding the lock. The lock is reentrant as the callback
+        # of an already done future runs right in add_done_callback.
+        if self.__closed:
+            return
+        slot = self.__slots[key_type]
+        if slot.retry_timer is not None:
+            return
+        while len(slot.pairs) + slot.pending < slot.target_depth:
+            future = self.__submit(key_type)
+            slot.pending += 1
+            future.add_done_callback(self.__refilled(key_type, timeit.default_timer(), self.__fork_generation))
+
+    def __submit(self, key_type):
+        # Imported here: concurrent.futures would double the import time of
+        # the package, which loads this module through virgil_crypto.pools.
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(self.__max_workers)
+        if isinstance(self.__executor, ProcessPoolExecutor):
+            from virgil_crypto.process_pool_runner import call_in_worker
+            settings = (self.__crypto.use_sha256_fingerprints, self.__crypto.return_bytes)
+            return self.__executor.submit(call_in_worker, settings, "generate_key_pair", (key_type,))
+        return self.__executor.submit(self.__crypto.generate_key_pair, key_type)
+
+    def __refilled(self, key_type, started, generation):
+        def callback(future):
+            latency = timeit.default_timer() - started
+            with self.__lock:
+                if generation != self.__fork_generation:
+                    return
+                slot = self.__slots[key_type]
+                slot.pending -= 1
+                if future.cancelled() or future.exception() is not None:
+                    slot.failures += 1
+                    slot.consecutive_failures += 1
+                    slot.last_error = None if future.cancelled() else future.exception()
+                    self.__schedule_retry(key_type)
+                    return
+                slot.consecutive_failures = 0
+                slot.refills += 1
+                slot.last_refill_latency = latency
+                slot.total_refill_latency += latency
+                if not self.__closed:
+                    slot.pairs.append(future.result())
+                    self.__refill(key_type)
+        return callback
+
+    def __schedule_retry(self, key_type):
+        # Called holding the lock.
+        slot = self.__slots[key_type]
+        if self.__closed or slot.retry_timer is not None:
+            return
+        delay = min(self.RETRY_DELAY * 2 ** (slot.consecutive_failures - 1), self.MAX_RETRY_DELAY)
+        slot.retry_timer = threading.Timer(delay, self.__retry, (key_type, self.__fork_generation))
+        slot.retry_timer.daemon = True
+        slot.retry_timer.start()
+
+    def __retry(self, key_type, generation):
+        with self.__lock:
+            if generation != self.__fork_generation:
+                return
+            self.__slots[key_type].retry_timer = None
+            self.__refill(key_type)
+
+    def __check_fork(self):
+        # Where os.register_at_fork is missing, the fork is noticed on the
+        # next call. Not under the lock, a refill thread could hold it at fork.
+        if self.__fork_generation != fork_generation():
+            self._reset_after_fork()
+
+    def _reset_after_fork(self):
+        # Threads don't survive fork: the lock may be held by a thread that
+        # no longer exists, refills and retries are gone with their threads.
+        self.__lock = threading.RLock()
+        self.__fork_generation = fork_generation()
+        self.__slots = dict((key_type, _Slot(slot.target_depth)) for key_type, slot in self.__slots.items())
+        if self.__own_executor:
+            self.__executor = None
+        self.__forked = True
@@ -0,0 +1,123 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import threading
+from contextlib import contextmanager
+
+from virgil_crypto.utils import foundation
+
+from .fork_generation import fork_generation
+
+
+class KeyProviderPool(object):
+    """Bounded pool of ready to use KeyProvider objects.
+
+    Setting up a KeyProvider (and seeding the random it depends on) is more
+    expensive than importing or exporting a small key, so providers are
+    created on demand, handed out to one thread at a time and kept for reuse.
+    Idle providers inherited from a parent process are dropped after fork.
+    """
+
+    DEFAULT_MAX_SIZE = 16
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        if max_size < 1:
+            raise ValueError("Pool size must be positive")
+        self.__max_size = max_size
+        self.__lock = threading.Lock()
+        self.__idle = []
+        self.__fork_generation = fork_generation()
+
+    @contextmanager
+    def borrow(self):
+        """Borrows a KeyProvider for the duration of the with block.
+
+        Returns:
+            Context manager yielding a set up KeyProvider.
+        """
+        key_provider = self.acquire()
+        try:
+            yield key_provider
+        finally:
+            self.release(key_provider)
+
+    def acquire(self):
+        # type: () -> KeyProvider
+        """Takes an idle KeyProvider from the pool or creates a new one.
+
+        Returns:
+            KeyProvider which must be given back with release().
+        """
+        with self.__lock:
+            if self.__fork_generation != fork_generation():
+                del self.__idle[:]
+                self.__fork_generation = fork_generation()
+            if self.__idle:
+                return self.__idle.pop()
+        return self._create()
+
+    def release(self, key_provider):
+        # type: (KeyProvider) -> None
+        """Returns KeyProvider to the pool. Dropped if the pool is full.
+
+        Args:
+            key_provider: provider obtained from acquire().
+        """
+        with self.__lock:
+            if len(self.__idle) < self.__max_size:
+                self.__idle.append(key_provider)
+
+    def clear(self):
+        """Drops all idle KeyProviders."""
+        with self.__lock:
+            del self.__idle[:]
+
+    @property
+    def max_size(self):
+        """Maximum number of idle KeyProviders kept by the pool."""
+        return self.__max_size
+
+    @property
+    def idle_count(self):
+        """Number of KeyProviders waiting to be borrowed."""
+        with self.__lock:
+            return len(self.__idle)
+
+    @staticmethod
+    def _create():
+        rng = foundation.CtrDrbg()
+        rng.setup_defaults()
+        key_provider = foundation.KeyProvider()
+        key_provider.set_random(rng)
+        key_provider.setup_defaults()
+        return key_provider
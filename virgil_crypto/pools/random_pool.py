@@ -0,0 +1,86 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import threading
+
+from virgil_crypto.utils import foundation
+
+from .fork_generation import fork_generation
+
+
+class RandomPool(object):
+    """Per-thread CtrDrbg instances.
+
+    Each thread gets its own random seeded once on first use and then
+    reseeded by the DRBG itself every reseed_interval requests, so hot paths
+    don't have to pull OS entropy on every call.
+
+    The pool is fork aware: a child process never reuses the random state
+    inherited from its parent and seeds its own randoms on first use.
+    """
+
+    # Same as CtrDrbg.RESEED_INTERVAL, not read from it to keep import lazy.
+    DEFAULT_RESEED_INTERVAL = 10000
+
+    def __init__(self, reseed_interval=DEFAULT_RESEED_INTERVAL):
+        if reseed_interval < 1:
+            raise ValueError("Reseed interval must be positive")
+        self.__reseed_interval = reseed_interval
+        self.__local = threading.local()
+        self.__fork_generation = fork_generation()
+
+    def get(self):
+        # type: () -> CtrDrbg
+        """Gets random owned by the current thread.
+
+        Returns:
+            Seeded CtrDrbg.
+        """
+        if self.__fork_generation != fork_generation():
+            self.__reset_after_fork()
+        rng = getattr(self.__local, "rng", None)
+        if rng is None:
+            rng = foundation.CtrDrbg()
+            rng.setup_defaults()
+            rng.set_reseed_interval(self.__reseed_interval)
+            self.__local.rng = rng
+        return rng
+
+    def __reset_after_fork(self):
+        self.__local = threading.local()
+        self.__fork_generation = fork_generation()
+
+    @property
+    def reseed_interval(self):
+        """Number of random requests served between reseeds."""
+        return self.__reseed_interval
@@ -0,0 +1,185 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.keys.key_pickling import enable_restored_key_cache
+
+# VirgilCrypto instances of a worker process by the settings of the
+# caller's crypto, see ProcessPoolRunner.settings.
+_worker_cryptos = {}
+
+
+def _worker_crypto(settings):
+    enable_restored_key_cache(ProcessPoolRunner.WORKER_KEY_CACHE_SIZE)
+    crypto = _worker_cryptos.get(settings)
+    if crypto is None:
+        use_sha256_fingerprints, return_bytes = settings
+        crypto = _worker_cryptos[settings] = VirgilCrypto(
+            use_sha256_fingerprints=use_sha256_fingerprints,
+            return_bytes=return_bytes
+        )
+    return crypto
+
+
+def call_in_worker(settings, method_name, args):
+    """Calls a VirgilCrypto method in a worker process."""
+    return getattr(_worker_crypto(settings), method_name)(*args)
+
+
+def _map_in_worker(settings, method_name, records, args):
+    method = getattr(_worker_crypto(settings), method_name)
+    return [method(record, *args) for record in records]
+
+
+def _verify_in_worker(settings, items):
+    return _worker_crypto(settings).verify_signatures_many(items)
+
+
+class ProcessPoolRunner(object):
+    """Runs bulk VirgilCrypto jobs on worker processes.
+
+    Records are split into batches and every batch is one job, keys are
+    pickled as DER with every job. Workers keep the keys they imported, so
+    a key is imported once per worker rather than once per job.
+
+    Args:
+        crypto: VirgilCrypto whose settings the workers use.
+            Defaults to VirgilCrypto.default().
+        max_workers: number of worker processes, see ProcessPoolExecutor.
+            Required with executor, where it is the number of its workers.
+        executor: ProcessPoolExecutor to run jobs on instead of an own one.
+        batch_size: number of records per job. By default records are
+            spread as four jobs per worker.
+
+    Raises:
+        ValueError: if executor is given without max_workers.
+    """
+
+    WORKER_KEY_CACHE_SIZE = 64
+    JOBS_PER_WORKER = 4
+
+    def __init__(self, crypto=None, max_workers=None, executor=None, batch_size=None):
+        if executor is not None and not max_workers:
+            raise ValueError("max_workers must be given with executor")
+        self.__crypto = crypto if crypto is not None else VirgilCrypto.default()
+        self.__own_executor = executor is None
+        self.__executor = executor if executor is not None else ProcessPoolExecutor(max_workers)
+        self.__workers = max_workers or multiprocessing.cpu_count()
+        self.batch_size = batch_size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    @property
+    def settings(self):
+        """Settings of the crypto passed to the workers."""
+        return self.__crypto.use_sha256_fingerprints, self.__crypto.return_bytes
+
+    def generate_signatures(self, records, private_key):
+        # type: (Iterable[Union[bytes, bytearray]], VirgilPrivateKey) -> List[bytearray]
+        """Signs every record using private key.
+
+        Returns:
+            List of signatures in the order of records.
+        """
+        return self.__map("generate_signature", records, (private_key,))
+
+    def verify_signatures(self, items):
+        # type: (Iterable[Tuple[bytearray, bytearray, VirgilPublicKey]]) -> bytearray
+        """Verifies (data, signature, public key) triples, see VirgilCrypto.verify_signatures_many.
+
+        Returns:
+            Bytearray with 1 for each valid signature and 0 otherwise, in the order of items.
+        """
+        items = [(self.__picklable(data), self.__picklable(signature), public_key)
+                 for data, signature, public_key in items]
+        batches = self.__batches(items)
+        results = bytearray()
+        for batch_results in self.__executor.map(_verify_in_worker, [self.settings] * len(batches), batches):
+            results += batch_results
+        return results
+
+    def encrypt(self, records, *recipients):
+        # type: (Iterable[Union[bytes, bytearray]], List[VirgilPublicKey]) -> List[bytearray]
+        """Encrypts every record using recipients Public keys.
+
+        Returns:
+            List of encrypted records in the order of records.
+        """
+        return self.__map("encrypt", records, recipients)
+
+    def decrypt(self, records, private_key):
+        # type: (Iterable[Union[bytes, bytearray]], VirgilPrivateKey) -> List[bytearray]
+        """Decrypts every record using Private key.
+
+        Returns:
+            List of decrypted records in the order of records.
+        """
+        return self.__map("decrypt", records, (private_key,))
+
+    def shutdown(self, wait=True):
+        """Shuts the worker processes down if the runner created them."""
+        if self.__own_executor:
+            self.__executor.shutdown(wait)
+
+    def __map(self, method_name, records, args):
+        batches = self.__batches([self.__picklable(record) for record in records])
+        futures = [
+            self.__executor.submit(_map_in_worker, self.settings, method_name, batch, tuple(args))
+            for batch in batches
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def __batches(self, records):
+        batch_size = self.batch_size
+        if batch_size is None:
+            jobs = self.__workers * self.JOBS_PER_WORKER
+            batch_size = max(1, -(-len(records) // jobs))
+        return [records[start:start + batch_size] for start in range(0, len(records), batch_size)]
+
+    @staticmethod
+    def __picklable(data):
+        # memoryview and mmap can't be pickled.
+        if isinstance(data, (bytes, bytearray, list, tuple)):
+            return data
+        return bytes(data)
@@ -0,0 +1,147 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import io
+import os
+import stat
+
+
+class StreamKind(object):
+    """Enumeration of stream kinds with different chunk size needs"""
+
+    MEMORY = "memory"
+    FILE = "file"
+    SOCKET = "socket"
+    UNKNOWN = "unknown"
+
+    @staticmethod
+    def detect(stream):
+        # type: (io.IOBase) -> str
+        """Detects kind of the stream.
+
+        Args:
+            stream: stream to inspect.
+
+        Returns:
+            One of StreamKind values. Pipes are reported as SOCKET.
+        """
+        if isinstance(stream, io.BytesIO):
+            return StreamKind.MEMORY
+        try:
+            mode = os.fstat(stream.fileno()).st_mode
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            return StreamKind.UNKNOWN
+        if stat.S_ISREG(mode):
+            return StreamKind.FILE
+        if stat.S_ISSOCK(mode) or stat.S_ISFIFO(mode):
+            return StreamKind.SOCKET
+        return StreamKind.UNKNOWN
+
+
+class AdaptiveChunkSize(object):
+    """Chunk size growing while it improves measured throughput.
+
+    Starts from a size suited to the stream kind and doubles it every time
+    a measurement window shows at least GROWTH_THRESHOLD better throughput
+    than the previous one. Growth stops at the first window that doesn't
+    improve or at the maximum for the stream kind.
+    """
+
+    # (initial, maximum) chunk sizes per stream kind.
+    LIMITS = {
+        StreamKind.MEMORY: (64 * 1024, 4 * 1024 * 1024),
+        StreamKind.FILE: (64 * 1024, 4 * 1024 * 1024),
+        StreamKind.SOCKET: (16 * 1024, 256 * 1024),
+        StreamKind.UNKNOWN: (8 * 1024, 1024 * 1024),
+    }
+    GROWTH_THRESHOLD = 1.1
+    WINDOW_CHUNKS = 4
+
+    def __init__(self, stream_kind=StreamKind.UNKNOWN, initial=None, maximum=None):
+        default_initial, default_maximum = self.LIMITS[stream_kind]
+        self.__size = initial or default_initial
+        self.__maximum = max(maximum or default_maximum, self.__size)
+        self.__settled = self.__size >= self.__maximum
+        self.__window_bytes = 0
+        self.__window_time = 0.0
+        self.__window_chunks = 0
+        self.__previous_throughput = None
+
+    @classmethod
+    def for_stream(cls, stream):
+        # type: (io.IOBase) -> AdaptiveChunkSize
+        """Creates chunk size tuned for the kind of the given stream."""
+        return cls(StreamKind.detect(stream))
+
+    @property
+    def size(self):
+        # type: () -> int
+        """Chunk size to use for the next read."""
+        return self.__size
+
+    @property
+    def settled(self):
+        # type: () -> bool
+        """True when the chunk size doesn't change any more."""
+        return self.__settled
+
+    def update(self, processed, elapsed):
+        # type: (int, float) -> None
+        """Records time spent on processing of one chunk.
+
+        Args:
+            processed: number of bytes processed.
+            elapsed: seconds spent reading, processing and writing the chunk.
+        """
+        if self.__settled:
+            return
+        self.__window_bytes += processed
+        self.__window_time += elapsed
+        self.__window_chunks += 1
+        if self.__window_chunks < self.WINDOW_CHUNKS:
+            return
+
+        throughput = self.__window_bytes / max(self.__window_time, 1e-9)
+        self.__window_bytes = 0
+        self.__window_time = 0.0
+        self.__window_chunks = 0
+
+        previous = self.__previous_throughput
+        self.__previous_throughput = throughput
+        if previous is not None and throughput < previous * self.GROWTH_THRESHOLD:
+            # The last doubling didn't pay off, go back to the previous size.
+            self.__size = max(self.__size // 2, 1)
+            self.__settled = True
+            return
+        self.__size = min(self.__size * 2, self.__maximum)
+        self.__settled = self.__size >= self.__maximum
@@ -0,0 +1,119 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import mmap
+import os
+from contextlib import contextmanager
+
+WINDOW_SIZE = 8 * 1024 * 1024
+"""Size of the parts of a mapped file passed to the library at once."""
+
+
+@contextmanager
+def map_input(file):
+    # type: (io.BufferedReader) -> Iterator[Union[mmap.mmap, bytes]]
+    """Maps a file opened for reading, hinting the kernel at sequential reads.
+
+    Yields:
+        Read-only mmap of the file, empty bytes for an empty file.
+    """
+    size = os.fstat(file.fileno()).st_size
+    if size == 0:
+        yield b""
+        return
+    _fadvise_sequential(file.fileno(), size)
+    mapped = mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ)
+    try:
+        _madvise_sequential(mapped)
+        yield mapped
+    finally:
+        _close(mapped)
+
+
+@contextmanager
+def map_output(file, size):
+    # type: (io.BufferedRandom, int) -> Iterator[mmap.mmap]
+    """Sizes a file opened for writing and maps it writable.
+
+    Args:
+        file: file opened in "w+b" mode.
+        size: size of the file, it can be truncated to the written length afterwards.
+
+    Yields:
+        Writable mmap of the file, empty bytearray for an empty file.
+    """
+    file.truncate(size)
+    if size == 0:
+        yield bytearray()
+        return
+    mapped = mmap.mmap(file.fileno(), size, access=mmap.ACCESS_WRITE)
+    try:
+        _madvise_sequential(mapped)
+        yield mapped
+    finally:
+        _close(mapped)
+
+
+def iter_windows(data, window_size=WINDOW_SIZE):
+    # type: (Union[mmap.mmap, bytes], int) -> Iterator[memoryview]
+    """Yields consecutive memoryviews of data of up to window_size bytes."""
+    view = memoryview(data)
+    for offset in range(0, len(view), window_size):
+        yield view[offset:offset + window_size]
+
+
+def _close(mapped):
+    # Views kept alive by the traceback of a failed call prevent closing,
+    # the mapping is closed when they are collected then.
+    try:
+        mapped.close()
+    except BufferError:
+        pass
+
+
+def _fadvise_sequential(fd, size):
+    advise = getattr(os, "posix_fadvise", None)
+    if advise is not None:
+        try:
+            advise(fd, 0, size, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+
+def _madvise_sequential(mapped):
+    advise = getattr(mapped, "madvise", None)
+    if advise is not None and hasattr(mmap, "MADV_SEQUENTIAL"):
+        try:
+            advise(mmap.MADV_SEQUENTIAL)
+        except OSError:
+            pass
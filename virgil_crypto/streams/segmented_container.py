@@ -0,0 +1,261 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import struct
+
+from virgil_crypto.errors.virgil_crypto_error import VirgilCryptoErrors
+from virgil_crypto.utils import foundation
+from virgil_crypto.utils import NativeBridge
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class SegmentedHeader(object):
+    """Header of the segmented container format.
+
+    The container is the header followed by segments of segment_size
+    plaintext bytes, each encrypted with AES-256-GCM under one data key and
+    followed by its tag. Only the last segment may be shorter, it is empty
+    for empty data. The data key is wrapped for the recipients as a regular
+    RecipientCipher message, so the same keys decrypt it as any other data.
+
+    Segment nonces are the nonce prefix, the segment index and a flag set
+    for the last segment, and every segment authenticates the whole header.
+    Segments can't be reordered, dropped, moved to another container or
+    truncated away without failing authentication. Segment positions follow
+    from the segment size, the header serves as the segment index.
+
+    Layout, big endian: magic, version, segment size (uint32),
+    nonce prefix (7 bytes), wrapped key length (uint32), wrapped key.
+    Segment size and wrapped key length are limited by MAX_SEGMENT_SIZE
+    and MAX_WRAPPED_KEY_LEN, so a header can't make a reader allocate
+    more than that.
+    """
+
+    MAGIC = b"VSGC"
+    VERSION = 1
+    NONCE_PREFIX_LEN = 7
+    KEY_LEN = 32
+    TAG_LEN = 16
+    DEFAULT_SEGMENT_SIZE = 64 * 1024
+    MAX_SEGMENT_COUNT = 2 ** 32
+    MAX_SEGMENT_SIZE = 16 * 1024 * 1024
+    MAX_WRAPPED_KEY_LEN = 1024 * 1024
+
+    __FIXED_PART = struct.Struct(">4sBI7sI")
+
+    def __init__(self, segment_size, nonce_prefix, wrapped_key):
+        if not 0 < segment_size <= self.MAX_SEGMENT_SIZE:
+            raise ValueError("Segment size must be positive and at most {}".format(self.MAX_SEGMENT_SIZE))
+        if len(nonce_prefix) != self.NONCE_PREFIX_LEN:
+            raise ValueError("Nonce prefix must be {} bytes".format(self.NONCE_PREFIX_LEN))
+        if len(wrapped_key) > self.MAX_WRAPPED_KEY_LEN:
+            raise ValueError("Wrapped key must be at most {} bytes".format(self.MAX_WRAPPED_KEY_LEN))
+        self.segment_size = segment_size
+        self.nonce_prefix = bytes(nonce_prefix)
+        self.wrapped_key = bytes(wrapped_key)
+        self.__serialized = self.__FIXED_PART.pack(
+            self.MAGIC, self.VERSION, segment_size, self.nonce_prefix, len(self.wrapped_key)
+        ) + self.wrapped_key
+
+    @classmethod
+    def read(cls, stream):
+        # type: (io.IOBase) -> SegmentedHeader
+        """Reads the header from the current position of stream.
+
+        Raises:
+            VirgilCryptoError: if stream doesn't start with a segmented container header.
+        """
+        fixed_part = read_exactly(stream, cls.__FIXED_PART.size)
+        if len(fixed_part) != cls.__FIXED_PART.size:
+            raise VirgilCryptoErrors.INVALID_SEGMENTED_CONTAINER
+        magic, version, segment_size, nonce_prefix, wrapped_key_len = cls.__FIXED_PART.unpack(bytes(fixed_part))
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise VirgilCryptoErrors.INVALID_SEGMENTED_CONTAINER
+        # Both lengths come from untrusted input and are checked before
+        # anything is allocated for them.
+        if not 0 < segment_size <= cls.MAX_SEGMENT_SIZE or wrapped_key_len > cls.MAX_WRAPPED_KEY_LEN:
+            raise VirgilCryptoErrors.INVALID_SEGMENTED_CONTAINER
+        wrapped_key = read_exactly(stream, wrapped_key_len)
+        if len(wrapped_key) != wrapped_key_len:
+            raise VirgilCryptoErrors.INVALID_SEGMENTED_CONTAINER
+        return cls(segment_size, nonce_prefix, wrapped_key)
+
+    def serialize(self):
+        # type: () -> bytes
+        """Header bytes written in front of the segments."""
+        return self.__serialized
+
+    def __len__(self):
+        return len(self.__serialized)
+
+    @property
+    def encrypted_segment_size(self):
+        # type: () -> int
+        """Size of a full segment in the container, including its tag."""
+        return self.segment_size + self.TAG_LEN
+
+    def segment_offset(self, index):
+        # type: (int) -> int
+        """Position of the segment relative to the start of the container."""
+        return len(self) + index * self.encrypted_segment_size
+
+    def segment_count(self, container_size):
+        # type: (int) -> int
+        """Number of segments in a container of the given total size.
+
+        Raises:
+            VirgilCryptoError: if the size can't be the size of a container with this header.
+        """
+        body_size = container_size - len(self)
+        segment_count = -(-body_size // self.encrypted_segment_size)
+        if body_size < self.TAG_LEN or body_size - (segment_count - 1) * self.encrypted_segment_size < self.TAG_LEN:
+            raise VirgilCryptoErrors.INVALID_SEGMENTED_CONTAINER
+        return segment_count
+
+    def plaintext_size(self, container_size):
+        # type: (int) -> int
+        """Size of the data stored in a container of the given total size."""
+        return container_size - len(self) - self.segment_count(container_size) * self.TAG_LEN
+
+
+class SegmentCipher(object):
+    """Encrypts and decrypts the segments of one container.
+
+    Holds an Aes256Gcm keyed with the data key, so an instance must not be
+    shared between threads.
+
+    Args:
+        data_key: 32 bytes data key of the container.
+        header: header of the container.
+    """
+
+    def __init__(self, data_key, header):
+        self.__header = header
+        self.__auth_data = header.serialize()
+        self.__aes_gcm = foundation.Aes256Gcm()
+        self.__aes_gcm.set_key(bytearray(data_key))
+        self.__native = NativeBridge.instance()
+
+    def encrypt_segment(self, index, data, final, out):
+        # type: (int, Union[bytes, bytearray, memoryview], bool, OutputBuffer) -> None
+        """Appends the encrypted segment and its tag to out."""
+        self.__native.auth_encrypt(self.__aes_gcm, self.__nonce(index, final), data, self.__auth_data, out)
+
+    def decrypt_segment(self, index, encrypted_segment, final, out):
+        # type: (int, Union[bytes, bytearray, memoryview], bool, OutputBuffer) -> None
+        """Authenticates the encrypted segment and appends its plaintext to out.
+
+        Raises:
+            VirgilCryptoError: if the segment is shorter than a tag.
+            VirgilCryptoFoundationError: if authentication fails.
+        """
+        tag_len = self.__header.TAG_LEN
+        if len(encrypted_segment) < tag_len:
+            raise VirgilCryptoErrors.INVALID_SEGMENTED_CONTAINER
+        encrypted_segment = memoryview(encrypted_segment)
+        self.__native.auth_decrypt(
+            self.__aes_gcm, self.__nonce(index, final), encrypted_segment[:-tag_len], self.__auth_data, encrypted_segment[-tag_len:], out
+        )
+
+    def __nonce(self, index, final):
+        if not 0 <= index < self.__header.MAX_SEGMENT_COUNT:
+            raise ValueError("Segment index out of range")
+        return self.__header.nonce_prefix + struct.pack(">IB", index, 1 if final else 0)
+
+
+def read_exactly(stream, size):
+    # type: (io.IOBase, int) -> bytearray
+    """Reads size bytes from stream, fewer only at the end of the stream.
+
+    Large sizes are read in READ_CHUNK_SIZE pieces, so memory grows with
+    the bytes actually read rather than with the requested size.
+    """
+    if size <= READ_CHUNK_SIZE:
+        buffer = bytearray(size)
+        return buffer[:read_into(stream, buffer)]
+    data = bytearray()
+    while len(data) < size:
+        chunk = bytearray(min(size - len(data), READ_CHUNK_SIZE))
+        read = read_into(stream, chunk)
+        data += memoryview(chunk)[:read]
+        if read < len(chunk):
+            break
+    return data
+
+
+def read_into(stream, buffer):
+    # type: (io.IOBase, bytearray) -> int
+    """Fills buffer from stream, returns the number of bytes read.
+
+    Unlike readinto() it only stops short at the end of the stream.
+    """
+    view = memoryview(buffer)
+    readinto = getattr(stream, "readinto", None)
+    filled = 0
+    while filled < len(buffer):
+        if readinto is not None:
+            read = readinto(view[filled:]) or 0
+        else:
+            chunk = stream.read(len(buffer) - filled)
+            read = len(chunk)
+            view[filled:filled + read] = chunk
+        if not read:
+            break
+        filled += read
+    return filled
+
+
+def iter_segments(stream, segment_size, reuse=True, first_index=0):
+    # type: (io.IOBase, int, bool, int) -> Iterator[Tuple[int, memoryview, bool]]
+    """Reads stream as (index, segment, final) tuples of segment_size pieces.
+
+    Data of a multiple of segment_size ends with a full final segment,
+    empty data is one empty final segment.
+    If reuse is set, a segment is only valid until the next one is read,
+    otherwise every segment is read into its own memory. Indexes start
+    from first_index.
+    """
+    current = bytearray(segment_size)
+    following = bytearray(segment_size)
+    current_len = read_into(stream, current)
+    index = first_index
+    while True:
+        following_len = read_into(stream, following) if current_len == segment_size else 0
+        final = following_len == 0
+        yield index, memoryview(current)[:current_len], final
+        if final:
+            return
+        current, following = following, current if reuse else bytearray(segment_size)
+        current_len = following_len
+        index += 1
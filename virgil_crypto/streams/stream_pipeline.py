@@ -0,0 +1,233 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import queue
+import threading
+import timeit
+from collections import namedtuple
+
+from virgil_crypto.utils.native_bridge import OutputBuffer
+
+PipelineStageStats = namedtuple(
+    'PipelineStageStats', ['items', 'busy', 'input_stall', 'output_stall']
+)
+PipelineStats = namedtuple(
+    'PipelineStats', ['reader', 'crypto', 'writer', 'bytes_read', 'elapsed']
+)
+
+_END = object()
+
+
+class _Stage(object):
+    """Time accounting of one pipeline stage."""
+
+    def __init__(self):
+        self.items = 0
+        self.busy = 0.0
+        self.input_stall = 0.0
+        self.output_stall = 0.0
+
+    def get(self, source):
+        started = timeit.default_timer()
+        item = source.get()
+        self.input_stall += timeit.default_timer() - started
+        return item
+
+    def take(self, pool):
+        # Waiting for a free buffer means that the next stage lags behind.
+        started = timeit.default_timer()
+        item = pool.get()
+        self.output_stall += timeit.default_timer() - started
+        return item
+
+    def put(self, target, item):
+        started = timeit.default_timer()
+        target.put(item)
+        self.output_stall += timeit.default_timer() - started
+
+    def stats(self):
+        # type: () -> PipelineStageStats
+        return PipelineStageStats(self.items, self.busy, self.input_stall, self.output_stall)
+
+
+class StreamPipeline(object):
+    """Stream engine overlapping reads, crypto and writes.
+
+    The input stream is read by a reader thread and the output stream is
+    written by a writer thread, while the calling thread runs the crypto.
+    The stages are joined by bounded queues, so at most depth chunks wait
+    between two stages. Library calls release the GIL, which lets slow
+    network reads or disk writes proceed while chunks are processed.
+
+    Every stage records time spent working and time stalled waiting for
+    input from the previous stage or for room in the next one. The stats
+    of the last run are available in the stats attribute: a stage that is
+    busy while the others stall is the bottleneck.
+
+    One pipeline runs one stream at a time.
+
+    Args:
+        depth: number of chunks queued between two stages.
+    """
+
+    DEFAULT_DEPTH = 4
+
+    def __init__(self, depth=DEFAULT_DEPTH):
+        if depth < 1:
+            raise ValueError("Pipeline depth must be positive")
+        self.depth = depth
+        self.stats = None  # type: Optional[PipelineStats]
+
+    def run(self, input_stream, chunk_size, process, write=None):
+        # type: (io.IOBase, int, Callable, Optional[Callable[[OutputBuffer], None]]) -> None
+        """Passes every chunk of the input stream through the stages.
+
+        Args:
+            input_stream: readable stream containing input data.
+            chunk_size: size of chunks read from input_stream.
+            process: process(chunk) without write, otherwise process(chunk, output)
+                appending the processed chunk to an OutputBuffer.
+            write: write(output) writes the output buffer and clears it.
+                Without it the pipeline has no writer stage.
+
+        Raises:
+            The first error raised by any of the stages.
+        """
+        reader = _Stage()
+        crypto = _Stage()
+        writer = _Stage() if write is not None else None
+        stop = threading.Event()
+        errors = {}
+        read_bytes = [0]
+
+        chunks = queue.Queue(maxsize=self.depth)
+        free_chunks = queue.Queue()
+        outputs = queue.Queue(maxsize=self.depth)
+        free_outputs = queue.Queue()
+        readinto = getattr(input_stream, "readinto", None)
+        if readinto is not None:
+            for _ in range(self.depth + 2):
+                free_chunks.put(bytearray(chunk_size))
+        if writer is not None:
+            for _ in range(self.depth + 1):
+                free_outputs.put(OutputBuffer())
+
+        def read():
+            try:
+                while not stop.is_set():
+                    buffer = reader.take(free_chunks) if readinto is not None else None
+                    started = timeit.default_timer()
+                    if buffer is None:
+                        chunk = input_stream.read(chunk_size)
+                    else:
+                        chunk = memoryview(buffer)[:readinto(buffer) or 0]
+                    reader.busy += timeit.default_timer() - started
+                    if not len(chunk):
+                        break
+                    reader.items += 1
+                    read_bytes[0] += len(chunk)
+                    reader.put(chunks, (buffer, chunk))
+            except BaseException as error:
+                errors["reader"] = error
+            finally:
+                chunks.put(_END)
+
+        def write_outputs():
+            while True:
+                output = writer.get(outputs)
+                if output is _END:
+                    return
+                if "writer" not in errors:
+                    started = timeit.default_timer()
+                    try:
+                        write(output)
+                    except BaseException as error:
+                        errors["writer"] = error
+                    writer.busy += timeit.default_timer() - started
+                    writer.items += 1
+                output.clear()
+                free_outputs.put(output)
+
+        started = timeit.default_timer()
+        threads = [threading.Thread(target=read, name="virgil-pipeline-reader")]
+        if writer is not None:
+            threads.append(threading.Thread(target=write_outputs, name="virgil-pipeline-writer"))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        drained = False
+        try:
+            while "writer" not in errors:
+                item = crypto.get(chunks)
+                if item is _END:
+                    drained = True
+                    break
+                buffer, chunk = item
+                output = crypto.take(free_outputs) if writer is not None else None
+                processed = timeit.default_timer()
+                if output is None:
+                    process(chunk)
+                else:
+                    process(chunk, output)
+                crypto.busy += timeit.default_timer() - processed
+                crypto.items += 1
+                if buffer is not None:
+                    free_chunks.put(buffer)
+                if output is not None:
+                    crypto.put(outputs, output)
+        finally:
+            if not drained:
+                # Unblocks the reader waiting for room in the queue or for a free buffer.
+                stop.set()
+                while True:
+                    item = chunks.get()
+                    if item is _END:
+                        break
+                    if item[0] is not None:
+                        free_chunks.put(item[0])
+            if writer is not None:
+                outputs.put(_END)
+            for thread in threads:
+                thread.join()
+            self.stats = PipelineStats(
+                reader.stats(),
+                crypto.stats(),
+                writer.stats() if writer is not None else None,
+                read_bytes[0],
+                timeit.default_timer() - started,
+            )
+
+        for stage in ("reader", "writer"):
+            if stage in errors:
+                raise errors[stage]
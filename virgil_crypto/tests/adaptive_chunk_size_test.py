@@ -0,0 +1,108 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import io
+import os
+import socket
+import tempfile
+import unittest
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.streams import AdaptiveChunkSize
+from virgil_crypto.streams import StreamKind
+
+
+class AdaptiveChunkSizeTest(unittest.TestCase):
+
+    def test_detects_stream_kind(self):
+        self.assertEqual(StreamKind.detect(io.BytesIO()), StreamKind.MEMORY)
+        with tempfile.TemporaryFile() as file_stream:
+            self.assertEqual(StreamKind.detect(file_stream), StreamKind.FILE)
+        left, right = socket.socketpair()
+        try:
+            with left.makefile("rb") as socket_stream:
+                self.assertEqual(StreamKind.detect(socket_stream), StreamKind.SOCKET)
+        finally:
+            left.close()
+            right.close()
+        self.assertEqual(StreamKind.detect(object()), StreamKind.UNKNOWN)
+
+    def __feed_window(self, chunk_size, throughput):
+        for _ in range(AdaptiveChunkSize.WINDOW_CHUNKS):
+            chunk_size.update(chunk_size.size, chunk_size.size / float(throughput))
+
+    def test_grows_while_throughput_improves(self):
+        chunk_size = AdaptiveChunkSize(initial=1024, maximum=16 * 1024)
+        self.__feed_window(chunk_size, 100)
+        self.assertEqual(chunk_size.size, 2048)
+        self.__feed_window(chunk_size, 200)
+        self.assertEqual(chunk_size.size, 4096)
+        self.__feed_window(chunk_size, 205)
+        self.assertEqual(chunk_size.size, 2048)
+        self.assertTrue(chunk_size.settled)
+        self.__feed_window(chunk_size, 1000)
+        self.assertEqual(chunk_size.size, 2048)
+
+    def test_stops_at_maximum(self):
+        chunk_size = AdaptiveChunkSize(initial=1024, maximum=4096)
+        for throughput in (1, 10, 100, 1000):
+            self.__feed_window(chunk_size, throughput)
+        self.assertEqual(chunk_size.size, 4096)
+        self.assertTrue(chunk_size.settled)
+
+    def test_stream_encryption_with_chunk_sizes(self):
+        data = os.urandom(40 * 1024 + 5)
+        crypto = VirgilCrypto(chunk_size=VirgilCrypto.ADAPTIVE_CHUNK_SIZE)
+        key_pair = crypto.generate_key_pair()
+
+        for encrypt_chunk_size, decrypt_chunk_size in [(None, 4096), (1000, None), (100 * 1024, 777)]:
+            encrypted_stream = io.BytesIO()
+            crypto.encrypt_stream(io.BytesIO(data), encrypted_stream, key_pair.public_key, chunk_size=encrypt_chunk_size)
+            decrypted_stream = io.BytesIO()
+            crypto.decrypt_stream(
+                io.BytesIO(encrypted_stream.getvalue()), decrypted_stream, key_pair.private_key, chunk_size=decrypt_chunk_size
+            )
+            self.assertEqual(decrypted_stream.getvalue(), data)
+
+        signature = crypto.generate_stream_signature(io.BytesIO(data), key_pair.private_key, chunk_size=3333)
+        self.assertTrue(crypto.verify_stream_signature(io.BytesIO(data), signature, key_pair.public_key))
+
+    def test_invalid_chunk_size_arguments(self):
+        crypto = VirgilCrypto()
+        key_pair = crypto.generate_key_pair()
+        self.assertRaises(
+            TypeError, crypto.encrypt_stream, io.BytesIO(b"data"), io.BytesIO(), key_pair.public_key, chunk=1
+        )
+        self.assertRaises(
+            ValueError, crypto.encrypt_stream, io.BytesIO(b"data"), io.BytesIO(), key_pair.public_key, chunk_size=0
+        )
@@ -0,0 +1,111 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import os
+import socket
+import unittest
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.aio import AsyncStreamCrypto
+
+
+class CollectingWriter(object):
+
+    def __init__(self):
+        self.data = bytearray()
+        self.drains = 0
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        self.drains += 1
+
+
+async def iterate(chunks):
+    for chunk in chunks:
+        await asyncio.sleep(0)
+        yield chunk
+
+
+class AsyncStreamCryptoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.crypto = VirgilCrypto(chunk_size=4096)
+        self.key_pair = self.crypto.generate_key_pair()
+        self.data = os.urandom(100 * 1024 + 7)
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_encrypts_from_async_iterator_in_executor(self):
+        stream_crypto = AsyncStreamCrypto(self.crypto, executor_threshold=16 * 1024)
+        chunks = [self.data[offset:offset + 20000] for offset in range(0, len(self.data), 20000)]
+        writer = CollectingWriter()
+        self.loop.run_until_complete(stream_crypto.encrypt_stream(iterate(chunks), writer, self.key_pair.public_key))
+        self.assertEqual(writer.drains, len(chunks) + 2)
+        self.assertEqual(self.crypto.decrypt(writer.data, self.key_pair.private_key), self.data)
+
+        decrypted = CollectingWriter()
+        encrypted_chunks = [writer.data[offset:offset + 5000] for offset in range(0, len(writer.data), 5000)]
+        self.loop.run_until_complete(stream_crypto.decrypt_stream(
+            iterate(encrypted_chunks), decrypted, self.key_pair.private_key
+        ))
+        self.assertEqual(decrypted.data, self.data)
+
+    def test_streams_through_socket(self):
+        stream_crypto = AsyncStreamCrypto(self.crypto)
+        encrypted = self.crypto.encrypt(self.data, self.key_pair.public_key)
+
+        async def transfer():
+            left, right = socket.socketpair()
+            _, left_writer = await asyncio.open_connection(sock=left)
+            right_reader, right_writer = await asyncio.open_connection(sock=right)
+
+            async def send():
+                source = asyncio.StreamReader()
+                source.feed_data(encrypted)
+                source.feed_eof()
+                await stream_crypto.decrypt_stream(source, left_writer, self.key_pair.private_key)
+                left_writer.close()
+
+            received = CollectingWriter()
+            await asyncio.gather(send(), stream_crypto.encrypt_stream(right_reader, received, self.key_pair.public_key))
+            right_writer.close()
+            return received.data
+
+        reencrypted = self.loop.run_until_complete(transfer())
+        self.assertEqual(self.crypto.decrypt(reencrypted, self.key_pair.private_key), self.data)
@@ -0,0 +1,167 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import os
+import threading
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.access_token_signer import AccessTokenSigner
+from virgil_crypto.aio import AsyncAccessTokenSigner
+from virgil_crypto.aio import AsyncCardCrypto
+from virgil_crypto.aio import AsyncVirgilCrypto
+from virgil_crypto.card_crypto import CardCrypto
+
+
+class CountingExecutor(ThreadPoolExecutor):
+
+    def __init__(self, max_workers):
+        super(CountingExecutor, self).__init__(max_workers)
+        self.__lock = threading.Lock()
+        self.__running = 0
+        self.submitted = 0
+        self.max_running = 0
+
+    def submit(self, function, *args, **kwargs):
+        with self.__lock:
+            self.submitted += 1
+        return super(CountingExecutor, self).submit(self.__counted, function, *args, **kwargs)
+
+    def __counted(self, function, *args, **kwargs):
+        with self.__lock:
+            self.__running += 1
+            self.max_running = max(self.max_running, self.__running)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            with self.__lock:
+                self.__running -= 1
+
+
+class AsyncVirgilCryptoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.crypto = VirgilCrypto()
+        self.key_pair = self.crypto.generate_key_pair()
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_runs_large_calls_in_executor(self):
+        executor = CountingExecutor(4)
+        async_crypto = AsyncVirgilCrypto(self.crypto, executor, max_concurrency=2, inline_threshold=1024)
+        small_data = b"small data"
+        large_data = os.urandom(4096)
+
+        async def run():
+            signature = await async_crypto.generate_signature(small_data, self.key_pair.private_key)
+            self.assertTrue(await async_crypto.verify_signature(small_data, signature, self.key_pair.public_key))
+            self.assertEqual(executor.submitted, 0)
+
+            encrypted = await asyncio.gather(*[
+                async_crypto.encrypt(large_data, self.key_pair.public_key) for _ in range(8)
+            ])
+            self.assertEqual(executor.submitted, 8)
+            self.assertLessEqual(executor.max_running, 2)
+            for message in encrypted:
+                self.assertEqual(await async_crypto.decrypt(message, self.key_pair.private_key), large_data)
+
+        try:
+            self.loop.run_until_complete(run())
+        finally:
+            executor.shutdown()
+
+    def test_process_executor(self):
+        executor = ProcessPoolExecutor(1)
+        async_crypto = AsyncVirgilCrypto(self.crypto, executor, inline_threshold=0)
+        data = os.urandom(1024)
+
+        async def run():
+            key_pair = await async_crypto.generate_key_pair()
+            encrypted = await async_crypto.sign_and_encrypt(data, key_pair.private_key, self.key_pair.public_key)
+            decrypted = await async_crypto.decrypt_and_verify(
+                encrypted, self.key_pair.private_key, [self.key_pair.public_key, key_pair.public_key]
+            )
+            self.assertEqual(decrypted, data)
+            self.assertEqual(await async_crypto.compute_hash(data), self.crypto.compute_hash(data))
+
+        try:
+            self.loop.run_until_complete(run())
+        finally:
+            executor.shutdown()
+
+    def test_card_crypto_and_access_token_signer(self):
+        async_crypto = AsyncVirgilCrypto(self.crypto)
+        card_crypto = AsyncCardCrypto(async_crypto)
+        token_signer = AsyncAccessTokenSigner(async_crypto)
+
+        async def run():
+            signature = await card_crypto.generate_signature(b"card", self.key_pair.private_key)
+            self.assertTrue(await card_crypto.verify_signature(signature, b"card", self.key_pair.public_key))
+            signature = await token_signer.generate_token_signature(b"token", self.key_pair.private_key)
+            self.assertTrue(await token_signer.verify_token_signature(signature, b"token", self.key_pair.public_key))
+            with self.assertRaises(ValueError):
+                await card_crypto.generate_signature(b"", self.key_pair.private_key)
+
+        self.loop.run_until_complete(run())
+
+    def test_validation_matches_sync_classes(self):
+        async_crypto = AsyncVirgilCrypto(self.crypto)
+        public_key, private_key = self.key_pair.public_key, self.key_pair.private_key
+        calls = [
+            (CardCrypto(self.crypto), AsyncCardCrypto(async_crypto), "generate_signature", (b"", private_key)),
+            (CardCrypto(self.crypto), AsyncCardCrypto(async_crypto), "generate_signature", (b"card", public_key)),
+            (CardCrypto(self.crypto), AsyncCardCrypto(async_crypto), "verify_signature", (b"", b"card", public_key)),
+            (CardCrypto(self.crypto), AsyncCardCrypto(async_crypto), "verify_signature", (b"s", b"card", None)),
+            (CardCrypto(self.crypto), AsyncCardCrypto(async_crypto), "export_public_key", (None,)),
+            (CardCrypto(self.crypto), AsyncCardCrypto(async_crypto), "import_public_key", (b"",)),
+            (CardCrypto(self.crypto), AsyncCardCrypto(async_crypto), "generate_sha512", (b"",)),
+            (AccessTokenSigner(self.crypto), AsyncAccessTokenSigner(async_crypto),
+             "generate_token_signature", (b"", private_key)),
+            (AccessTokenSigner(self.crypto), AsyncAccessTokenSigner(async_crypto),
+             "verify_token_signature", (b"s", b"token", private_key)),
+        ]
+
+        async def run():
+            for sync_object, async_object, method_name, args in calls:
+                with self.assertRaises(ValueError) as sync_error:
+                    getattr(sync_object, method_name)(*args)
+                with self.assertRaises(ValueError) as async_error:
+                    await getattr(async_object, method_name)(*args)
+                self.assertEqual(str(async_error.exception), str(sync_error.exception))
+
+        self.loop.run_until_complete(run())
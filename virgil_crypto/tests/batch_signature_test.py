@@ -0,0 +1,130 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import unittest
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.keys import KeyPairType
+
+
+class BatchSignatureTest(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(BatchSignatureTest, self).__init__(*args, **kwargs)
+        self.crypto = VirgilCrypto()
+        self.key_pairs = [
+            self.crypto.generate_key_pair(KeyPairType.ED25519),
+            self.crypto.generate_key_pair(KeyPairType.SECP256R1),
+            self.crypto.generate_key_pair(KeyPairType.ED25519),
+        ]
+
+    def __items(self):
+        items = []
+        for i in range(12):
+            key_pair = self.key_pairs[i % len(self.key_pairs)]
+            data = bytearray("record {}".format(i).encode())
+            signature = self.crypto.generate_signature(data, key_pair.private_key)
+            items.append((data, signature, key_pair.public_key))
+        return items
+
+    def test_verify_signatures_many(self):
+        items = self.__items()
+        data, signature, _ = items[3]
+        items[3] = (data, signature, self.key_pairs[1].public_key)
+        items[5] = (items[5][0], items[5][1][:-2], items[5][2])
+        items[7] = (bytearray(b"tampered"), items[7][1], items[7][2])
+
+        results = self.crypto.verify_signatures_many(items)
+
+        self.assertEqual(len(results), len(items))
+        self.assertEqual([i for i, result in enumerate(results) if not result], [3, 5, 7])
+
+    def test_verify_signatures_many_matches_verify_signature(self):
+        items = self.__items()
+        items[0] = (items[0][0], items[1][1], items[0][2])
+        expected = bytearray(self.crypto.verify_signature(*item) for item in items)
+        self.assertEqual(self.crypto.verify_signatures_many(items), expected)
+        self.assertEqual(self.crypto.verify_signatures_many(iter(items), max_workers=3), expected)
+
+    def test_verify_signatures_many_groups_by_identifier(self):
+        # Every key object of one signer falls into one group, so a single
+        # group is verified in the calling thread by a single Verifier.
+        import virgil_crypto_lib.foundation as foundation
+
+        verifiers = []
+
+        class CountingVerifier(foundation.Verifier):
+            def __init__(self):
+                super(CountingVerifier, self).__init__()
+                verifiers.append(self)
+
+        key_pair = self.key_pairs[0]
+        items = []
+        for i in range(4):
+            data = bytearray("record {}".format(i).encode())
+            public_key = self.crypto.import_public_key(self.crypto.export_public_key(key_pair.public_key))
+            items.append((data, self.crypto.generate_signature(data, key_pair.private_key), public_key))
+
+        verifier = foundation.Verifier
+        foundation.Verifier = CountingVerifier
+        try:
+            results = self.crypto.verify_signatures_many(items, max_workers=4)
+        finally:
+            foundation.Verifier = verifier
+
+        self.assertEqual(results, bytearray([1] * 4))
+        self.assertEqual(len(verifiers), 1)
+
+    def test_verify_signatures_many_empty(self):
+        self.assertEqual(self.crypto.verify_signatures_many([]), bytearray())
+
+    def test_generate_signatures_many(self):
+        key_pair = self.key_pairs[1]
+        records = [bytearray("record {}".format(i).encode()) for i in range(10)]
+
+        signatures = self.crypto.generate_signatures_many(iter(records), key_pair.private_key)
+
+        self.assertFalse(isinstance(signatures, list))
+        signatures = list(signatures)
+        self.assertEqual(len(signatures), len(records))
+        for record, signature in zip(records, signatures):
+            self.assertTrue(self.crypto.verify_signature(record, signature, key_pair.public_key))
+        self.assertFalse(self.crypto.verify_signature(records[0], signatures[1], key_pair.public_key))
+
+    def test_generate_signatures_many_is_deterministic_for_ed25519(self):
+        key_pair = self.key_pairs[0]
+        records = [bytearray(b"a"), [1, 2, 3], bytearray(b"a")]
+        signatures = list(self.crypto.generate_signatures_many(records, key_pair.private_key))
+        self.assertEqual(signatures[0], signatures[2])
+        self.assertEqual(signatures[0], self.crypto.generate_signature(records[0], key_pair.private_key))
+        self.assertEqual(signatures[1], self.crypto.generate_signature(records[1], key_pair.private_key))
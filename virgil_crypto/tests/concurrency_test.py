@@ -0,0 +1,94 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import io
+import threading
+import unittest
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.keys import KeyPairType
+
+
+class ConcurrencyTest(unittest.TestCase):
+
+    THREADS = 8
+    ROUNDS = 20
+
+    def test_shared_instance_under_threads(self):
+        crypto = VirgilCrypto()
+        key_pairs = [crypto.generate_key_pair(KeyPairType.ED25519) for _ in range(2)]
+        barrier = threading.Barrier(self.THREADS)
+        randoms = []
+        rngs = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker(number):
+            try:
+                barrier.wait()
+                rngs.append(crypto.rng)
+                own_key_pair = crypto.generate_key_pair()
+                for i in range(self.ROUNDS):
+                    data = bytearray("thread {} round {}".format(number, i).encode())
+                    key_pair = key_pairs[i % 2]
+
+                    encrypted = crypto.encrypt(data, key_pair.public_key, own_key_pair.public_key)
+                    self.assertEqual(crypto.decrypt(encrypted, key_pair.private_key), data)
+                    self.assertEqual(crypto.decrypt(encrypted, own_key_pair.private_key), data)
+
+                    signed = crypto.sign_and_encrypt(data, own_key_pair.private_key, key_pair.public_key)
+                    self.assertEqual(
+                        crypto.decrypt_and_verify(signed, key_pair.private_key, own_key_pair.public_key), data
+                    )
+
+                    output_stream = io.BytesIO()
+                    crypto.encrypt_stream(io.BytesIO(data), output_stream, key_pair.public_key)
+                    decrypted_stream = io.BytesIO()
+                    crypto.decrypt_stream(io.BytesIO(output_stream.getvalue()), decrypted_stream, key_pair.private_key)
+                    self.assertEqual(decrypted_stream.getvalue(), data)
+
+                    with lock:
+                        randoms.append(bytes(crypto.generate_random_data(32)))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(set(map(id, rngs))), self.THREADS)
+        self.assertEqual(len(randoms), self.THREADS * self.ROUNDS)
+        self.assertEqual(len(set(randoms)), len(randoms))
@@ -31,8 +31,13 @@
 # STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
 # IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
+import array
 import hashlib
 import io
+import mmap
+import os
+import shutil
+import tempfile
 import unittest
 from base64 import b64decode
 
@@ -42,6 +47,7 @@ from virgil_crypto import VirgilCrypto
 from virgil_crypto.errors import VirgilCryptoError
 from virgil_crypto.hashes import HashAlgorithm
 from virgil_crypto.keys import KeyPairType
+from virgil_crypto.message_info import summarize_message_info
 
 
 class CryptoTest(unittest.TestCase):
@@ -462,3 +468,235 @@ class CryptoTest(unittest.TestCase):
             self.assertTrue(key_id, key_pair.private_key.identifier)
             self.assertTrue(key_pair.private_key.identifier, key_pair.public_key.identifier)
             retries -= 1
+
+    def test_public_key_der_is_cached(self):
+        crypto = VirgilCrypto()
+        key_pair = crypto.generate_key_pair()
+        exported = crypto.export_public_key(key_pair.public_key)
+        exported[0] ^= 0xFF
+        self.assertNotEqual(exported, crypto.export_public_key(key_pair.public_key))
+
+        imported_public_key = crypto.import_public_key(crypto.export_public_key(key_pair.public_key))
+        self.assertEqual(imported_public_key._public_key_der, key_pair.public_key._public_key_der)
+        self.assertEqual(crypto.export_public_key(imported_public_key), crypto.export_public_key(key_pair.public_key))
+
+    def test_public_key_identifier_variants_are_cached(self):
+        crypto_sha512 = VirgilCrypto()
+        crypto_sha256 = VirgilCrypto(use_sha256_fingerprints=True)
+        key_pair = crypto_sha512.generate_key_pair()
+        public_key_der = bytearray(crypto_sha512.export_public_key(key_pair.public_key))
+
+        self.assertEqual(
+            crypto_sha512.compute_public_key_identifier(key_pair.public_key),
+            key_pair.public_key.identifier
+        )
+        self.assertEqual(
+            bytes(crypto_sha256.compute_public_key_identifier(key_pair.private_key)),
+            hashlib.sha256(public_key_der).digest()
+        )
+        self.assertEqual(
+            bytes(crypto_sha512.compute_public_key_identifier(key_pair.public_key.public_key)),
+            hashlib.sha512(public_key_der).digest()[:8]
+        )
+
+        extracted_public_key = crypto_sha512.extract_public_key(key_pair.private_key)
+        self.assertEqual(set(extracted_public_key._identifiers), {False, True})
+        self.assertEqual(
+            crypto_sha256.compute_public_key_identifier(extracted_public_key),
+            crypto_sha256.compute_public_key_identifier(key_pair.public_key)
+        )
+
+        imported_key_pair = crypto_sha256.import_private_key(crypto_sha256.export_private_key(key_pair.private_key))
+        self.assertEqual(bytes(imported_key_pair.public_key.identifier), hashlib.sha256(public_key_der).digest())
+        self.assertIs(imported_key_pair.private_key._identifiers, imported_key_pair.public_key._identifiers)
+
+    def test_accepts_bytes_like_data(self):
+        crypto = self._crypto()
+        key_pair = crypto.generate_key_pair()
+        raw_data = bytes(bytearray(range(256)) * 4)
+        with tempfile.TemporaryFile() as data_file:
+            data_file.write(raw_data)
+            data_file.flush()
+            mapped_data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                for data in (raw_data, memoryview(b"x" + raw_data)[1:], mapped_data, array.array("I", raw_data)):
+                    encrypted = crypto.encrypt(data, key_pair.public_key)
+                    self.assertEqual(crypto.decrypt(memoryview(encrypted), key_pair.private_key), raw_data)
+                    signature = crypto.generate_signature(data, key_pair.private_key)
+                    self.assertTrue(crypto.verify_signature(data, signature, key_pair.public_key))
+                    self.assertEqual(bytes(crypto.compute_hash(data)), hashlib.sha512(raw_data).digest())
+            finally:
+                mapped_data.close()
+
+    def test_return_bytes(self):
+        crypto = VirgilCrypto(return_bytes=True)
+        key_pair = crypto.generate_key_pair()
+        encrypted = crypto.sign_and_encrypt(b"data", key_pair.private_key, key_pair.public_key)
+        self.assertIsInstance(encrypted, bytes)
+        decrypted = crypto.decrypt_and_verify(encrypted, key_pair.private_key, key_pair.public_key)
+        self.assertEqual(decrypted, b"data")
+        self.assertIsInstance(decrypted, bytes)
+        self.assertIsInstance(self._crypto().decrypt(encrypted, key_pair.private_key), bytearray)
+
+    def test_encrypt_into_and_decrypt_into(self):
+        crypto = self._crypto()
+        key_pairs = [crypto.generate_key_pair(), crypto.generate_key_pair(KeyPairType.SECP256R1)]
+        public_keys = [key_pair.public_key for key_pair in key_pairs]
+        for data in (b"", b"data", bytes(bytearray(range(256))) * 40):
+            encrypted = crypto.encrypt(data, *public_keys)
+            self.assertEqual(len(encrypted), len(crypto.encrypt(data, *public_keys)))
+
+            output = bytearray(len(encrypted) + 10)
+            written = crypto.encrypt_into(data, output, *public_keys)
+            self.assertEqual(written, len(encrypted))
+            with self.assertRaises(ValueError):
+                crypto.encrypt_into(data, bytearray(written - 1), *public_keys)
+
+            for key_pair in key_pairs:
+                decrypted = bytearray(len(data))
+                read = crypto.decrypt_into(memoryview(output)[:written], decrypted, key_pair.private_key)
+                self.assertEqual(read, len(data))
+                self.assertEqual(decrypted, data)
+            if data:
+                with self.assertRaises(ValueError):
+                    crypto.decrypt_into(encrypted, bytearray(len(data) - 1), key_pairs[0].private_key)
+
+    def test_encrypt_and_decrypt_iter(self):
+        crypto = self._crypto()
+        key_pair = crypto.generate_key_pair()
+        chunks = [b"first chunk", bytearray(b""), memoryview(b"second chunk"), bytes(bytearray(range(256))) * 100]
+        data = b"".join(bytes(chunk) for chunk in chunks)
+
+        encrypted_chunks = list(crypto.encrypt_iter(iter(chunks), key_pair.public_key))
+        self.assertGreater(len(encrypted_chunks), 2)
+        encrypted = b"".join(encrypted_chunks)
+        self.assertEqual(crypto.decrypt(encrypted, key_pair.private_key), data)
+
+        encrypted = crypto.encrypt(data, key_pair.public_key)
+        pieces = (encrypted[offset:offset + 1000] for offset in range(0, len(encrypted), 1000))
+        self.assertEqual(b"".join(crypto.decrypt_iter(pieces, key_pair.private_key)), data)
+
+    def test_inspect_message_info(self):
+        crypto = self._crypto()
+        key_pair_1 = crypto.generate_key_pair()
+        key_pair_2 = crypto.generate_key_pair()
+        data = b"message to route"
+
+        encrypted = crypto.sign_and_encrypt(data, key_pair_1.private_key, key_pair_1.public_key, key_pair_2.public_key)
+        summary = crypto.inspect_message_info(encrypted)
+        self.assertEqual(
+            sorted(bytes(recipient_id) for recipient_id in summary.recipient_ids),
+            sorted([bytes(key_pair_1.public_key.identifier), bytes(key_pair_2.public_key.identifier)])
+        )
+        self.assertIn(VirgilCrypto.CUSTOM_PARAM_KEY_SIGNER_ID, summary.custom_param_keys)
+        self.assertLess(summary.header_length, len(encrypted))
+
+        output_stream = io.BytesIO()
+        crypto.encrypt_stream(io.BytesIO(data), output_stream, key_pair_2.public_key)
+        input_stream = io.BytesIO(output_stream.getvalue())
+        summary = crypto.inspect_message_info(input_stream)
+        self.assertEqual(summary.recipient_ids, [key_pair_2.public_key.identifier])
+        self.assertEqual(summary.custom_param_keys, [])
+        self.assertEqual(input_stream.tell(), summary.header_length)
+
+        self.assertRaises(VirgilCryptoError, crypto.inspect_message_info, b"too short")
+        self.assertRaises(VirgilCryptoError, crypto.inspect_message_info, bytes(bytearray(64)))
+
+    def test_inspect_corrupted_message_info(self):
+        crypto = self._crypto()
+        key_pair = crypto.generate_key_pair()
+        encrypted = crypto.sign_and_encrypt(b"message to route", key_pair.private_key, key_pair.public_key)
+        header_length = crypto.inspect_message_info(encrypted).header_length
+        message_info = bytes(encrypted[:header_length])
+
+        for length in range(header_length):
+            self.assertRaises(VirgilCryptoError, summarize_message_info, bytearray(message_info[:length]))
+            self.assertRaises(VirgilCryptoError, crypto.inspect_message_info, message_info[:length])
+
+        # Content type OIDs the native deserializer asserts on instead of failing
+        data_oid = b"\x06\x09\x2a\x86\x48\x86\xf7\x0d\x01\x07\x01"
+        enveloped_data_oid = b"\x06\x09\x2a\x86\x48\x86\xf7\x0d\x01\x07\x03"
+        for oid in (data_oid, enveloped_data_oid):
+            corrupted = bytearray(encrypted)
+            corrupted[corrupted.index(oid) + len(oid) - 1] ^= 0xff
+            self.assertRaises(VirgilCryptoError, crypto.inspect_message_info, corrupted)
+
+        errors = 0
+        for offset in range(0, header_length, 7):
+            corrupted = bytearray(encrypted)
+            corrupted[offset] = 0xff
+            try:
+                crypto.inspect_message_info(corrupted)
+            except VirgilCryptoError:
+                errors += 1
+        self.assertGreater(errors, 0)
+
+    def test_encrypt_and_decrypt_file(self):
+        crypto = self._crypto()
+        key_pair = crypto.generate_key_pair()
+        directory = tempfile.mkdtemp()
+        try:
+            plain_path = os.path.join(directory, "plain")
+            encrypted_path = os.path.join(directory, "encrypted")
+            decrypted_path = os.path.join(directory, "decrypted")
+            for data in (b"", b"file data", os.urandom(3 * 1024 * 1024 + 17)):
+                with open(plain_path, "wb") as plain_file:
+                    plain_file.write(data)
+
+                crypto.encrypt_file(plain_path, encrypted_path, key_pair.public_key)
+                with open(encrypted_path, "rb") as encrypted_file:
+                    encrypted = encrypted_file.read()
+                self.assertEqual(crypto.decrypt(encrypted, key_pair.private_key), data)
+
+                crypto.decrypt_file(encrypted_path, decrypted_path, key_pair.private_key)
+                with open(decrypted_path, "rb") as decrypted_file:
+                    self.assertEqual(decrypted_file.read(), data)
+
+            with open(encrypted_path, "wb") as encrypted_file:
+                encrypted_file.write(encrypted[:-1])
+            self.assertRaises(
+                VirgilCryptoFoundationError, crypto.decrypt_file, encrypted_path, decrypted_path, key_pair.private_key
+            )
+            self.assertRaises(
+                VirgilCryptoError, crypto.decrypt_file, plain_path, decrypted_path, key_pair.private_key
+            )
+            # Failures leave the existing destination and no temporary files.
+            with open(decrypted_path, "rb") as decrypted_file:
+                self.assertEqual(decrypted_file.read(), data)
+            self.assertEqual(sorted(os.listdir(directory)), ["decrypted", "encrypted", "plain"])
+
+            self.assertRaises(
+                VirgilCryptoFoundationError, crypto.decrypt_file, encrypted_path, decrypted_path + "2",
+                key_pair.private_key
+            )
+            self.assertFalse(os.path.exists(decrypted_path + "2"))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_encrypt_and_decrypt_file_in_place(self):
+        crypto = self._crypto()
+        key_pair = crypto.generate_key_pair()
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "data")
+            link_path = os.path.join(directory, "link")
+            data = os.urandom(1024)
+            with open(path, "wb") as data_file:
+                data_file.write(data)
+            self.assertRaises(ValueError, crypto.encrypt_file, path, path, key_pair.public_key)
+            if hasattr(os, "symlink"):
+                os.symlink(path, link_path)
+                self.assertRaises(ValueError, crypto.encrypt_file, path, link_path, key_pair.public_key)
+                os.remove(link_path)
+            with open(path, "rb") as data_file:
+                self.assertEqual(data_file.read(), data)
+
+            encrypted = crypto.encrypt(data, key_pair.public_key)
+            with open(path, "wb") as data_file:
+                data_file.write(encrypted)
+            self.assertRaises(ValueError, crypto.decrypt_file, path, path, key_pair.private_key)
+            with open(path, "rb") as data_file:
+                self.assertEqual(data_file.read(), encrypted)
+            self.assertEqual(os.listdir(directory), ["data"])
+        finally:
+            shutil.rmtree(directory)
@@ -0,0 +1,84 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import os
+import subprocess
+import sys
+import unittest
+
+import virgil_crypto
+
+
+class ImportTimeTest(unittest.TestCase):
+
+    FOUNDATION = "virgil_crypto_lib.foundation"
+
+    @staticmethod
+    def __loaded_modules(statement):
+        # Runs statement in a fresh interpreter and returns the names of
+        # the modules loaded by it.
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(virgil_crypto.__file__)))
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+        process = subprocess.Popen(
+            [sys.executable, "-c", statement + "\nimport sys\nprint('\\n'.join(sys.modules))"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+            universal_newlines=True
+        )
+        modules, errors = process.communicate()
+        if process.returncode != 0:
+            raise AssertionError(errors)
+        return modules.splitlines()
+
+    def test_import_does_not_load_foundation(self):
+        modules = self.__loaded_modules(
+            "import virgil_crypto, virgil_crypto.card_crypto, virgil_crypto.access_token_signer\n"
+            "virgil_crypto.card_crypto.CardCrypto()\n"
+            "virgil_crypto.access_token_signer.AccessTokenSigner()"
+        )
+        self.assertIn("virgil_crypto.card_crypto", modules)
+        self.assertEqual([module for module in modules if module.startswith(self.FOUNDATION)], [])
+
+    def test_foundation_is_loaded_on_first_use(self):
+        modules = self.__loaded_modules(
+            "import virgil_crypto\n"
+            "virgil_crypto.VirgilCrypto().generate_random_data(8)"
+        )
+        self.assertIn(self.FOUNDATION, modules)
+
+    def test_pools_do_not_load_concurrent_futures(self):
+        modules = self.__loaded_modules("import virgil_crypto.pools")
+        self.assertIn("virgil_crypto.pools.key_pair_pool", modules)
+        self.assertNotIn("concurrent.futures", modules)
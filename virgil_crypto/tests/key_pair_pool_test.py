@@ -0,0 +1,155 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import gc
+import os
+import signal
+import threading
+import time
+import unittest
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.keys import KeyPairType
+from virgil_crypto.pools import KeyPairPool
+from virgil_crypto.pools.key_pair_pool import _live_pools
+
+
+class KeyPairPoolTest(unittest.TestCase):
+
+    def wait_for_depth(self, pool, key_type, depth):
+        deadline = time.time() + 60
+        while pool.depth(key_type) < depth and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(pool.depth(key_type), depth)
+
+    def test_hands_out_distinct_pairs(self):
+        crypto = VirgilCrypto()
+        with KeyPairPool({KeyPairType.ED25519: 3}, crypto) as pool:
+            self.wait_for_depth(pool, KeyPairType.ED25519, 3)
+            pairs = [pool.get(KeyPairType.ED25519) for _ in range(5)]
+            self.wait_for_depth(pool, KeyPairType.ED25519, 3)
+
+            identifiers = set(bytes(pair.private_key.identifier) for pair in pairs)
+            self.assertEqual(len(identifiers), 5)
+            data = os.urandom(64)
+            signature = crypto.generate_signature(data, pairs[0].private_key)
+            self.assertTrue(crypto.verify_signature(data, signature, pairs[0].public_key))
+
+            stats = pool.stats(KeyPairType.ED25519)
+            self.assertEqual(stats.target_depth, 3)
+            self.assertEqual(stats.hits + stats.misses, 5)
+            self.assertGreaterEqual(stats.refills, 3 + stats.hits)
+            self.assertGreater(stats.average_refill_latency, 0)
+
+    def test_unconfigured_key_type(self):
+        with KeyPairPool({KeyPairType.ED25519: 1}) as pool:
+            key_pair = pool.get(KeyPairType.SECP256R1)
+            self.assertEqual(key_pair.private_key.key_type, KeyPairType.SECP256R1)
+            self.assertEqual(pool.stats(KeyPairType.SECP256R1).depth, 0)
+
+    def test_process_refill(self):
+        executor = ProcessPoolExecutor(1)
+        try:
+            with KeyPairPool({KeyPairType.CURVE25519: 2}, executor=executor) as pool:
+                self.wait_for_depth(pool, KeyPairType.CURVE25519, 2)
+                key_pair = pool.get(KeyPairType.CURVE25519)
+                data = os.urandom(64)
+                encrypted = VirgilCrypto().encrypt(data, key_pair.public_key)
+                self.assertEqual(VirgilCrypto().decrypt(encrypted, key_pair.private_key), data)
+        finally:
+            executor.shutdown()
+
+    def test_retries_failed_refills(self):
+        class FlakyCrypto(object):
+            failures = 2
+
+            def generate_key_pair(self, key_type):
+                if self.failures:
+                    self.failures -= 1
+                    raise RuntimeError("No entropy")
+                return VirgilCrypto().generate_key_pair(key_type)
+
+        class FastRetryPool(KeyPairPool):
+            RETRY_DELAY = 0.01
+
+        with FastRetryPool({KeyPairType.ED25519: 1}, FlakyCrypto(), max_workers=1) as pool:
+            self.wait_for_depth(pool, KeyPairType.ED25519, 1)
+            stats = pool.stats(KeyPairType.ED25519)
+            self.assertEqual(stats.failures, 2)
+            self.assertEqual(stats.refills, 1)
+            self.assertIsInstance(stats.last_error, RuntimeError)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_child_does_not_deadlock_on_lock_held_at_fork(self):
+        with KeyPairPool({KeyPairType.ED25519: 1}) as pool:
+            self.wait_for_depth(pool, KeyPairType.ED25519, 1)
+            locked = threading.Event()
+            forked = threading.Event()
+
+            def hold_lock():
+                with pool._KeyPairPool__lock:
+                    locked.set()
+                    forked.wait()
+
+            thread = threading.Thread(target=hold_lock)
+            thread.start()
+            locked.wait()
+            pid = os.fork()
+            if pid == 0:
+                code = 1
+                try:
+                    signal.alarm(10)
+                    key_pair = pool.get(KeyPairType.ED25519)
+                    code = 0 if key_pair.private_key.key_type is KeyPairType.ED25519 else 1
+                finally:
+                    os._exit(code)
+            forked.set()
+            thread.join()
+            _, status = os.waitpid(pid, 0)
+            self.assertTrue(os.WIFEXITED(status))
+            self.assertEqual(os.WEXITSTATUS(status), 0)
+
+    def test_fork_hook_does_not_keep_pools_alive(self):
+        pool = KeyPairPool({KeyPairType.ED25519: 1})
+        self.assertIn(pool, _live_pools)
+        pool.close()
+        self.assertNotIn(pool, _live_pools)
+        released = weakref.ref(pool)
+        del pool
+        gc.collect()
+        self.assertIsNone(released())
+
+    def test_negative_depth(self):
+        self.assertRaises(ValueError, KeyPairPool, {KeyPairType.ED25519: -1})
@@ -0,0 +1,77 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import copy
+import pickle
+import unittest
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.keys import KeyPairType
+from virgil_crypto.keys import key_pickling
+
+
+class KeyPicklingTest(unittest.TestCase):
+
+    def test_keys_survive_pickling(self):
+        crypto = VirgilCrypto(use_sha256_fingerprints=True)
+        for key_type in (KeyPairType.ED25519, KeyPairType.SECP256R1, KeyPairType.CURVE25519):
+            key_pair = crypto.generate_key_pair(key_type)
+            restored = pickle.loads(pickle.dumps(key_pair, protocol=2))
+
+            self.assertEqual(restored.private_key.identifier, key_pair.private_key.identifier)
+            self.assertEqual(restored.public_key.identifier, key_pair.public_key.identifier)
+            self.assertIs(restored.private_key.key_type, key_type)
+            self.assertIs(restored.public_key.key_type, key_type)
+            self.assertEqual(
+                crypto.export_private_key(restored.private_key),
+                crypto.export_private_key(key_pair.private_key)
+            )
+
+            encrypted = crypto.encrypt(b"data", restored.public_key)
+            self.assertEqual(crypto.decrypt(encrypted, key_pair.private_key), b"data")
+
+    def test_restored_keys_cached_only_when_enabled(self):
+        key_pair = VirgilCrypto().generate_key_pair()
+        self.assertIsNot(copy.deepcopy(key_pair.public_key), copy.deepcopy(key_pair.public_key))
+
+        cache = key_pickling._restored_keys
+        try:
+            key_pickling._restored_keys = None
+            key_pickling.enable_restored_key_cache(4)
+            self.assertIs(copy.deepcopy(key_pair.private_key), copy.deepcopy(key_pair.private_key))
+            private_key_der = bytes(VirgilCrypto().export_private_key(key_pair.private_key))
+            for cache_key in key_pickling._restored_keys._PublicKeyCache__keys:
+                self.assertNotIn(private_key_der, [bytes(part) for part in cache_key])
+        finally:
+            key_pickling._restored_keys = cache
@@ -0,0 +1,84 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import threading
+import unittest
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.pools import KeyProviderPool
+
+
+class KeyProviderPoolTest(unittest.TestCase):
+
+    def test_reuses_released_provider(self):
+        pool = KeyProviderPool(max_size=2)
+        with pool.borrow() as key_provider_1:
+            pass
+        with pool.borrow() as key_provider_2:
+            self.assertIs(key_provider_1, key_provider_2)
+
+    def test_keeps_no_more_than_max_size(self):
+        pool = KeyProviderPool(max_size=2)
+        key_providers = [pool.acquire() for _ in range(4)]
+        for key_provider in key_providers:
+            pool.release(key_provider)
+        self.assertEqual(pool.idle_count, 2)
+
+    def test_concurrent_borrowers_get_distinct_providers(self):
+        pool = KeyProviderPool(max_size=4)
+        barrier = threading.Barrier(4)
+        borrowed = []
+
+        def borrow():
+            with pool.borrow() as key_provider:
+                borrowed.append(key_provider)
+                barrier.wait()
+
+        threads = [threading.Thread(target=borrow) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(map(id, borrowed))), 4)
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, KeyProviderPool, 0)
+
+    def test_pooled_import_export(self):
+        crypto = VirgilCrypto()
+        key_pair = crypto.generate_key_pair()
+        for _ in range(3):
+            exported_private_key = crypto.export_private_key(key_pair.private_key)
+            exported_public_key = crypto.export_public_key(key_pair.public_key)
+            self.assertEqual(crypto.import_private_key(exported_private_key).private_key, key_pair.private_key)
+            self.assertEqual(crypto.import_public_key(exported_public_key), key_pair.public_key)
@@ -0,0 +1,175 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import hashlib
+import io
+import os
+import unittest
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.hashes import HashAlgorithm
+from virgil_crypto.utils import native_bridge
+from virgil_crypto.utils import NativeBridge
+from virgil_crypto.utils import OutputBuffer
+
+
+class ReadOnlyStream(object):
+    """Stream without readinto, like most hand written stream wrappers."""
+
+    closed = False
+
+    def __init__(self, data):
+        self.__data = io.BytesIO(data)
+
+    def read(self, size):
+        return self.__data.read(size)
+
+
+class ChunkListStream(object):
+    """Stream keeping written chunks as they are."""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, chunk):
+        self.chunks.append(chunk)
+
+
+class NativeBridgeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.crypto = VirgilCrypto(chunk_size=1000)
+        self.key_pair = self.crypto.generate_key_pair()
+        self.data = os.urandom(10 * 1000 + 17)
+
+    def test_output_buffer_keeps_data_when_growing(self):
+        output = OutputBuffer(4)
+        output.append(b"abc")
+        output.append(b"defgh")
+        self.assertGreaterEqual(output.capacity, 8)
+        self.assertEqual(output.view().tobytes(), b"abcdefgh")
+        output.clear()
+        self.assertEqual(len(output), 0)
+
+    def test_accepts_buffer_protocol_data(self):
+        bridge = NativeBridge.instance()
+        for data in (b"data", bytearray(b"data"), memoryview(b"xdata")[1:]):
+            native_data, owner = bridge.data(data)
+            self.assertEqual(native_data.len, 4)
+            self.assertIsNotNone(owner)
+
+    def test_stream_roundtrip_with_and_without_readinto(self):
+        for input_stream in (io.BytesIO(self.data), ReadOnlyStream(self.data)):
+            encrypted = io.BytesIO()
+            self.crypto.encrypt_stream(input_stream, encrypted, self.key_pair.public_key)
+            self.assertEqual(self.crypto.decrypt(encrypted.getvalue(), self.key_pair.private_key), self.data)
+
+    def test_custom_output_stream_gets_own_chunks(self):
+        encrypted = self.crypto.encrypt(self.data, self.key_pair.public_key)
+        output_stream = ChunkListStream()
+        self.crypto.decrypt_stream(io.BytesIO(encrypted), output_stream, self.key_pair.private_key)
+        self.assertEqual(b"".join(bytes(chunk) for chunk in output_stream.chunks), self.data)
+
+    def test_stream_signature_matches_signature(self):
+        signature = self.crypto.generate_stream_signature(ReadOnlyStream(self.data), self.key_pair.private_key)
+        self.assertTrue(self.crypto.verify_signature(self.data, signature, self.key_pair.public_key))
+        self.assertTrue(self.crypto.verify_stream_signature(
+            io.BytesIO(self.data), signature, self.key_pair.public_key
+        ))
+
+
+class FallbackBridgeTest(unittest.TestCase):
+    """Runs the hot paths through the generated bridge, as when the library can't be loaded."""
+
+    def setUp(self):
+        def load_library(name):
+            raise OSError("{} is not available".format(name))
+
+        self.__native = NativeBridge.instance()
+        self.__load_library = native_bridge._load_library
+        native_bridge._load_library = load_library
+        try:
+            self.bridge = NativeBridge()
+        finally:
+            native_bridge._load_library = self.__load_library
+        NativeBridge._NativeBridge__instance = self.bridge
+
+        self.crypto = VirgilCrypto(chunk_size=1000)
+        self.key_pair = self.crypto.generate_key_pair()
+        self.data = os.urandom(10 * 1000 + 17)
+
+    def tearDown(self):
+        NativeBridge._NativeBridge__instance = self.__native
+
+    def test_not_available(self):
+        self.assertFalse(self.bridge.available)
+        self.assertTrue(self.__native.available)
+
+    def test_stream_roundtrip(self):
+        encrypted = io.BytesIO()
+        self.crypto.encrypt_stream(io.BytesIO(self.data), encrypted, self.key_pair.public_key)
+        decrypted = io.BytesIO()
+        self.crypto.decrypt_stream(io.BytesIO(encrypted.getvalue()), decrypted, self.key_pair.private_key)
+        self.assertEqual(decrypted.getvalue(), self.data)
+
+        NativeBridge._NativeBridge__instance = self.__native
+        self.assertEqual(self.crypto.decrypt(encrypted.getvalue(), self.key_pair.private_key), self.data)
+
+    def test_stream_signature(self):
+        signature = self.crypto.generate_stream_signature(io.BytesIO(self.data), self.key_pair.private_key)
+        self.assertTrue(self.crypto.verify_stream_signature(
+            io.BytesIO(self.data), signature, self.key_pair.public_key
+        ))
+
+        NativeBridge._NativeBridge__instance = self.__native
+        self.assertTrue(self.crypto.verify_signature(self.data, signature, self.key_pair.public_key))
+
+    def test_hash(self):
+        self.assertEqual(
+            bytes(self.crypto.compute_hash(self.data, HashAlgorithm.SHA256)), hashlib.sha256(self.data).digest()
+        )
+
+    def test_segmented_roundtrip(self):
+        container = io.BytesIO()
+        self.crypto.encrypt_segmented(io.BytesIO(self.data), container, self.key_pair.public_key, segment_size=4096)
+        decrypted = io.BytesIO()
+        self.crypto.decrypt_segmented(io.BytesIO(container.getvalue()), decrypted, self.key_pair.private_key)
+        self.assertEqual(decrypted.getvalue(), self.data)
+
+        NativeBridge._NativeBridge__instance = self.__native
+        decrypted = io.BytesIO()
+        self.crypto.decrypt_segmented(io.BytesIO(container.getvalue()), decrypted, self.key_pair.private_key)
+        self.assertEqual(decrypted.getvalue(), self.data)
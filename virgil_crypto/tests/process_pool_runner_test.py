@@ -0,0 +1,73 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.process_pool_runner import ProcessPoolRunner
+
+
+class ProcessPoolRunnerTest(unittest.TestCase):
+
+    def test_bulk_jobs(self):
+        crypto = VirgilCrypto()
+        key_pair = crypto.generate_key_pair()
+        records = [os.urandom(100 + index) for index in range(20)]
+
+        with ProcessPoolRunner(crypto, max_workers=2) as runner:
+            signatures = runner.generate_signatures(records, key_pair.private_key)
+            self.assertEqual(len(signatures), len(records))
+            for record, signature in zip(records, signatures):
+                self.assertTrue(crypto.verify_signature(record, signature, key_pair.public_key))
+
+            items = [(record, signature, key_pair.public_key) for record, signature in zip(records, signatures)]
+            items[3] = (b"other data", signatures[3], key_pair.public_key)
+            expected = bytearray([1] * len(records))
+            expected[3] = 0
+            self.assertEqual(runner.verify_signatures(items), expected)
+
+            encrypted = runner.encrypt([memoryview(record) for record in records], key_pair.public_key)
+            self.assertEqual(crypto.decrypt(encrypted[0], key_pair.private_key), records[0])
+            self.assertEqual(runner.decrypt(encrypted, key_pair.private_key), records)
+
+    def test_executor_requires_max_workers(self):
+        executor = ProcessPoolExecutor(1)
+        try:
+            self.assertRaises(ValueError, ProcessPoolRunner, executor=executor)
+            with ProcessPoolRunner(executor=executor, max_workers=1) as runner:
+                self.assertEqual(len(runner.encrypt([b"record"], VirgilCrypto().generate_key_pair().public_key)), 1)
+        finally:
+            executor.shutdown()
@@ -0,0 +1,90 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import unittest
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.keys import PublicKeyCache
+
+
+class PublicKeyCacheTest(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = PublicKeyCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+
+        stats = cache.stats
+        self.assertEqual((stats.hits, stats.misses, stats.evictions, stats.size, stats.max_size), (3, 1, 1, 2, 2))
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, PublicKeyCache, 0)
+
+    def test_import_public_key_uses_cache(self):
+        crypto = VirgilCrypto(key_cache_size=2)
+        key_pairs = [crypto.generate_key_pair() for _ in range(3)]
+        exported = [crypto.export_public_key(key_pair.public_key) for key_pair in key_pairs]
+
+        first = crypto.import_public_key(exported[0])
+        self.assertIs(crypto.import_public_key(bytes(exported[0])), first)
+        self.assertEqual(first, key_pairs[0].public_key)
+        crypto.import_public_key(exported[1])
+        crypto.import_public_key(exported[2])
+
+        stats = crypto.key_cache_stats
+        self.assertEqual((stats.hits, stats.misses, stats.evictions, stats.size), (1, 3, 1, 2))
+        self.assertIsNot(crypto.import_public_key(exported[0]), first)
+
+        crypto.clear_key_cache()
+        self.assertEqual(crypto.key_cache_stats.size, 0)
+
+    def test_cache_respects_fingerprint_format(self):
+        crypto = VirgilCrypto(key_cache_size=4)
+        exported = crypto.export_public_key(crypto.generate_key_pair().public_key)
+        sha512_key = crypto.import_public_key(exported)
+        crypto.use_sha256_fingerprints = True
+        sha256_key = crypto.import_public_key(exported)
+        self.assertEqual(len(sha512_key.identifier), 8)
+        self.assertEqual(len(sha256_key.identifier), 32)
+
+    def test_cache_is_disabled_by_default(self):
+        crypto = VirgilCrypto()
+        exported = crypto.export_public_key(crypto.generate_key_pair().public_key)
+        self.assertIsNot(crypto.import_public_key(exported), crypto.import_public_key(exported))
+        self.assertEqual(crypto.key_cache_stats.max_size, 0)
+        crypto.clear_key_cache()
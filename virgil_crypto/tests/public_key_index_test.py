@@ -0,0 +1,77 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import unittest
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.errors import VirgilCryptoError
+from virgil_crypto.keys import PublicKeyIndex
+
+
+class PublicKeyIndexTest(unittest.TestCase):
+
+    def test_finds_key_by_both_identifier_formats(self):
+        crypto = VirgilCrypto()
+        sha256_crypto = VirgilCrypto(use_sha256_fingerprints=True)
+        key_pairs = [crypto.generate_key_pair() for _ in range(3)]
+        index = PublicKeyIndex(key_pair.public_key for key_pair in key_pairs)
+        index.add(key_pairs[0].public_key)
+
+        self.assertEqual(len(index), 3)
+        public_key = key_pairs[1].public_key
+        self.assertIs(index.get(public_key.identifier), public_key)
+        sha256_identifier = sha256_crypto.compute_public_key_identifier(public_key)
+        self.assertEqual(len(sha256_identifier), 32)
+        self.assertIs(index.get(sha256_identifier), public_key)
+        self.assertIn(bytes(sha256_identifier), index)
+        self.assertIsNone(index.get(b"unknown"))
+
+    def test_decrypt_and_verify(self):
+        key_pairs = [VirgilCrypto().generate_key_pair() for _ in range(4)]
+        index = PublicKeyIndex(key_pair.public_key for key_pair in key_pairs[1:])
+        data = b"data to sign and encrypt"
+
+        for crypto in (VirgilCrypto(), VirgilCrypto(use_sha256_fingerprints=True)):
+            signer = crypto.import_private_key(crypto.export_private_key(key_pairs[2].private_key)).private_key
+            encrypted = crypto.sign_and_encrypt(data, signer, key_pairs[0].public_key)
+            self.assertEqual(VirgilCrypto().decrypt_and_verify(encrypted, key_pairs[0].private_key, index), data)
+
+            mapping = dict((bytes(key_pair.public_key.identifier), key_pair.public_key) for key_pair in key_pairs)
+            if not crypto.use_sha256_fingerprints:
+                self.assertEqual(crypto.decrypt_and_verify(encrypted, key_pairs[0].private_key, mapping), data)
+
+        encrypted = VirgilCrypto().sign_and_encrypt(data, key_pairs[0].private_key, key_pairs[0].public_key)
+        self.assertRaises(
+            VirgilCryptoError,
+            VirgilCrypto().decrypt_and_verify, encrypted, key_pairs[0].private_key, index
+        )
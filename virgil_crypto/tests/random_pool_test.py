@@ -0,0 +1,126 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import os
+import threading
+import unittest
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.pools import RandomPool
+
+
+class RandomPoolTest(unittest.TestCase):
+
+    def test_same_thread_gets_same_random(self):
+        pool = RandomPool()
+        self.assertIs(pool.get(), pool.get())
+
+    def test_threads_get_own_random(self):
+        pool = RandomPool()
+        randoms = []
+        thread = threading.Thread(target=lambda: randoms.append(pool.get()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(randoms[0], pool.get())
+
+    def test_reseeds_after_interval(self):
+        self.assertEqual(self.count_reseeds(reseed_interval=2, draws=8), 3)
+        self.assertEqual(self.count_reseeds(reseed_interval=3, draws=8), 2)
+        self.assertEqual(self.count_reseeds(reseed_interval=RandomPool.DEFAULT_RESEED_INTERVAL, draws=8), 0)
+
+    def count_reseeds(self, reseed_interval, draws):
+        # With constant entropy the output of the pooled random matches a
+        # random that is never reseeded automatically only if the reference
+        # is reseeded explicitly at the same draws.
+        import virgil_crypto_lib.foundation as foundation
+
+        class ConstantEntropyCtrDrbg(foundation.CtrDrbg):
+            def setup_defaults(self):
+                self.entropy = foundation.FakeRandom()
+                self.entropy.setup_source_byte(7)
+                self.set_entropy_source(self.entropy)
+
+        ctr_drbg = foundation.CtrDrbg
+        foundation.CtrDrbg = ConstantEntropyCtrDrbg
+        try:
+            rng = RandomPool(reseed_interval=reseed_interval).get()
+        finally:
+            foundation.CtrDrbg = ctr_drbg
+
+        reference = ConstantEntropyCtrDrbg()
+        reference.setup_defaults()
+        reference.set_reseed_interval(10 ** 6)
+        reseeds = 0
+        for draw in range(draws):
+            value = bytes(rng.random(16))
+            if draw and draw % reseed_interval == 0:
+                reference.reseed()
+                reseeds += 1
+            self.assertEqual(value, bytes(reference.random(16)))
+        return reseeds
+
+    def test_invalid_reseed_interval(self):
+        self.assertRaises(ValueError, RandomPool, 0)
+
+    def test_instance_and_class_signatures(self):
+        crypto = VirgilCrypto(rng_reseed_interval=4)
+        key_pair = crypto.generate_key_pair()
+        data = bytearray("test data".encode())
+        for _ in range(8):
+            self.assertTrue(crypto.verify_signature(
+                data, crypto.generate_signature(data, key_pair.private_key), key_pair.public_key
+            ))
+            self.assertTrue(crypto.verify_signature(
+                data, VirgilCrypto.generate_signature(data, key_pair.private_key), key_pair.public_key
+            ))
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_child_process_does_not_repeat_parent_random(self):
+        crypto = VirgilCrypto()
+        crypto.generate_random_data(16)
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(read_fd)
+                os.write(write_fd, bytes(crypto.generate_random_data(32)))
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd, "rb") as reader:
+            child_random = reader.read()
+        os.waitpid(pid, 0)
+
+        self.assertEqual(len(child_random), 32)
+        self.assertNotEqual(child_random, bytes(crypto.generate_random_data(32)))
@@ -0,0 +1,267 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import io
+import os
+import struct
+import tracemalloc
+import unittest
+
+from virgil_crypto_lib.foundation._c_bridge import VirgilCryptoFoundationError
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.errors import VirgilCryptoError
+from virgil_crypto.streams import SegmentedHeader
+
+
+class SegmentedContainerTest(unittest.TestCase):
+
+    SEGMENT_SIZE = 1024
+
+    @classmethod
+    def setUpClass(cls):
+        cls.crypto = VirgilCrypto()
+        cls.key_pair = cls.crypto.generate_key_pair()
+
+    def encrypt(self, data, *recipients):
+        output = io.BytesIO()
+        self.crypto.encrypt_segmented(
+            io.BytesIO(data), output, *(recipients or [self.key_pair.public_key]), segment_size=self.SEGMENT_SIZE
+        )
+        return output.getvalue()
+
+    def decrypt(self, container, private_key=None):
+        output = io.BytesIO()
+        self.crypto.decrypt_segmented(io.BytesIO(container), output, private_key or self.key_pair.private_key)
+        return output.getvalue()
+
+    def test_encrypt_decrypt(self):
+        for size in (0, 1, self.SEGMENT_SIZE - 1, self.SEGMENT_SIZE, 3 * self.SEGMENT_SIZE, 3 * self.SEGMENT_SIZE + 7):
+            data = os.urandom(size)
+            container = self.encrypt(data)
+            self.assertEqual(self.decrypt(container), data)
+
+            header = SegmentedHeader.read(io.BytesIO(container))
+            self.assertEqual(header.segment_size, self.SEGMENT_SIZE)
+            self.assertEqual(header.plaintext_size(len(container)), size)
+
+    def test_parallel(self):
+        data = os.urandom(20 * self.SEGMENT_SIZE + 3)
+        output = io.BytesIO()
+        self.crypto.encrypt_segmented(
+            io.BytesIO(data), output, self.key_pair.public_key, segment_size=self.SEGMENT_SIZE, max_workers=4
+        )
+        container = output.getvalue()
+        self.assertEqual(self.decrypt(container), data)
+
+        output = io.BytesIO()
+        self.crypto.decrypt_segmented(io.BytesIO(container), output, self.key_pair.private_key, max_workers=3)
+        self.assertEqual(output.getvalue(), data)
+
+        modified = bytearray(container)
+        modified[-100] ^= 1
+        self.assertRaises(
+            VirgilCryptoFoundationError,
+            self.crypto.decrypt_segmented, io.BytesIO(modified), io.BytesIO(), self.key_pair.private_key, 3
+        )
+
+    def test_recipients(self):
+        other_key_pair = self.crypto.generate_key_pair()
+        data = os.urandom(2500)
+        container = self.encrypt(data, self.key_pair.public_key, other_key_pair.public_key)
+        self.assertEqual(self.decrypt(container, other_key_pair.private_key), data)
+        self.assertRaises(
+            VirgilCryptoFoundationError, self.decrypt, container, self.crypto.generate_key_pair().private_key
+        )
+
+    def test_decrypt_range(self):
+        data = os.urandom(5 * self.SEGMENT_SIZE + 100)
+        container = self.encrypt(data)
+        for offset, length in ((0, len(data)), (10, 20), (1000, 100), (self.SEGMENT_SIZE, self.SEGMENT_SIZE),
+                               (len(data) - 50, 500), (len(data) + 10, 5), (7, 0)):
+            decrypted = self.crypto.decrypt_range(io.BytesIO(container), offset, length, self.key_pair.private_key)
+            self.assertEqual(decrypted, data[offset:offset + length])
+
+        stream = io.BytesIO(b"prefix" + container)
+        stream.seek(len(b"prefix"))
+        self.assertEqual(self.crypto.decrypt_range(stream, 3000, 10, self.key_pair.private_key), data[3000:3010])
+
+    def test_decrypt_range_reads_only_spanned_segments(self):
+        data = os.urandom(5 * self.SEGMENT_SIZE)
+        container = bytearray(self.encrypt(data))
+        header = SegmentedHeader.read(io.BytesIO(container))
+        container[header.segment_offset(0)] ^= 1
+
+        decrypted = self.crypto.decrypt_range(io.BytesIO(container), 2 * self.SEGMENT_SIZE, 10, self.key_pair.private_key)
+        self.assertEqual(decrypted, data[2 * self.SEGMENT_SIZE:2 * self.SEGMENT_SIZE + 10])
+        self.assertRaises(
+            VirgilCryptoFoundationError,
+            self.crypto.decrypt_range, io.BytesIO(container), 10, 10, self.key_pair.private_key
+        )
+
+    def test_resume_encryption(self):
+        data = os.urandom(4 * self.SEGMENT_SIZE + 100)
+        container = self.encrypt(data)
+        header = SegmentedHeader.read(io.BytesIO(container))
+
+        for cut, skipped in ((len(header), 0),
+                             (header.segment_offset(2) + 10, 2 * self.SEGMENT_SIZE),
+                             (len(container) - 1, 4 * self.SEGMENT_SIZE),
+                             (len(container), len(data))):
+            partial_output = io.BytesIO(container[:cut])
+            resumed = self.crypto.resume_encrypt_segmented(
+                io.BytesIO(data), partial_output, self.key_pair.private_key, checkpoint_interval=1
+            )
+            self.assertEqual(resumed, skipped)
+            self.assertEqual(self.decrypt(partial_output.getvalue()), data)
+
+    def test_resume_refuses_different_input(self):
+        data = os.urandom(4 * self.SEGMENT_SIZE)
+        container = self.encrypt(data)
+        header = SegmentedHeader.read(io.BytesIO(container))
+        partial = container[:header.segment_offset(2) + 10]
+
+        # Differences in the last good segment, in an earlier one and in
+        # the length of the input already encrypted.
+        for changed in (self.SEGMENT_SIZE + 1, 0, None):
+            other_data = bytearray(data)
+            if changed is None:
+                other_data = other_data[:self.SEGMENT_SIZE + 1]
+            else:
+                other_data[changed] ^= 1
+            partial_output = io.BytesIO(partial)
+            self.assertRaises(
+                VirgilCryptoError,
+                self.crypto.resume_encrypt_segmented, io.BytesIO(other_data), partial_output, self.key_pair.private_key
+            )
+            self.assertEqual(partial_output.getvalue(), partial)
+
+    def test_resume_after_corrupted_segment(self):
+        data = os.urandom(4 * self.SEGMENT_SIZE)
+        container = bytearray(self.encrypt(data))
+        header = SegmentedHeader.read(io.BytesIO(container))
+        container[header.segment_offset(1) + 5] ^= 1
+
+        partial_output = io.BytesIO(bytes(container))
+        resumed = self.crypto.resume_encrypt_segmented(
+            io.BytesIO(data), partial_output, self.key_pair.private_key, max_workers=2
+        )
+        self.assertEqual(resumed, self.SEGMENT_SIZE)
+        self.assertEqual(self.decrypt(partial_output.getvalue()), data)
+
+        self.assertRaises(
+            VirgilCryptoError,
+            self.crypto.resume_encrypt_segmented, io.BytesIO(data), io.BytesIO(container[:10]),
+            self.key_pair.private_key
+        )
+
+    def test_detects_modification(self):
+        data = os.urandom(3 * self.SEGMENT_SIZE + 10)
+        container = self.encrypt(data)
+        header = SegmentedHeader.read(io.BytesIO(container))
+        encrypted_segment_size = header.encrypted_segment_size
+
+        truncated = container[:header.segment_offset(3)]
+        self.assertRaises(VirgilCryptoFoundationError, self.decrypt, truncated)
+
+        first = header.segment_offset(0)
+        swapped = (container[:first] + container[first + encrypted_segment_size:first + 2 * encrypted_segment_size] +
+                   container[first:first + encrypted_segment_size] + container[first + 2 * encrypted_segment_size:])
+        self.assertRaises(VirgilCryptoFoundationError, self.decrypt, swapped)
+
+        other_container = self.encrypt(data)
+        other_header = SegmentedHeader.read(io.BytesIO(other_container))
+        mixed = other_container[:len(other_header)] + container[len(header):]
+        self.assertRaises(VirgilCryptoFoundationError, self.decrypt, mixed)
+
+        self.assertRaises(VirgilCryptoError, self.decrypt, b"not a container")
+
+    def test_rejects_oversized_header_fields(self):
+        def header(segment_size, wrapped_key_len):
+            return struct.pack(">4sBI7sI", b"VSGC", 1, segment_size, bytes(7), wrapped_key_len)
+
+        container = bytearray(self.encrypt(b"data"))
+        container[5:9] = struct.pack(">I", 2 ** 31)
+
+        tracemalloc.start()
+        try:
+            self.assertRaises(VirgilCryptoError, self.decrypt, container)
+            self.assertRaises(
+                VirgilCryptoError, self.crypto.decrypt_range, io.BytesIO(container), 0, 4, self.key_pair.private_key
+            )
+            for crafted in (header(2 ** 32 - 1, 10), header(1024, 2 ** 32 - 1), header(0, 10)):
+                self.assertRaises(VirgilCryptoError, self.decrypt, crafted)
+                self.assertRaises(
+                    VirgilCryptoError,
+                    self.crypto.decrypt_range, io.BytesIO(crafted), 0, 10, self.key_pair.private_key
+                )
+            # Within the limit, but the stream ends long before the wrapped key does.
+            crafted = header(1024, SegmentedHeader.MAX_WRAPPED_KEY_LEN) + bytes(100)
+            self.assertRaises(VirgilCryptoError, SegmentedHeader.read, io.BytesIO(crafted))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 1024 * 1024)
+
+        self.assertRaises(
+            ValueError,
+            self.crypto.encrypt_segmented, io.BytesIO(b"data"), io.BytesIO(), self.key_pair.public_key,
+            segment_size=SegmentedHeader.MAX_SEGMENT_SIZE + 1
+        )
+
+    def test_rejects_malformed_wrapped_key(self):
+        container = self.encrypt(b"data")
+        header = SegmentedHeader.read(io.BytesIO(container))
+        body = container[len(header):]
+
+        for wrapped_key in (b"", bytes(64), header.wrapped_key[:-1], header.wrapped_key + b"\x00"):
+            crafted = SegmentedHeader(header.segment_size, header.nonce_prefix, wrapped_key).serialize() + body
+            self.assertRaises(VirgilCryptoError, self.decrypt, crafted)
+            self.assertRaises(
+                VirgilCryptoError, self.crypto.decrypt_range, io.BytesIO(crafted), 0, 4, self.key_pair.private_key
+            )
+            self.assertRaises(
+                VirgilCryptoError,
+                self.crypto.resume_encrypt_segmented, io.BytesIO(b"data"), io.BytesIO(crafted), self.key_pair.private_key
+            )
+
+        # Zeroed lengths and tags within the wrapped key make the library
+        # assert on empty fields unless they are rejected beforehand.
+        wrapped_key_start = len(header) - len(header.wrapped_key)
+        for offset in range(wrapped_key_start, len(header)):
+            crafted = bytearray(container)
+            crafted[offset] = 0
+            if crafted == container:
+                continue
+            with self.assertRaises((VirgilCryptoError, VirgilCryptoFoundationError)):
+                self.crypto.decrypt_range(io.BytesIO(crafted), 0, 4, self.key_pair.private_key)
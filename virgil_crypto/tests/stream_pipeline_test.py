@@ -0,0 +1,171 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+import io
+import os
+import time
+import unittest
+
+from virgil_crypto import VirgilCrypto
+from virgil_crypto.streams import StreamPipeline
+
+
+class SlowWriter(io.RawIOBase):
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        time.sleep(self.delay)
+        self.data += data
+        return len(data)
+
+
+class FailingReader(io.RawIOBase):
+
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        read = self.stream.readinto(buffer)
+        if not read:
+            raise IOError("Connection reset")
+        return read
+
+
+class StreamPipelineTest(unittest.TestCase):
+
+    CHUNK_SIZE = 1024
+
+    @classmethod
+    def setUpClass(cls):
+        cls.crypto = VirgilCrypto()
+        cls.key_pair = cls.crypto.generate_key_pair()
+
+    def test_encrypt_decrypt(self):
+        for size in (0, 1, self.CHUNK_SIZE, 10 * self.CHUNK_SIZE + 3):
+            data = os.urandom(size)
+            pipeline = StreamPipeline(depth=2)
+            encrypted = io.BytesIO()
+            self.crypto.encrypt_stream(
+                io.BytesIO(data), encrypted, self.key_pair.public_key, chunk_size=self.CHUNK_SIZE, pipeline=pipeline
+            )
+            self.assertEqual(pipeline.stats.bytes_read, size)
+            self.assertEqual(self.crypto.decrypt(encrypted.getvalue(), self.key_pair.private_key), data)
+
+            decrypted = io.BytesIO()
+            self.crypto.decrypt_stream(
+                io.BytesIO(encrypted.getvalue()), decrypted, self.key_pair.private_key, self.CHUNK_SIZE, pipeline
+            )
+            self.assertEqual(decrypted.getvalue(), data)
+
+    def test_stream_without_readinto(self):
+        data = os.urandom(5 * self.CHUNK_SIZE + 1)
+        input_stream = io.BytesIO(data)
+        input_stream.readinto = None
+        encrypted = io.BytesIO()
+        self.crypto.encrypt_stream(input_stream, encrypted, self.key_pair.public_key, pipeline=StreamPipeline())
+        self.assertEqual(self.crypto.decrypt(encrypted.getvalue(), self.key_pair.private_key), data)
+
+    def test_generate_stream_signature(self):
+        data = os.urandom(7 * self.CHUNK_SIZE + 5)
+        pipeline = StreamPipeline()
+        signature = self.crypto.generate_stream_signature(
+            io.BytesIO(data), self.key_pair.private_key, self.CHUNK_SIZE, pipeline
+        )
+        self.assertTrue(self.crypto.verify_signature(data, signature, self.key_pair.public_key))
+        self.assertEqual(pipeline.stats.crypto.items, 8)
+        self.assertIsNone(pipeline.stats.writer)
+
+    def test_stats_show_slow_writer(self):
+        data = os.urandom(8 * self.CHUNK_SIZE)
+        pipeline = StreamPipeline(depth=2)
+        output_stream = SlowWriter(0.02)
+        self.crypto.encrypt_stream(
+            io.BytesIO(data), output_stream, self.key_pair.public_key, chunk_size=self.CHUNK_SIZE, pipeline=pipeline
+        )
+        self.assertEqual(self.crypto.decrypt(output_stream.data, self.key_pair.private_key), data)
+
+        stats = pipeline.stats
+        self.assertEqual(stats.reader.items, 8)
+        self.assertEqual(stats.crypto.items, 8)
+        self.assertEqual(stats.writer.items, 8)
+        self.assertGreater(stats.writer.busy, 0.1)
+        self.assertGreater(stats.crypto.output_stall, stats.crypto.busy)
+
+    def test_errors(self):
+        data = os.urandom(20 * self.CHUNK_SIZE)
+        self.assertRaises(
+            IOError,
+            self.crypto.encrypt_stream, FailingReader(data), io.BytesIO(), self.key_pair.public_key,
+            chunk_size=self.CHUNK_SIZE, pipeline=StreamPipeline(depth=1)
+        )
+
+        class FailingWriter(io.RawIOBase):
+            writes = 0
+
+            def writable(self):
+                return True
+
+            def write(self, data):
+                # The message info is written before the pipeline starts.
+                self.writes += 1
+                if self.writes > 3:
+                    raise IOError("Disk full")
+                return len(data)
+
+        output_stream = FailingWriter()
+        self.assertRaises(
+            IOError,
+            self.crypto.encrypt_stream, io.BytesIO(data), output_stream, self.key_pair.public_key,
+            chunk_size=self.CHUNK_SIZE, pipeline=StreamPipeline(depth=1)
+        )
+        self.assertEqual(output_stream.writes, 4)
+
+        pipeline = StreamPipeline(depth=1)
+
+        def process(chunk):
+            raise ValueError("Broken chunk")
+
+        self.assertRaises(ValueError, pipeline.run, io.BytesIO(data), self.CHUNK_SIZE, process)
+        self.assertEqual(pipeline.stats.crypto.items, 0)
+
+    def test_invalid_depth(self):
+        self.assertRaises(ValueError, StreamPipeline, 0)
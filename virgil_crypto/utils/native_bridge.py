@@ -0,0 +1,532 @@
+# Copyright (C) 2016-2019 Virgil Security Inc.
+#
+# Lead Maintainer: Virgil Security Inc. <support@virgilsecurity.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#     (1) Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#
+#     (2) Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#
+#     (3) Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ''AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+# INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import ctypes
+import os
+import platform
+import sys
+import threading
+from ctypes import POINTER, Structure, byref, c_byte, c_char_p, c_int, c_size_t, c_ssize_t, c_void_p, cast
+
+
+def _load_library(name):
+    # type: (str) -> ctypes.CDLL
+    """Opens a library shipped with virgil_crypto_lib through an own handle.
+
+    Function prototypes set on the handle don't affect the handles of the
+    generated bridge.
+    """
+    import virgil_crypto_lib
+    system = platform.system()
+    file_name = "{}vsc_{}.{}".format(
+        "" if system == "Windows" else "lib", name, {"Darwin": "dylib", "Windows": "dll"}.get(system, "so")
+    )
+    package_path = os.path.dirname(os.path.realpath(virgil_crypto_lib.__file__))
+    return ctypes.CDLL(os.path.join(package_path, "_libs", file_name))
+
+
+def _load_python_api():
+    # type: () -> ctypes.PyDLL
+    """Opens the Python C API through an own handle, as ctypes.pythonapi is opened.
+
+    Function prototypes set on ctypes.pythonapi would change them for every
+    other user in the process.
+    """
+    if os.name == "nt":
+        return ctypes.PyDLL("python dll", None, sys.dllhandle)
+    return ctypes.PyDLL(None)
+
+
+class _Data(Structure):
+    """vsc_data_t, a pointer to bytes with their length passed by value."""
+
+    _fields_ = [
+        ("bytes", POINTER(c_byte)),
+        ("len", c_size_t),
+    ]
+
+
+class _PyBuffer(Structure):
+    _fields_ = [
+        ("buf", c_void_p),
+        ("obj", c_void_p),
+        ("len", c_ssize_t),
+        ("itemsize", c_ssize_t),
+        ("readonly", c_int),
+        ("ndim", c_int),
+        ("format", c_char_p),
+        ("shape", c_void_p),
+        ("strides", c_void_p),
+        ("suboffsets", c_void_p),
+        ("internal", c_void_p),
+    ]
+
+
+class _PinnedBuffer(object):
+    """Holds the memory of a read-only buffer in place, as memoryview does.
+
+    ctypes only shares the memory of writable buffers, read-only ones
+    (bytes slices, read-only mmaps) are pinned through the C buffer API.
+    """
+
+    def __init__(self, obj, python_api):
+        self.__view = _PyBuffer()
+        self.__acquired = False
+        self.__python_api = python_api
+        python_api.PyObject_GetBuffer(ctypes.py_object(obj), byref(self.__view), 0)
+        self.__acquired = True
+
+    def __del__(self):
+        if self.__acquired:
+            self.__python_api.PyBuffer_Release(byref(self.__view))
+
+    @property
+    def pointer(self):
+        return cast(c_void_p(self.__view.buf), POINTER(c_byte))
+
+
+class NativeBridge(object):
+    """Direct calls into the foundation library for the streaming hot paths.
+
+    The generated bridge converts every input into a ctypes array element
+    by element and copies every output into a new bytearray, which costs
+    far more than the cryptography itself for large data. The calls below
+    hand Python buffers to the library as they are and let it write into
+    a reusable OutputBuffer. If the library internals are not available
+    the public bridge is used instead, with the same results.
+
+    Data arguments are bytes-like objects whose len() is their size in
+    bytes: bytes, bytearray, mmap or a memoryview of bytes.
+    """
+
+    HASH_NAMES = ("Sha224", "Sha256", "Sha384", "Sha512")
+
+    __instance = None
+    __instance_lock = threading.Lock()
+
+    def __init__(self):
+        try:
+            self.__common = _load_library("common")
+            self.__foundation = _load_library("foundation")
+            self.__declare_functions()
+        except (ImportError, OSError, AttributeError):
+            self.__common = None
+            return
+        self.__empty = (c_byte * 1)()
+        try:
+            self.__python_api = _load_python_api()
+            self.__python_api.PyObject_GetBuffer.argtypes = [ctypes.py_object, POINTER(_PyBuffer), c_int]
+            self.__python_api.PyObject_GetBuffer.restype = c_int
+            self.__python_api.PyBuffer_Release.argtypes = [POINTER(_PyBuffer)]
+            self.__python_api.PyBuffer_Release.restype = None
+        except (OSError, AttributeError):
+            self.__python_api = None
+
+    def __declare_functions(self):
+        # vsc_buffer_t is only passed around, so it stays an opaque pointer.
+        buffer_p = c_void_p
+        vsc_data_t = _Data
+
+        self.__common.vsc_buffer_new.argtypes = []
+        self.__common.vsc_buffer_new.restype = buffer_p
+        self.__common.vsc_buffer_use.argtypes = [buffer_p, POINTER(c_byte), c_size_t]
+        self.__common.vsc_buffer_use.restype = None
+        self.__common.vsc_buffer_len.argtypes = [buffer_p]
+        self.__common.vsc_buffer_len.restype = c_size_t
+        self.__common.vsc_buffer_inc_used.argtypes = [buffer_p, c_size_t]
+        self.__common.vsc_buffer_inc_used.restype = None
+        self.__common.vsc_buffer_reset.argtypes = [buffer_p]
+        self.__common.vsc_buffer_reset.restype = None
+        self.__common.vsc_buffer_delete.argtypes = [buffer_p]
+        self.__common.vsc_buffer_delete.restype = None
+
+        for name in (
+            "vscf_recipient_cipher_process_encryption",
+            "vscf_recipient_cipher_process_decryption",
+        ):
+            function = getattr(self.__foundation, name)
+            function.argtypes = [c_void_p, vsc_data_t, buffer_p]
+            function.restype = c_int
+        for name in (
+            "vscf_recipient_cipher_finish_encryption",
+            "vscf_recipient_cipher_finish_decryption",
+        ):
+            function = getattr(self.__foundation, name)
+            function.argtypes = [c_void_p, buffer_p]
+            function.restype = c_int
+        for name in ("vscf_signer_append_data", "vscf_verifier_append_data"):
+            function = getattr(self.__foundation, name)
+            function.argtypes = [c_void_p, vsc_data_t]
+            function.restype = None
+        self.__foundation.vscf_aes256_gcm_set_nonce.argtypes = [c_void_p, vsc_data_t]
+        self.__foundation.vscf_aes256_gcm_set_nonce.restype = None
+        self.__foundation.vscf_aes256_gcm_auth_encrypt.argtypes = [c_void_p, vsc_data_t, vsc_data_t, buffer_p, buffer_p]
+        self.__foundation.vscf_aes256_gcm_auth_encrypt.restype = c_int
+        self.__foundation.vscf_aes256_gcm_auth_decrypt.argtypes = [c_void_p, vsc_data_t, vsc_data_t, vsc_data_t, buffer_p]
+        self.__foundation.vscf_aes256_gcm_auth_decrypt.restype = c_int
+        for name in self.HASH_NAMES:
+            function = getattr(self.__foundation, "vscf_{}_hash".format(name.lower()))
+            function.argtypes = [vsc_data_t, buffer_p]
+            function.restype = None
+
+    @classmethod
+    def instance(cls):
+        # type: () -> NativeBridge
+        """Returns the process wide bridge, loading it on first use."""
+        if cls.__instance is None:
+            with cls.__instance_lock:
+                if cls.__instance is None:
+                    cls.__instance = cls()
+        return cls.__instance
+
+    @property
+    def available(self):
+        # type: () -> bool
+        """True if data is passed to the library without copies."""
+        return self.__common is not None
+
+    def process_encryption(self, cipher, data, out):
+        """Encrypts the next portion of data appending the result to out."""
+        self.__write(
+            out, cipher.encryption_out_len(len(data)),
+            lambda buffer: self.__call(self.__foundation.vscf_recipient_cipher_process_encryption, cipher.ctx, data, buffer),
+            lambda: cipher.process_encryption(self.__as_bytes(data))
+        )
+
+    def finish_encryption(self, cipher, out):
+        """Finishes encryption appending the remaining bytes to out."""
+        self.__write(
+            out, cipher.encryption_out_len(0),
+            lambda buffer: self.__check(self.__foundation.vscf_recipient_cipher_finish_encryption(cipher.ctx, buffer)),
+            cipher.finish_encryption
+        )
+
+    def process_decryption(self, cipher, data, out):
+        """Decrypts the next portion of data appending the result to out."""
+        self.__write(
+            out, cipher.decryption_out_len(len(data)),
+            lambda buffer: self.__call(self.__foundation.vscf_recipient_cipher_process_decryption, cipher.ctx, data, buffer),
+            lambda: cipher.process_decryption(self.__as_bytes(data))
+        )
+
+    def finish_decryption(self, cipher, out):
+        """Finishes decryption appending the remaining bytes to out."""
+        self.__write(
+            out, cipher.decryption_out_len(0),
+            lambda buffer: self.__check(self.__foundation.vscf_recipient_cipher_finish_decryption(cipher.ctx, buffer)),
+            cipher.finish_decryption
+        )
+
+    def auth_encrypt(self, aes_gcm, nonce, data, auth_data, out):
+        """Encrypts data with Aes256Gcm appending the ciphertext and then the tag to out."""
+        def native_encrypt(buffer):
+            self.__set_nonce(aes_gcm, nonce)
+            native_data, data_keep_alive = self.data(data)
+            native_auth_data, auth_data_keep_alive = self.data(auth_data)
+            self.__check(self.__foundation.vscf_aes256_gcm_auth_encrypt(
+                aes_gcm.ctx, native_data, native_auth_data, buffer, None
+            ))
+
+        def bridge_encrypt():
+            aes_gcm.set_nonce(self.__as_bytes(nonce))
+            encrypted, tag = aes_gcm.auth_encrypt(self.__as_bytes(data), self.__as_bytes(auth_data))
+            return bytearray(encrypted) + tag
+
+        self.__write(out, aes_gcm.auth_encrypted_len(len(data)), native_encrypt, bridge_encrypt)
+
+    def auth_decrypt(self, aes_gcm, nonce, data, auth_data, tag, out):
+        """Decrypts data with Aes256Gcm checking the tag, appends the plaintext to out."""
+        def native_decrypt(buffer):
+            self.__set_nonce(aes_gcm, nonce)
+            native_data, data_keep_alive = self.data(data)
+            native_auth_data, auth_data_keep_alive = self.data(auth_data)
+            native_tag, tag_keep_alive = self.data(tag)
+            self.__check(self.__foundation.vscf_aes256_gcm_auth_decrypt(
+                aes_gcm.ctx, native_data, native_auth_data, native_tag, buffer
+            ))
+
+        def bridge_decrypt():
+            aes_gcm.set_nonce(self.__as_bytes(nonce))
+            return aes_gcm.auth_decrypt(self.__as_bytes(data), self.__as_bytes(auth_data), self.__as_bytes(tag))
+
+        self.__write(out, aes_gcm.auth_decrypted_len(len(data)), native_decrypt, bridge_decrypt)
+
+    def signer_append_data(self, signer, data):
+        """Adds data to the signed data of signer."""
+        if not self.available:
+            return signer.append_data(self.__as_bytes(data))
+        data, keep_alive = self.data(data)
+        self.__foundation.vscf_signer_append_data(signer.ctx, data)
+
+    def verifier_append_data(self, verifier, data):
+        """Adds data to the verified data of verifier."""
+        if not self.available:
+            return verifier.append_data(self.__as_bytes(data))
+        data, keep_alive = self.data(data)
+        self.__foundation.vscf_verifier_append_data(verifier.ctx, data)
+
+    def hash(self, hash_class, data, out):
+        """Appends the digest of data computed by a foundation hash class to out."""
+        if not self.available or hash_class.__name__ not in self.HASH_NAMES:
+            return out.append(hash_class().hash(self.__as_bytes(data)))
+        function = getattr(self.__foundation, "vscf_{}_hash".format(hash_class.__name__.lower()))
+
+        def native_hash(buffer):
+            native_data, keep_alive = self.data(data)
+            function(native_data, buffer)
+
+        self.__write(out, hash_class.DIGEST_LEN, native_hash, lambda: hash_class().hash(self.__as_bytes(data)))
+
+    def data(self, data):
+        """Wraps a buffer into vsc_data_t pointing to its memory.
+
+        Returns:
+            The vsc_data_t and the object owning the memory, which must be
+            kept alive while the library uses the data.
+        """
+        size = len(data)
+        if size == 0:
+            # The library rejects NULL data pointers even for empty data.
+            return _Data(self.__empty, 0), None
+        if isinstance(data, bytes):
+            return _Data(cast(c_char_p(data), POINTER(c_byte)), size), data
+        try:
+            array = (c_byte * size).from_buffer(data)
+        except TypeError:
+            if self.__python_api is None:
+                array = (c_byte * size).from_buffer_copy(data)
+                return _Data(array, size), array
+            pinned = _PinnedBuffer(data, self.__python_api)
+            return _Data(pinned.pointer, size), pinned
+        return _Data(array, size), array
+
+    def new_buffer(self, array, capacity):
+        """Creates a native buffer writing into the given ctypes array."""
+        buffer = self.__common.vsc_buffer_new()
+        self.__common.vsc_buffer_use(buffer, array, capacity)
+        return buffer
+
+    def buffer_len(self, buffer):
+        return self.__common.vsc_buffer_len(buffer)
+
+    def inc_buffer_len(self, buffer, size):
+        self.__common.vsc_buffer_inc_used(buffer, size)
+
+    def reset_buffer(self, buffer):
+        self.__common.vsc_buffer_reset(buffer)
+
+    def delete_buffer(self, buffer):
+        self.__common.vsc_buffer_delete(buffer)
+
+    def __write(self, out, out_len, native_call, bridge_call):
+        # The library requires room for its worst case output estimate. If a
+        # fixed buffer has less, the output goes through a scratch buffer and
+        # is copied over, failing only if it really does not fit.
+        if not self.available:
+            return out.append(bridge_call())
+        if out.fixed and out.room < out_len:
+            scratch = OutputBuffer(out_len)
+            native_call(scratch.native_buffer)
+            return out.append(scratch.view())
+        out.reserve(out_len)
+        native_call(out.native_buffer)
+
+    def __set_nonce(self, aes_gcm, nonce):
+        native_nonce, keep_alive = self.data(nonce)
+        self.__foundation.vscf_aes256_gcm_set_nonce(aes_gcm.ctx, native_nonce)
+
+    def __call(self, function, ctx, data, buffer):
+        data, keep_alive = self.data(data)
+        self.__check(function(ctx, data, buffer))
+
+    @staticmethod
+    def __check(status):
+        if status != 0:
+            # Raises the error type of the generated bridge.
+            from virgil_crypto_lib.foundation._c_bridge import VscfStatus
+            VscfStatus.handle_status(status)
+
+    @staticmethod
+    def __as_bytes(data):
+        if isinstance(data, (bytes, bytearray)):
+            return data
+        return bytearray(data)
+
+
+class OutputBuffer(object):
+    """Output buffer reused across library calls.
+
+    The library writes straight into the memory of a bytearray, so the
+    results are read through view() without copying. The buffer grows as
+    needed, unless it is created over caller supplied writable memory.
+
+    Args:
+        capacity: initial capacity of a growing buffer.
+        storage: writable bytes-like object to write into instead. Writes
+            that do not fit raise ValueError.
+    """
+
+    def __init__(self, capacity=0, storage=None):
+        self.__bridge = NativeBridge.instance()
+        self.__storage = None
+        self.__array = None
+        self.__native = None
+        self.__length = 0
+        self.__fixed = storage is not None
+        if storage is None:
+            self.reserve(capacity)
+            return
+        view = memoryview(storage)
+        if view.readonly:
+            raise TypeError("Output buffer must be writable")
+        if view.ndim != 1 or view.itemsize != 1:
+            storage = view.cast("B")
+        self.__use(storage)
+
+    def __len__(self):
+        if self.__native is not None:
+            return self.__bridge.buffer_len(self.__native)
+        return self.__length
+
+    def __del__(self):
+        self.__release()
+
+    @property
+    def capacity(self):
+        # type: () -> int
+        return len(self.__storage) if self.__storage is not None else 0
+
+    @property
+    def room(self):
+        # type: () -> int
+        """Number of bytes that can be written without growing."""
+        return self.capacity - len(self)
+
+    @property
+    def fixed(self):
+        # type: () -> bool
+        """True if the buffer writes into caller supplied memory."""
+        return self.__fixed
+
+    @property
+    def native_buffer(self):
+        """The vsc_buffer_t the library writes into."""
+        return self.__native
+
+    def reserve(self, size):
+        # type: (int) -> None
+        """Makes sure that at least size more bytes can be written.
+
+        Raises:
+            ValueError: if a fixed buffer has not enough room.
+        """
+        length = len(self) if self.__storage is not None else 0
+        if self.__storage is not None and length + size <= len(self.__storage):
+            return
+        if self.__fixed:
+            raise ValueError("Output buffer is too small: {} bytes needed, {} available".format(
+                length + size, len(self.__storage)
+            ))
+        storage = bytearray(max(length + size, 2 * length, 1))
+        if length:
+            storage[:length] = self.__storage[:length]
+        self.__release()
+        self.__use(storage, length)
+
+    def append(self, data):
+        """Copies data to the end of the buffer."""
+        size = len(data)
+        self.reserve(size)
+        length = len(self)
+        self.__storage[length:length + size] = data
+        if self.__native is not None:
+            self.__bridge.inc_buffer_len(self.__native, size)
+        self.__length = length + size
+
+    def view(self):
+        # type: () -> memoryview
+        """Memoryview of the written bytes, valid until the next write."""
+        if self.__storage is None:
+            return memoryview(b"")
+        return memoryview(self.__storage)[:len(self)]
+
+    def detach(self):
+        # type: () -> bytearray
+        """Returns the written bytes without copying them.
+
+        The memory is handed over to the caller and the buffer is left empty.
+        Only buffers over a bytearray can be detached.
+        """
+        if self.__storage is None:
+            return bytearray()
+        if not isinstance(self.__storage, bytearray):
+            raise TypeError("Only bytearray storage can be detached")
+        length = len(self)
+        storage = self.__storage
+        self.__release()
+        self.__storage = None
+        self.__length = 0
+        del storage[length:]
+        return storage
+
+    def clear(self):
+        """Forgets the written bytes keeping the memory."""
+        if self.__native is not None:
+            self.__bridge.reset_buffer(self.__native)
+        self.__length = 0
+
+    def close(self):
+        """Releases the memory, after which storage such as an mmap can be closed.
+
+        A fixed buffer can't be written after close.
+        """
+        self.__release()
+        if isinstance(self.__storage, memoryview):
+            self.__storage.release()
+        self.__storage = None
+        self.__length = 0
+
+    def __use(self, storage, length=0):
+        self.__storage = storage
+        self.__length = length
+        if self.__bridge.available and len(storage):
+            self.__array = (c_byte * len(storage)).from_buffer(storage)
+            self.__native = self.__bridge.new_buffer(self.__array, len(storage))
+            self.__bridge.inc_buffer_len(self.__native, length)
+
+    def __release(self):
+        if self.__native is not None:
+            self.__bridge.delete_buffer(self.__native)
+            self.__native = None
+        self.__array = None